@@ -10,12 +10,48 @@
 @desc:
 '''
 import os
-import requests
-from bs4 import BeautifulSoup
-import tqdm
 import json
 import difflib
-import random
+import sys
+import threading
+import time
+from collections import Counter
+from .fuzzy import FuzzyIndex, count_ratio, ranked
+from .gazetteer import Gazetteer
+from .cache import LRUCache
+from .charclass import has_thai
+from .tokenizer import tokenize, BANGKOK_MARKER, PROVINCE, DISTRICT, SUB_DISTRICT, POSTCODE, TEXT
+from .scanner import GazetteerScanner, LEVEL_MARKER, LEVEL_MARKERS
+from .snapshot import read_snapshot, write_snapshot
+from .stats import ParseTrace, ParseStats
+from .ranking import top_hypotheses, fit, conflicts_of, best_parts
+from .bangkok import BangkokIndex
+from .normalize import Normalizer
+from .similarity import scorer_class
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+DICTIONARY_FILE = 'th_provinces_districts_sub_districts.json'
+TRANSLATION_FILE = 'th_en_db.json'
+SNAPSHOT_FILE = 'gazetteer.snapshot'
+DEFAULT_CACHE_SIZE = 10000
+DEFAULT_TOKEN_CACHE_SIZE = 50000
+# lowest score of a name of the postcode area accepted without scanning the whole country
+POSTCODE_MIN_SCORE = 0.75
+# provinces, and districts of each, searched for the hypotheses of an address
+HYPOTHESIS_BEAM = 3
+# Thai parts in front of a กรุงเทพมหานคร read for its district and sub district
+BANGKOK_WINDOW = 4
+# levels of the last three items of a parse() result
+LEVELS = ('sub_district', 'district', 'province')
+# FuzzyIndex attributes of the parser over whole name lists, rebuilt by set_engine() and set_scorer()
+MATCHERS = ('province_matcher', 'non_bangkok_province_matcher', 'non_bangkok_district_matcher',
+            'non_bangkok_sub_district_matcher')
+# runtime attributes of the parser, never written to the snapshot
+TRANSIENT = ('cache', 'token_cache', 'postcode_matchers', 'subtree_matchers', 'stats', 'stats_hook', 'engine',
+             'scorer', 'scanner', 'scanner_lock')
+
+
+NAN_TABLE = str.maketrans('', '', './ {}-()')
 
 
 def drop_nan(addr_list):
@@ -24,12 +60,7 @@ def drop_nan(addr_list):
     :param addr_list:
     :return:
     '''
-    temp = []
-    for a in addr_list:
-        if len(a.replace('.', '').replace(' ', '').replace('/', '').replace('{', '').replace('}', '')
-                       .replace('-', '').replace('(', '').replace(')', '')):
-            temp.append(a)
-    return temp
+    return [a for a in addr_list if len(a.translate(NAN_TABLE))]
 
 
 def check_th_chars(s):
@@ -38,82 +69,74 @@ def check_th_chars(s):
     :param s:
     :return: check whether it contains thailand character or not
     '''
-    TH_CHAR_RANGE = range(0x0E00, 0x0E7F + 1)
-    Th_chars = set(map(chr, TH_CHAR_RANGE))
-    t = []
-    for c in s:
-        if c in Th_chars:
-            t.append(c)
-    return len(t) > 0
+    return has_thai(s)
+
+
+def normalize_address(address):
+    '''
+    key of an address for the result cache: parse() ignores repeated and trailing spaces,
+    a leading space only matters once
+    :param address:
+    :return:
+    '''
+    key = ' '.join(a for a in address.split(' ') if len(a))
+    if address.startswith(' '):
+        key = ' ' + key
+    return key
 
 
 def compute_similarity(str1, str2, mode=1):
     '''
-    test the speed of similarity computation
+    similarity of two strings
     :param str1:
     :param str2:
-    :param mode: mode 1 slower, mode 2 faster maybe
+    :param mode: 1 for difflib's quick_ratio, 2 for the number of distinct characters in
+                 common, or a scorer name of similarity.SCORERS
     :return:
     '''
     if mode == 1:
         similarity = difflib.SequenceMatcher(None, str1, str2).quick_ratio()
-    else:
+    elif mode == 2:
         similarity = len(set(str1) & set(str2))
+    else:
+        similarity = scorer_class(mode).similarity(str1, str2)
     return similarity
 
 
-def download_thai_address():
-    print('Downloading the address information of Thailand ...')
-    url = 'https://en.wikipedia.org/wiki/List_of_tambon_in_Thailand'
-    data = requests.get(url).text
-    data = BeautifulSoup(data, "html.parser")
-    urls = data.find_all(name='ul')[0]
-    hrefs = urls.find_all(name='li')
-    res = {}
-    th_en = {}
-    for h in tqdm.tqdm(hrefs):
-        href = 'https://en.wikipedia.org/' + h.find(name='a')['href']
-        data = requests.get(href).text
-        data = BeautifulSoup(data, 'html.parser')
-        table = data.find_all(name='table', attrs={'class': 'wikitable sortable'})
-        details = table[0].find_all(name='tr')[1:]
-        for detail in details:
-            temp = detail.find_all(name='td')
-            sub_district = temp[1].text
-            district = temp[3].text
-            province = temp[5].text
-            th_en[sub_district] = temp[0].text
-            th_en[district] = temp[2].text
-            th_en[province] = temp[4].text
-            if province in res.keys():
-                if district in res[province].keys():
-                    if sub_district not in res[province][district]:
-                        res[province][district].append(sub_district)
-                else:
-                    res[province][district] = [sub_district]
-            else:
-                res[province] = {district: [sub_district]}
-    for p in res.keys():
-        for d in res[p].keys():
-            res[p][d] = list(set(res[p][d]))
-    json.dump(res, open('th_provinces_districts_sub_districts.json', 'w', encoding='utf-8'),
-              ensure_ascii=False)
-    json.dump(th_en, open('th_en_db.json', 'w', encoding='utf-8'), ensure_ascii=False)
-    print('Finish the downloading!')
+def download_thai_address(*args, **kwargs):
+    '''
+    refresh the address database, see ThaiAddressParser.build
+    '''
+    from .build import download_thai_address as download
+    return download(*args, **kwargs)
 
 
-class ThaiAddressParserClass(object):
-    def __init__(self,
-                 file_path, translation_db):
+class BatchMemo(object):
+    def __init__(self):
         """
-
-        :param file_path: {province:{district:[sub district，，，，，]}}
+        work shared by the addresses of one batch, see ThaiAddressParserClass.parse_batch().
+        Plain dicts: a batch is parsed by a single thread and dropped at its end.
         """
-        self.dictionary = json.load(open(file_path, 'r', encoding='utf-8'))
-        self.th_en_translator = json.load(open(translation_db, 'r', encoding='utf-8'))
-        self.sub_district_dict = {}
-        self.district_dict = {}  # sub_district :[district, province]
+        self.results = {}  # normalized address: parse_scored() result
+        self.resolutions = {}  # (token, level, scope): resolve() result
+        self.similarities = {}  # (name, part of an address): quick_ratio, see confidence()
+        self.counts = {}  # string: Counter of its characters
+
+    def counts_of(self, s):
+        counts = self.counts.get(s)
+        if counts is None:
+            counts = self.counts[s] = Counter(s)
+        return counts
 
+
+class ParseContext(object):
+    def __init__(self, memo=None):
+        """
+        scratch state of a single parse() call, so that one parser instance
+        (and its read-only dictionaries) can be shared by many threads
+        :param memo: BatchMemo of the batch the address belongs to
+        """
+        self.memo = memo
         self.address_list = []
         self.thai_parts = []
         self.thai_parts_index = []
@@ -124,6 +147,113 @@ class ThaiAddressParserClass(object):
         self.o_province = []
         self.o_district = []
         self.o_sub_district = []
+        self.tokens = []
+        self.postcodes = []
+        # area of the last known postcode, see Gazetteer.postcode_area()
+        self.postcode_area = None
+        self.postcode_provinces = []
+        self.postcode_districts = []
+        self.unresolved = []  # levels picked by ThaiAddressParserClass.fallback()
+        self.parts_indexes = {}  # see ThaiAddressParserClass.parts_index()
+        self.trace = None  # stats.ParseTrace when the stats are enabled
+        self.scanned = []  # (name, start, end) found by the gazetteer scanner, see parse_scanned()
+
+    def mark(self, *branch):
+        '''
+        record a branch of the parser in the trace
+        :param branch: parts of its name, only joined with ':' when traced
+        :return:
+        '''
+        if self.trace is not None:
+            self.trace.branches.append(':'.join(branch))
+
+    def compared(self, n):
+        '''
+        record names compared to a token in the trace
+        :param n:
+        :return:
+        '''
+        if self.trace is not None:
+            self.trace.compared += n
+
+    def set_tokens(self, tokens):
+        '''
+        fill the token lists from the output of tokenizer.tokenize()
+        :param tokens:
+        :return:
+        '''
+        self.tokens = tokens
+        # runs for every address, the lists are read once
+        thai_parts = self.thai_parts
+        thai_parts_index = self.thai_parts_index
+        self.address_list.extend([token[0] for token in tokens])
+        for idx, (text, kind, _, _, thai, markers) in enumerate(tokens):
+            if not thai:
+                if kind == POSTCODE:
+                    self.postcodes.append(text)
+                continue
+            part = len(thai_parts)
+            thai_parts.append(text)
+            thai_parts_index.append([text, idx])
+            if kind == TEXT:
+                continue
+            if kind == BANGKOK_MARKER:
+                self.bangkok_flags.append(part)
+            for kind, value in markers:
+                if kind == SUB_DISTRICT:
+                    self.non_bangkok_sub_district_index.append(part)
+                    self.o_sub_district.append(value)
+                elif kind == DISTRICT:
+                    self.non_bangkok_district_index.append(part)
+                    self.o_district.append(value)
+                else:
+                    self.non_bangkok_province_index.append(part)
+                    self.o_province.append(value)
+
+
+class ThaiAddressParserClass(object):
+    def __init__(self,
+                 file_path, translation_db, snapshot_path=None, cache_size=0, token_cache_size=0,
+                 scorer='quick_ratio'):
+        """
+
+        :param file_path: {province:{district:[sub district，，，，，]}}
+        :param snapshot_path: precompiled snapshot of the tables below, used instead of the
+                              json files when it exists and was built from them
+        :param cache_size: size of the LRU cache of parse() results, 0 disables it
+        :param token_cache_size: size of the LRU cache of fuzzy token resolutions, 0 disables it
+        :param scorer: similarity of the fuzzy matches, see set_scorer()
+        """
+        self.cache = None
+        self.token_cache = None
+        self.postcode_matchers = {}  # (postcode area, level): FuzzyIndex, filled on demand
+        self.subtree_matchers = {}  # (province id, district id or None): FuzzyIndex, see subtree_matcher()
+        self.stats = None  # stats.ParseStats, see enable_stats()
+        self.stats_hook = None
+        self.engine = 'python'  # see set_engine()
+        self.scorer = 'quick_ratio'  # see set_scorer()
+        self.scanner = None  # GazetteerScanner, built on first use by get_scanner()
+        self.scanner_lock = threading.Lock()
+        self.set_cache_size(cache_size)
+        self.set_token_cache_size(token_cache_size)
+        if snapshot_path is not None:
+            state = read_snapshot(snapshot_path, [file_path, translation_db])
+            if state is not None:
+                self.__dict__.update(state)
+                self.set_scorer(scorer)
+                return
+        with open(file_path, 'r', encoding='utf-8') as f:
+            dictionary = json.load(f)
+        with open(translation_db, 'r', encoding='utf-8') as f:
+            translator = json.load(f)
+        # one string object per name, shared by every table below (and by the snapshot)
+        self.dictionary = {}
+        for p, districts in dictionary.items():
+            self.dictionary[sys.intern(p)] = {
+                sys.intern(d): [sys.intern(s) for s in sub_districts] for d, sub_districts in districts.items()
+            }
+        # integer id hierarchy, also holds the translations and resolves shared names
+        self.gazetteer = Gazetteer(self.dictionary, translator)
 
         self.bangkok_districts = []
         self.bangkok_sub_districts = []
@@ -136,317 +266,805 @@ class ThaiAddressParserClass(object):
             if p != 'กรุงเทพมหานคร':
                 self.non_bangkok_provinces.append(p)
             for d in temp.keys():
-                self.district_dict[d] = p
                 if p == 'กรุงเทพมหานคร':
                     self.bangkok_districts.append(d)
                 else:
                     self.non_bangkok_districts.append(d)
                 sub_districts = temp[d]
                 for s in sub_districts:
-                    self.sub_district_dict[s] = [d, p]
                     if p == 'กรุงเทพมหานคร':
                         self.bangkok_sub_districts.append(s)
                     else:
                         self.non_bangkok_sub_districts.append(s)
+        self.non_bangkok_province_set = frozenset(self.non_bangkok_provinces)
+        # exact names, with and without เขต / แขวง, of the Bangkok addresses
+        self.bangkok_index = BangkokIndex(self.dictionary['กรุงเทพมหานคร'])
+        # variants of the level words and of the names, rewritten before tokenizing
+        self.normalizer = Normalizer(self.dictionary, translator)
+
+        # prebuilt fuzzy indexes for the scans over whole name lists
+        self.province_matcher = FuzzyIndex(self.dictionary.keys())
+        self.non_bangkok_province_matcher = FuzzyIndex(self.non_bangkok_provinces)
+        self.non_bangkok_district_matcher = FuzzyIndex(self.non_bangkok_districts)
+        self.non_bangkok_sub_district_matcher = FuzzyIndex(self.non_bangkok_sub_districts)
+        self.set_scorer(scorer)
+
+    @property
+    def district_dict(self):
+        '''
+        read-only {district: province}, kept for the code written against the older parsers
+        :return: see Gazetteer.district_map()
+        '''
+        return self.gazetteer.district_map()
+
+    @property
+    def sub_district_dict(self):
+        '''
+        read-only {sub district: [district, province]}, kept for the code written against the older parsers
+        :return: see Gazetteer.sub_district_map()
+        '''
+        return self.gazetteer.sub_district_map()
+
+    @property
+    def th_en_translator(self):
+        '''
+        read-only {Thai name: English name}, kept for the code written against the older parsers
+        :return: see Gazetteer.translation_map()
+        '''
+        return self.gazetteer.translation_map()
+
+    def save_snapshot(self, path, sources):
+        '''
+        write the tables of this parser as a precompiled snapshot
+        :param path:
+        :param sources: json files this parser was built from
+        :return:
+        '''
+        state = {k: v for k, v in self.__dict__.items() if k not in TRANSIENT}
+        # the snapshot must load without the optional engines, and holds the default scorer
+        for attr in MATCHERS:
+            if type(state[attr]) is not FuzzyIndex:
+                state[attr] = FuzzyIndex(state[attr].names)
+        if self.scorer != 'quick_ratio':
+            state['bangkok_index'] = BangkokIndex(self.dictionary['กรุงเทพมหานคร'])
+        write_snapshot(state, path, sources)
+
+    def set_engine(self, engine):
+        '''
+        rebuild the fuzzy indexes with another engine, see fuzzy.index_class(). Every engine
+        gives the same scores, so the results do not change.
+        :param engine: 'python' or 'numpy'
+        :return:
+        '''
+        cls = scorer_class(self.scorer, engine)
+        for attr in MATCHERS:
+            matcher = getattr(self, attr)
+            if type(matcher) is not cls:
+                setattr(self, attr, cls(matcher.names))
+        self.postcode_matchers = {}
+        self.engine = engine
+
+    def set_scorer(self, scorer):
+        '''
+        match the names with another similarity, see similarity.py: 'quick_ratio' (the
+        default), 'levenshtein', 'ngram', 'skeleton' or a FuzzyIndex subclass. The results may
+        change, so the caches are emptied. confidence() and the hypotheses stay on quick_ratio,
+        to keep one scale whatever the scorer.
+        :param scorer:
+        :return:
+        '''
+        if scorer == self.scorer:
+            return
+        cls = scorer_class(scorer, self.engine)
+        self.scorer = scorer
+        for attr in MATCHERS:
+            setattr(self, attr, cls(getattr(self, attr).names))
+        self.postcode_matchers = {}
+        self.subtree_matchers = {}
+        self.bangkok_index = BangkokIndex(self.dictionary['กรุงเทพมหานคร'], scorer_class(scorer))
+        for cache in (self.cache, self.token_cache):
+            if cache is not None:
+                cache.clear()
+
+    def set_cache_size(self, cache_size):
+        '''
+        resize the result cache, 0 disables it. The cache is emptied.
+        :param cache_size:
+        :return:
+        '''
+        self.cache = LRUCache(cache_size) if cache_size > 0 else None
+
+    def cache_info(self):
+        '''
+
+        :return: hits, misses, evictions and size of the result cache, None when disabled
+        '''
+        return self.cache.info() if self.cache is not None else None
+
+    def set_token_cache_size(self, token_cache_size):
+        '''
+        resize the cache of fuzzy token resolutions, 0 disables it. The cache is emptied.
+        :param token_cache_size:
+        :return:
+        '''
+        self.token_cache = LRUCache(token_cache_size) if token_cache_size > 0 else None
+
+    def token_cache_info(self):
+        '''
+
+        :return: hits, misses, evictions and size of the token cache, None when disabled
+        '''
+        return self.token_cache.info() if self.token_cache is not None else None
+
+    def enable_stats(self, hook=None):
+        '''
+        start recording a stats.ParseTrace for every parse() call, the counters are reset
+        :param hook: called with every ParseTrace, from the thread that parsed the address
+        :return:
+        '''
+        self.stats_hook = hook
+        self.stats = ParseStats()
+
+    def disable_stats(self):
+        self.stats = None
+        self.stats_hook = None
+
+    def stats_info(self):
+        '''
+
+        :return: ParseStats.info() of the traces recorded since enable_stats(), None when disabled
+        '''
+        stats = self.stats
+        return stats.info() if stats is not None else None
+
+    def record(self, trace, start):
+        '''
+        close a trace and hand it to the stats and the hook
+        :param trace:
+        :param start: time.perf_counter() at the start of the parse() call
+        :return:
+        '''
+        trace.seconds = time.perf_counter() - start
+        stats = self.stats
+        if stats is not None:
+            stats.record(trace)
+        hook = self.stats_hook
+        if hook is not None:
+            hook(trace)
+
+    def resolve(self, ctx, token, level, scope, candidates):
+        '''
+        best candidate for a token, first one wins ties. Typos recur across many addresses, so
+        the result is memoized on (token, level, scope) in the token cache.
+        :param ctx:
+        :param token:
+        :param level: 'province', 'district' or 'sub_district'
+        :param scope: hashable description of where the candidates come from, the same scope
+                      must always mean the same candidates in the same order
+        :param candidates: list of names, or a FuzzyIndex
+        :return: (name, score)
+        '''
+        def best():
+            ctx.compared(len(candidates))
+            if isinstance(candidates, FuzzyIndex):
+                return candidates.best(token)
+            similarity = scorer_class(self.scorer).similarity
+            res = (None, -1)
+            for c in candidates:
+                degree = similarity(c, token)
+                if degree > res[1]:
+                    res = (c, degree)
+            return res
+
+        return self.memoized(ctx, (token, level, scope), best)
+
+    def memoized(self, ctx, key, compute):
+        '''
+        result of compute() memoized on key in the batch memo and the token cache
+        :param ctx:
+        :param key: hashable, what compute() depends on
+        :param compute: function without argument, never returning None
+        :return:
+        '''
+        memo = ctx.memo.resolutions if ctx.memo is not None else None
+        if memo is not None:
+            res = memo.get(key)
+            if res is not None:
+                return res
+        cache = self.token_cache
+        if cache is not None:
+            res = cache.get(key)
+            if res is not None:
+                if memo is not None:
+                    memo[key] = res
+                return res
+        res = compute()
+        if cache is not None:
+            cache.put(key, res)
+        if memo is not None:
+            memo[key] = res
+        return res
+
+    def resolve_any(self, ctx, tokens, level, scope, candidates):
+        '''
+        best candidate over several tokens, earlier tokens win ties
+        :param ctx:
+        :param tokens:
+        :param level:
+        :param scope:
+        :param candidates:
+        :return: (name, score, index of the token)
+        '''
+        name, max_degree, re_idx = None, -1, 0
+        for idx, token in enumerate(tokens):
+            t_name, degree = self.resolve(ctx, token, level, scope, candidates)
+            if degree > max_degree:
+                name, max_degree, re_idx = t_name, degree, idx
+        return name, max_degree, re_idx
+
+    def locate_postcode(self, ctx):
+        '''
+        area of the last postcode of the address found in the postcode table
+        :param ctx:
+        :return:
+        '''
+        for postcode in reversed(ctx.postcodes):
+            area, p_ids, d_ids = self.gazetteer.postcode_area(postcode)
+            if area is not None:
+                ctx.postcode_area = area
+                ctx.postcode_provinces = [self.gazetteer.province(p_id) for p_id in p_ids]
+                ctx.postcode_districts = d_ids
+                return
+
+    def area_matcher(self, ctx, level, bangkok=False):
+        '''
+        names of a level inside the postcode area of the address
+        :param ctx:
+        :param level: 'province', 'district' or 'sub_district'
+        :param bangkok: keep the Bangkok names
+        :return: FuzzyIndex, None when the address has no postcode or the area has no such name
+        '''
+        if ctx.postcode_area is None:
+            return None
+        key = (ctx.postcode_area, level, bangkok)
+        matcher = self.postcode_matchers.get(key)
+        if matcher is None:
+            g = self.gazetteer
+            provinces = self.area_provinces(ctx, bangkok)
+            d_ids = [d_id for d_id in ctx.postcode_districts if g.province(g.district_province[d_id]) in provinces]
+            if level == 'province':
+                names = provinces
+            elif level == 'district':
+                names = [g.district(d_id) for d_id in d_ids]
+            else:
+                names = [g.sub_district(s_id) for d_id in d_ids for s_id in g.sub_districts_of(d_id)]
+            matcher = scorer_class(self.scorer, self.engine)(names)
+            self.postcode_matchers[key] = matcher
+        return matcher if len(matcher) else None
+
+    def area_provinces(self, ctx, bangkok=False):
+        '''
+
+        :param ctx:
+        :param bangkok: keep Bangkok
+        :return: [provinces of the postcode area of the address]
+        '''
+        if bangkok:
+            return list(ctx.postcode_provinces)
+        return [p for p in ctx.postcode_provinces if p in self.non_bangkok_province_set]
+
+    def scan(self, ctx, tokens, level, bangkok=False):
+        '''
+        best name of a level over several tokens, earlier tokens win ties. The scan is narrowed
+        to the postcode area first and only widened to the whole country (without Bangkok unless
+        asked) when nothing in the area scores POSTCODE_MIN_SCORE, so a wrong postcode does not
+        override the names written in the address.
+        :param ctx:
+        :param tokens:
+        :param level: 'province', 'district' or 'sub_district'
+        :param bangkok: Bangkok names are candidates too, only for level 'province'
+        :return: (name, score, index of the token, provinces the candidates belong to)
+        '''
+        scope = 'all' if bangkok else 'non_bangkok'
+        matcher = self.area_matcher(ctx, level, bangkok)
+        if matcher is not None:
+            name, score, idx = self.resolve_any(ctx, tokens, level, ('postcode', ctx.postcode_area, scope), matcher)
+            if score >= POSTCODE_MIN_SCORE:
+                ctx.mark('scan', level, 'postcode')
+                return name, score, idx, self.area_provinces(ctx, bangkok)
+        ctx.mark('scan', level)
+        if bangkok:
+            matcher = self.province_matcher
+        else:
+            matcher = {
+                'province': self.non_bangkok_province_matcher,
+                'district': self.non_bangkok_district_matcher,
+                'sub_district': self.non_bangkok_sub_district_matcher
+            }[level]
+        name, score, idx = self.resolve_any(ctx, tokens, level, scope, matcher)
+        return name, score, idx, self.non_bangkok_province_set
 
     def parse(self, address):
         '''
 
         :param address: string type
-        :return:
+        :return: [parsed address, detailed address, sub district, district, province]
+        '''
+        return self.parse_scored(address)[0]
+
+    def parse_batch(self, addresses):
+        '''
+        parse_scored() of many addresses sharing their work: an address repeated in the batch is
+        parsed once, and every token resolution and confidence similarity is computed once for
+        the whole batch (whatever the size of the token cache)
+        :param addresses: iterable of strings
+        :return: generator of parse_scored() results, in input order
+        '''
+        memo = BatchMemo()
+        for address in addresses:
+            key = normalize_address(address)
+            scored = memo.results.get(key)
+            if scored is None:
+                scored = memo.results[key] = self.parse_scored(address, memo)
+            yield list(scored[0]), scored[1], list(scored[2])
+
+    def parse_scored(self, address, memo=None):
+        '''
+        parse() with how much the result can be trusted. The same address always gets the same
+        result, so results are cached on the normalized address.
+        :param address: string type
+        :param memo: BatchMemo, see parse_batch()
+        :return: (parse() result, confidence, [unresolved levels]), see confidence() and fallback()
+        '''
+        return self.parse_ranked(address, 0, memo)[:3]
+
+    def parse_ranked(self, address, top_k, memo=None):
         '''
-        self.address_list = address.split(' ')
-        temp = []
-        for idx, i in enumerate(self.address_list):
-            if idx:
-                i = i.strip(' ')
-                if 'กรุงเทพมหานคร' in i:
-                    t = i.index('กรุงเทพมหานคร')
-                    if len(i[:t]):
-                        temp[-1] += i[:t]
-                    temp.append('กรุงเทพมหานคร')
-                elif 'จ.' in i:
-                    t = i.index('จ.')
-                    if len(i[:t]):
-                        temp[-1] += i[:t]
-                    if len(i[(t + 2):]):
-                        temp.append(i[t:])
-                elif 'อ.' in i:
-                    t = i.index('อ.')
-                    if len(i[:t]):
-                        temp[-1] += i[:t]
-                    if len(i[(t + 2):]):
-                        temp.append(i[t:])
-                elif 'ต.' in i:
-                    t = i.index('ต.')
-                    if len(i[:t]):
-                        temp[-1] += ' ' + i[:t]
-                    if len(i[(t + 2):]):
-                        temp.append(i[t:])
+        parse_scored() with the hypotheses that compete with the result
+        :param address: string type
+        :param top_k: number of hypotheses, see hypotheses(), 0 for none
+        :param memo: BatchMemo, see parse_batch()
+        :return: (parse() result, confidence, [unresolved levels], [(sub district, district,
+                 province, score)])
+        '''
+        trace = ParseTrace(address) if self.stats is not None else None
+        if trace is not None:
+            start = time.perf_counter()
+        cache = self.cache
+        key = None
+        if cache is not None:
+            key = normalize_address(address)
+            key = (key, top_k) if top_k else key
+            hit = cache.get(key)
+            if hit is not None:
+                if trace is not None:
+                    trace.cached = True
+                    self.record(trace, start)
+                return list(hit[0]), hit[1], list(hit[2]), list(hit[3])
+        ctx = ParseContext(memo)
+        ctx.trace = trace
+        res = self.parse_address(ctx, address)
+        if trace is not None:
+            t = time.perf_counter()
+        unresolved = [level for level, name in zip(LEVELS, res[-3:]) if level in ctx.unresolved or name == 'null']
+        confidence = 0. if len(unresolved) else self.confidence(ctx, res)
+        if trace is not None:
+            t = trace.lap('confidence', t)
+        hypotheses = self.hypotheses(ctx, res, top_k) if top_k else []
+        if trace is not None and top_k:
+            trace.lap('hypotheses', t)
+        if cache is not None:
+            cache.put(key, (tuple(res), confidence, tuple(unresolved), tuple(hypotheses)))
+        if trace is not None:
+            self.record(trace, start)
+        return res, confidence, unresolved, hypotheses
+
+    def confidence(self, ctx, res):
+        '''
+        how well the address supports a result: for every level the best similarity between its
+        name and a Thai part of the address (or the name written after a marker), the lowest one
+        over the three levels
+        :param ctx: ParseContext the result was parsed with
+        :param res: parse_address() result
+        :return: float, 1 when every name is written as is in the address
+        '''
+        confidence = 1.
+        if ctx.memo is None:
+            index = self.parts_index(ctx, markers=True)
+            for name in res[-3:]:
+                confidence = min(confidence, max(index.scores(name).values(), default=0.))
+            return confidence
+        # in a batch the same names meet the same parts (streets, marker values) over and over
+        memo = ctx.memo
+        similarities = memo.similarities
+        parts = self.parts(ctx, markers=True)
+        for name in res[-3:]:
+            best = 0.
+            for part in parts:
+                key = (name, part)
+                degree = similarities.get(key)
+                if degree is None:
+                    degree = similarities[key] = count_ratio(memo.counts_of(name), memo.counts_of(part),
+                                                             len(name) + len(part))
+                if degree > best:
+                    best = degree
+                    if best >= 1.:
+                        break
+            confidence = min(confidence, best)
+        return confidence
+
+    def hypotheses(self, ctx, res, k):
+        '''
+        the result and the k - 1 other (sub district, district, province) that the address
+        supports best, see ranking.py. The parts are the Thai tokens, the names written after
+        their markers and the names found by the gazetteer scanner.
+        :param ctx: ParseContext the result was parsed with
+        :param res: parse_address() result
+        :param k:
+        :return: [(sub district, district, province, score)], the result first, then the other
+                 hypotheses best first. An other hypothesis scoring close to (or above) the
+                 result means the address is ambiguous.
+        '''
+        parts, spans = self.part_spans(ctx)
+        conflicts = conflicts_of(spans)
+        index = FuzzyIndex(parts)
+        supports = {}
+        scored = {}  # name: ([{position: score} of every part], position) from bounds()
+        g = self.gazetteer
+
+        def support_of(name):
+            support = supports.get(name)
+            if support is None:
+                if name in scored:
+                    part_scores, pos = scored[name]
+                    degrees = ((scores.get(pos, 0.), idx) for idx, scores in enumerate(part_scores))
                 else:
-                    if len(i):
-                        temp.append(i)
-            else:
-                if len(i):
-                    temp.append(i)
-        self.address_list = temp
-        for idx, i in enumerate(self.address_list):
-            i = i.strip(' ')
-            if check_th_chars(i):
-                self.thai_parts.append(i)
-                self.thai_parts_index.append([i, idx])
-                if i == 'กรุงเทพมหานคร':
-                    self.bangkok_flags.append(len(self.thai_parts) - 1)
-                if 'จ.' in i:
-                    self.non_bangkok_province_index.append(len(self.thai_parts) - 1)
-                    t = i.index('จ.')
-                    self.o_province.append(i[(t + 2):])
-                if 'อ.' in i:
-                    self.non_bangkok_district_index.append(len(self.thai_parts) - 1)
-                    t = i.index('อ.')
-                    self.o_district.append(i[(t + 2):])
-                if 'ต.' in i:
-                    self.non_bangkok_sub_district_index.append(len(self.thai_parts) - 1)
-                    t = i.index('ต.')
-                    self.o_sub_district.append(i[(t + 2):])
-        non_bangkok_index = self.non_bangkok_sub_district_index + self.non_bangkok_district_index + \
-                            self.non_bangkok_province_index
-        if len(self.bangkok_flags) and len(non_bangkok_index) == 0:
-            try:
-                res = self.parse_bangkok()
-            except:
-                detailed_address = ' '.join(self.address_list)
-                province = 'กรุงเทพมหานคร'
-                district = random.choice(list(self.dictionary['กรุงเทพมหานคร'].keys()))
-                sub_district = random.choice(list(self.dictionary['กรุงเทพมหานคร'][district]))
-                res = ['{} {} {} {}'.format(detailed_address, sub_district, district, province),
-                       detailed_address, sub_district, district, province]
-        elif len(self.bangkok_flags) == 0 and len(non_bangkok_index):
-            try:
-                res = self.parse_other_province()
-            except:
-                detailed_address = ' '.join(self.address_list)
-                province = random.choice(self.non_bangkok_provinces)
-                district = random.choice(list(self.dictionary[province].keys()))
-                sub_district = random.choice(self.dictionary[province][district])
-                res = ['{} {} {} {}'.format(detailed_address, sub_district, district, province),
-                       detailed_address, sub_district, district, province]
-        elif len(self.bangkok_flags) and len(non_bangkok_index):
+                    ctx.compared(1)
+                    degrees = ((degree, idx) for idx, degree in index.scores(name).items())
+                support = supports[name] = best_parts(degrees)
+            return support
+
+        def bounds(p=None, d=None):
+            # names by their best similarity to a part, from the indexes the joint search scans.
+            # Streets and the names written for a level recur across addresses, so the scores of
+            # a part are memoized like resolve(), and the supports are read from them. The other
+            # scorers are not on the quick_ratio scale of the supports, their names get their support.
+            p_id = g.province_id(p) if p is not None else None
+            d_id = next((i for i in g.district_ids(d) if g.district_province[i] == p_id), None) if d is not None else None
+            names = self.dictionary if p is None else self.dictionary[p] if d is None else self.dictionary[p][d]
+            if self.scorer != 'quick_ratio' or (p is not None and p_id is None) or (d is not None and d_id is None):
+                return sorted(((fit(conflicts, support_of(name)), pos, name) for pos, name in enumerate(names)),
+                              key=lambda x: (-x[0], x[1]))
+            matcher = self.province_matcher if p is None else self.subtree_matcher(p_id, d_id)
+            part_scores = []
+            for part in parts:
+                def scores():
+                    ctx.compared(len(matcher))
+                    return matcher.scores(part)
+
+                part_scores.append(self.memoized(ctx, (part, 'scores', p_id, d_id), scores))
+            best = {}
+            for scores in part_scores:
+                get = best.get
+                for pos, score in scores.items():
+                    if score > get(pos, 0.):
+                        best[pos] = score
+            for pos, name in enumerate(matcher.names):
+                scored.setdefault(name, (part_scores, pos))
+            return sorted(((best.get(pos, 0.), pos, name) for pos, name in enumerate(matcher.names)),
+                          key=lambda x: (-x[0], x[1]))
+
+        result = tuple(res[-3:])
+        score = fit(conflicts, *[support_of(name) for name in result]) / 3
+        ranked = top_hypotheses(self.dictionary, conflicts, support_of, bounds, k - 1, HYPOTHESIS_BEAM,
+                                exclude=result)
+        return [result + (score, )] + ranked
+
+    def part_spans(self, ctx):
+        '''
+        the Thai tokens, the names written after their markers and the names found by the
+        gazetteer scanner, a part written as a whole token is only kept once
+        :param ctx:
+        :return: ([part], [(start, end) of the part in the address joined by spaces])
+        '''
+        parts, spans = [], []
+        start = 0
+        for text, _, _, _, thai, token_markers in ctx.tokens:
+            end = start + len(text)
+            if thai:
+                parts.append(text)
+                spans.append((start, end))
+                for _, value in token_markers:
+                    offset = text.find(value)
+                    parts.append(value)
+                    spans.append((start + offset, start + offset + len(value)) if offset >= 0 else (start, end))
+            start = end + 1
+        for name, start, end in ctx.scanned:
+            if (start, end) not in spans:
+                parts.append(name)
+                spans.append((start, end))
+        return parts, spans
+
+    def parts(self, ctx, markers=False):
+        '''
+
+        :param ctx:
+        :param markers: also keep the names written after จ. / อ. / ต. and the names the
+                        gazetteer scanner found inside the parts
+        :return: [Thai parts of the address]
+        '''
+        parts = []
+        for text, _, _, _, thai, token_markers in ctx.tokens:
+            if thai:
+                parts.append(text)
+                if markers:
+                    parts.extend(value for _, value in token_markers)
+        if markers:
+            parts.extend(name for name, _, _ in ctx.scanned)
+        return parts
+
+    def parts_index(self, ctx, markers=False):
+        '''
+
+        :param ctx:
+        :param markers: also index the names written after จ. / อ. / ต.
+        :return: FuzzyIndex of the Thai parts of the address
+        '''
+        index = ctx.parts_indexes.get(markers)
+        if index is None:
+            index = ctx.parts_indexes[markers] = FuzzyIndex(self.parts(ctx, markers))
+        return index
+
+    def fallback(self, ctx, level, candidates):
+        '''
+        deterministic pick when the address has no token for a level: the candidate closest to a
+        Thai part of the address, the first one on ties. The level is reported as unresolved.
+        :param ctx:
+        :param level: 'province', 'district' or 'sub_district'
+        :param candidates: names
+        :return: name
+        '''
+        if level not in ctx.unresolved:
+            ctx.unresolved.append(level)
+        ctx.mark('fallback', level)
+        ctx.compared(len(candidates))
+        index = self.parts_index(ctx)
+        name, max_degree = candidates[0], 0
+        for c in candidates:
+            degree = max(index.scores(c).values(), default=0)
+            if degree > max_degree:
+                name, max_degree = c, degree
+        return name
+
+    def fallback_address(self, ctx, provinces):
+        '''
+        result of an address whose branch failed, every level left open is picked by fallback()
+        :param ctx:
+        :param provinces: candidate provinces, a single one is taken as resolved
+        :return:
+        '''
+        ctx.unresolved = []
+        detailed_address = ' '.join(ctx.address_list)
+        province = provinces[0] if len(provinces) == 1 else self.fallback(ctx, 'province', provinces)
+        district = self.fallback(ctx, 'district', list(self.dictionary[province].keys()))
+        sub_district = self.fallback(ctx, 'sub_district', self.dictionary[province][district])
+        return ['{} {} {} {}'.format(detailed_address, sub_district, district, province),
+                detailed_address, sub_district, district, province]
+
+    def parse_address(self, ctx, address):
+        '''
+        parse without the result cache
+        :param ctx: ParseContext of this call
+        :param address: string type
+        :return:
+        '''
+        trace = ctx.trace
+        if trace is not None:
+            t = time.perf_counter()
+        address = self.normalizer.normalize(address)
+        if trace is not None:
+            t = trace.lap('normalize', t)
+        ctx.set_tokens(tokenize(address))
+        if trace is not None:
+            t = trace.lap('tokenize', t)
+        self.locate_postcode(ctx)
+        if trace is not None:
+            t = trace.lap('postcode', t)
+        non_bangkok_index = ctx.non_bangkok_sub_district_index + ctx.non_bangkok_district_index + \
+                            ctx.non_bangkok_province_index
+        # (branch, provinces of the fallback when the branch fails, None for all of them)
+        if len(ctx.bangkok_flags) and len(non_bangkok_index) == 0:
+            branch, provinces = 'bangkok', ['กรุงเทพมหานคร']
+        elif len(ctx.bangkok_flags) == 0 and len(non_bangkok_index):
+            branch, provinces = 'other_province', self.non_bangkok_provinces
+        elif len(ctx.bangkok_flags) and len(non_bangkok_index):
             flags = [
-                len(self.non_bangkok_district_index) >= 1,
-                len(self.non_bangkok_sub_district_index) >= 1,
-                len(self.non_bangkok_province_index) >= 1
+                len(ctx.non_bangkok_district_index) >= 1,
+                len(ctx.non_bangkok_sub_district_index) >= 1,
+                len(ctx.non_bangkok_province_index) >= 1
             ]
             if sum(flags) >= 2:
-                try:
-                    res = self.parse_other_province()
-                except:
-                    detailed_address = ' '.join(self.address_list)
-                    province = random.choice(self.non_bangkok_provinces)
-                    district = random.choice(list(self.dictionary[province].keys()))
-                    sub_district = random.choice(self.dictionary[province][district])
-                    res = ['{} {} {} {}'.format(detailed_address, sub_district, district, province),
-                           detailed_address, sub_district, district, province]
+                branch, provinces = 'mixed_other_province', self.non_bangkok_provinces
             else:
-                try:
-                    res = self.parse_bangkok()
-                except:
-                    detailed_address = ' '.join(self.address_list)
-                    province = 'กรุงเทพมหานคร'
-                    district = random.choice(list(self.dictionary['กรุงเทพมหานคร'].keys()))
-                    sub_district = random.choice(list(self.dictionary['กรุงเทพมหานคร'][district]))
-                    res = ['{} {} {} {}'.format(detailed_address, sub_district, district, province),
-                           detailed_address, sub_district, district, province]
+                branch, provinces = 'mixed_bangkok', ['กรุงเทพมหานคร']
         else:
-            try:
-                res = self.parse_none_flags_address()
-            except:
-                detailed_address = ' '.join(self.address_list)
-                province = random.choice(list(self.dictionary.keys()))
-                district = random.choice(list(self.dictionary[province].keys()))
-                sub_district = random.choice(self.dictionary[province][district])
-                res = ['{} {} {} {}'.format(detailed_address, sub_district, district, province),
-                       detailed_address, sub_district, district, province]
+            branch, provinces = 'none_flags', None
+        ctx.mark(branch)
+        try:
+            if branch in ('bangkok', 'mixed_bangkok'):
+                res = self.parse_bangkok(ctx)
+            elif branch == 'none_flags':
+                res = self.parse_none_flags_address(ctx)
+            else:
+                res = self.parse_other_province(ctx)
+        except:
+            if trace is not None:
+                t = trace.lap(branch, t)
+                trace.errors.append(sys.exc_info()[0].__name__)
+            ctx.mark('fallback_address')
+            res = self.fallback_address(ctx, provinces if provinces is not None else list(self.dictionary.keys()))
+            if trace is not None:
+                trace.lap('fallback_address', t)
+            return res
+        if trace is not None:
+            trace.lap(branch, t)
+        return res
 
-        self.address_list = []
-        self.thai_parts = []
-        self.thai_parts_index = []
-        self.bangkok_flags = []
-        self.non_bangkok_province_index = []
-        self.non_bangkok_sub_district_index = []
-        self.non_bangkok_district_index = []
-        self.o_province = []
-        self.o_district = []
-        self.o_sub_district = []
+    def bangkok_parts(self, ctx, bangkok_idx):
+        '''
+        Thai parts in front of a กรุงเทพมหานคร, back to the previous one, read with the Bangkok
+        index. A prefix written apart from its name (เขต วัฒนา) gives its level to the next part.
+        :param ctx:
+        :param bangkok_idx: Thai part index of the กรุงเทพมหานคร
+        :return: [(name, level given by a prefix or None, Thai part index it starts at)], closest
+                 to the กรุงเทพมหานคร first, at most BANGKOK_WINDOW Thai parts
+        '''
+        start = max([idx + 1 for idx in ctx.bangkok_flags if idx < bangkok_idx] + [bangkok_idx - BANGKOK_WINDOW, 0])
+        parts = []
+        prefix = None  # (level, Thai part index) of a lone prefix
+        for idx in range(start, bangkok_idx):
+            level, name = self.bangkok_index.read(ctx.thai_parts[idx])
+            if not len(name):
+                prefix = (level, idx)
+                continue
+            first = idx
+            if prefix is not None and level is None:
+                level, first = prefix
+            prefix = None
+            parts.append((name, level, first))
+        parts.reverse()
+        return parts
 
+    def bangkok_fuzzy(self, ctx, parts, positions, level, scope, candidates):
+        '''
+        best candidate for some parts, the part closest to the กรุงเทพมหานคร wins ties
+        :param ctx:
+        :param parts: bangkok_parts()
+        :param positions: positions in parts of the tokens
+        :param level: 'district' or 'sub_district'
+        :param scope: see resolve()
+        :param candidates: see resolve()
+        :return: (name, position in parts, score)
+        '''
+        ctx.mark('bangkok_scan', level)
+        res = (None, None, -1)
+        for pos in positions:
+            name, degree = self.resolve(ctx, parts[pos][0], level, scope, candidates)
+            if degree > res[2]:
+                res = (name, pos, degree)
         return res
 
-    def parse_bangkok_sub_district(self, district, bangkok_idx):
+    def parse_bangkok_sub_district(self, ctx, district, parts, d_pos):
         '''
 
+        :param ctx:
         :param district:
-        :param bangkok_idx:
-        :return:
+        :param parts: bangkok_parts()
+        :param d_pos: position of the district in parts, None when it was not written
+        :return: (sub district, position in parts, prob), (None, None, 0) when no part is left
         '''
+        # parts written before the district first, then the ones after it
+        positions = [pos for pos, (_, level, _) in enumerate(parts)
+                     if pos != d_pos and level != DISTRICT and (d_pos is None or pos > d_pos)]
+        positions += [pos for pos, (_, level, _) in enumerate(parts)
+                      if d_pos is not None and pos < d_pos and level != DISTRICT]
+        for pos in positions:
+            if district in self.bangkok_index.districts_of(parts[pos][0], parts[pos][1]):
+                return parts[pos][0], pos, 1
+        if not len(positions):
+            return None, None, 0
+        g = self.gazetteer
+        p_id = g.province_id('กรุงเทพมหานคร')
+        d_id = [i for i in g.district_ids(district) if g.district_province[i] == p_id][0]
+        return self.bangkok_fuzzy(ctx, parts, positions[:2], 'sub_district', ('bangkok', district),
+                                  self.subtree_matcher(p_id, d_id))
 
-        if bangkok_idx - 2 >= 0:
-            sub_district_candidate = self.thai_parts[bangkok_idx - 2]
-            if sub_district_candidate in self.dictionary['กรุงเทพมหานคร'][district]:
-                sub_district = sub_district_candidate
-                original_index = self.thai_parts_index[bangkok_idx - 2][1]
-                detailed_address = ' '.join(self.address_list[:original_index])
-                prob = 1
-            else:
-                if bangkok_idx - 3 >= 0:
-                    sub_district_candidate_2 = self.thai_parts[bangkok_idx - 3]
-                    if sub_district_candidate_2 in self.dictionary['กรุงเทพมหานคร'][district]:
-                        sub_district = sub_district_candidate_2
-                        original_index = self.thai_parts_index[bangkok_idx - 3][1]
-                        detailed_address = ' '.join(self.address_list[:original_index])
-                        prob = 1
-                    else:
-                        '''
-                        TODO:test the speed of difflib!
-                        single ratio:0.008 ms
-                        '''
-                        max_degree_1 = 0
-                        sub_1 = sub_district_candidate
-                        max_degree_2 = 0
-                        sub_2 = sub_district_candidate_2
-                        for value in self.dictionary['กรุงเทพมหานคร'][district]:
-                            degree_1 = compute_similarity(
-                                value, sub_district_candidate, mode=1
-                            )
-                            degree_2 = compute_similarity(
-                                value, sub_district_candidate, mode=1
-                            )
-                            # degree_1 = difflib.SequenceMatcher(None, value,
-                            #                                    sub_district_candidate).quick_ratio()
-                            # degree_2 = difflib.SequenceMatcher(None, value,
-                            #                                    sub_district_candidate_2).quick_ratio()
-                            if degree_1 > max_degree_1:
-                                max_degree_1 = degree_1
-                                sub_1 = value
-                            if degree_2 > max_degree_2:
-                                max_degree_2 = degree_2
-                                sub_2 = value
-
-                        if max_degree_1 >= max_degree_2:
-                            sub_district = sub_1
-                            original_index = self.thai_parts_index[bangkok_idx - 2][1]
-                            detailed_address = ' '.join(self.address_list[:original_index])
-                            prob = max_degree_1
-                        else:
-                            sub_district = sub_2
-                            original_index = self.thai_parts_index[bangkok_idx - 3][1]
-                            detailed_address = ' '.join(self.address_list[:original_index])
-                            prob = max_degree_2
-                else:
-                    max_degree_1 = 0
-                    sub_1 = sub_district_candidate
-                    for value in self.dictionary['กรุงเทพมหานคร'][district]:
-                        degree_1 = compute_similarity(value, sub_district_candidate, mode=1)
-                        # degree_1 = difflib.SequenceMatcher(None, value,
-                        #                                    sub_district_candidate).quick_ratio()
-                        if degree_1 > max_degree_1:
-                            max_degree_1 = degree_1
-                            sub_1 = value
-                    sub_district = sub_1
-                    original_index = self.thai_parts_index[bangkok_idx - 2][1]
-                    detailed_address = ' '.join(self.address_list[:original_index])
-                    prob = max_degree_1
+    def parse_bangkok_district_sub_district_detailed_address(self, ctx, bangkok_idx):
+        '''
+        district, sub district and detailed address written in front of a กรุงเทพมหานคร. Parts read
+        as a name by the Bangkok index are taken as is: the district closest to the กรุงเทพมหานคร, or
+        the district of a sub district. The fuzzy search only runs on the parts that miss.
+        :param ctx:
+        :param bangkok_idx: Thai part index of the กรุงเทพมหานคร
+        :return: (district, sub district, detailed address, prob), prob is the product of the
+                 similarities of both names
+        '''
+        index = self.bangkok_index
+        parts = self.bangkok_parts(ctx, bangkok_idx)
+        if not len(parts):
+            district = self.fallback(ctx, 'district', self.bangkok_districts)
+            sub_district = self.fallback(ctx, 'sub_district', self.dictionary['กรุงเทพมหานคร'][district])
+            original_index = ctx.thai_parts_index[bangkok_idx][1]
+            detailed_address = ' '.join(ctx.address_list[:original_index])
+            return district, sub_district, detailed_address, 0
+        d_pos = next((pos for pos, (name, level, _) in enumerate(parts) if index.is_district(name, level)), None)
+        if d_pos is not None:
+            district = parts[d_pos][0]
+            sub_district, s_pos, prob = self.parse_bangkok_sub_district(ctx, district, parts, d_pos)
         else:
-            original_index = self.thai_parts_index[bangkok_idx - 1][1]
-            sub_district = random.choice(self.dictionary['กรุงเทพมหานคร'][district])
-            detailed_address = ' '.join(self.address_list[:original_index])
-            prob = 0
-        return sub_district, detailed_address, prob
-
-    def parse_bangkok_district_sub_district_detailed_address(self, bangkok_idx):
-        if bangkok_idx - 1 >= 0:
-            district_candidate = self.thai_parts[bangkok_idx - 1]
-            if district_candidate in self.bangkok_districts:
-                district = district_candidate
-                sub_district, detailed_address, sub_district_prob = self.parse_bangkok_sub_district(district,
-                                                                                                    bangkok_idx)
-                prob = sub_district_prob
+            s_pos = next((pos for pos, (name, level, _) in enumerate(parts) if len(index.districts_of(name, level))),
+                         None)
+            positions = [pos for pos, (_, level, _) in enumerate(parts) if pos != s_pos and level != SUB_DISTRICT]
+            # a district written with เขต / อ. is the only candidate, else the two parts closest
+            # to the กรุงเทพมหานคร, like the layout sub district, district, กรุงเทพมหานคร
+            positions = [pos for pos in positions if parts[pos][1] == DISTRICT] or positions[:2]
+            if s_pos is not None:
+                sub_district = parts[s_pos][0]
+                districts = index.districts_of(sub_district)
+                district, d_pos, prob = districts[0], None, 1
+                if len(districts) > 1 and len(positions):
+                    district, d_pos, prob = self.bangkok_fuzzy(
+                        ctx, parts, positions, 'district', ('bangkok', 'districts of', sub_district), districts)
             else:
-                if bangkok_idx - 2 >= 0:
-                    district_candidate_2 = self.thai_parts[bangkok_idx - 2]
-                    if district_candidate_2 in self.bangkok_districts:
-                        district = district_candidate_2
-                        sub_district, detailed_address, sub_district_prob = self.parse_bangkok_sub_district(district,
-                                                                                                            bangkok_idx - 1)
-                        prob = sub_district_prob
-                    else:
-                        max_degree_1 = 0
-                        district_1 = district_candidate
-                        max_degree_2 = 0
-                        district_2 = district_candidate_2
-                        for value in self.bangkok_districts:
-                            degree_1 = compute_similarity(value, district_candidate, mode=1)
-                            degree_2 = compute_similarity(value, district_candidate, mode=1)
-                            # degree_1 = difflib.SequenceMatcher(None, value,
-                            #                                    district_candidate).quick_ratio()
-                            # degree_2 = difflib.SequenceMatcher(None, value,
-                            #                                    district_candidate_2).quick_ratio()
-                            if degree_1 > max_degree_1:
-                                max_degree_1 = degree_1
-                                district_1 = value
-                            if degree_2 > max_degree_2:
-                                max_degree_2 = degree_2
-                                district_2 = value
-                        if max_degree_1 >= max_degree_2:
-                            district = district_1
-                            sub_district, detailed_address, sub_district_prob = self.parse_bangkok_sub_district(
-                                district,
-                                bangkok_idx)
-                            prob = max_degree_1 * sub_district_prob
-                        else:
-                            district = district_2
-                            sub_district, detailed_address, sub_district_prob = self.parse_bangkok_sub_district(
-                                district,
-                                bangkok_idx - 1)
-                            prob = max_degree_2 * sub_district_prob
-                else:
-                    max_degree_1 = 0
-                    district_1 = district_candidate
-                    for value in self.bangkok_districts:
-                        degree_1 = compute_similarity(value, district_candidate, mode=1)
-                        # degree_1 = difflib.SequenceMatcher(None, value,
-                        #                                    district_candidate).quick_ratio()
-                        if degree_1 > max_degree_1:
-                            max_degree_1 = degree_1
-                            district_1 = value
-                    district = district_1
-                    sub_district, detailed_address, sub_district_prob = self.parse_bangkok_sub_district(district,
-                                                                                                        bangkok_idx)
-                    prob = max_degree_1 * sub_district_prob
-        else:
-            district = random.choice(self.bangkok_districts)
-            sub_district = random.choice(self.dictionary['กรุงเทพมหานคร'][district])
-            original_index = self.thai_parts_index[bangkok_idx][1]
-            detailed_address = ' '.join(self.address_list[:original_index])
-            prob = 0
+                # each part read as the district, with the sub district the other parts give in it,
+                # or the parts read as a sub district alone. The highest sum of similarities wins
+                # (a level left out counts 0), the part closest to the กรุงเทพมหานคร on ties.
+                ctx.mark('bangkok_scan', 'district')
+                best = None
+                for pos in positions or [0]:
+                    name, degree = self.resolve(ctx, parts[pos][0], 'district', ('bangkok', 'district'),
+                                                index.district_matcher)
+                    sub_district, s_pos, s_prob = self.parse_bangkok_sub_district(ctx, name, parts, pos)
+                    if best is None or degree + s_prob > best[0]:
+                        best = (degree + s_prob, name, pos, sub_district, s_pos, degree * s_prob)
+                positions = [pos for pos, (_, level, _) in enumerate(parts) if level != DISTRICT][:2]
+                if len(positions) and best[0] < 1:  # a sub district alone scores 1 at most
+                    name, pos, s_prob = self.bangkok_fuzzy(ctx, parts, positions, 'sub_district',
+                                                           ('bangkok', 'sub_district'), index.sub_district_matcher)
+                    if s_prob > best[0]:
+                        best = (s_prob, index.districts_of(name)[0], None, name, pos, s_prob)
+                _, district, d_pos, sub_district, s_pos, prob = best
+        if sub_district is None:
+            sub_district = self.fallback(ctx, 'sub_district', self.dictionary['กรุงเทพมหานคร'][district])
+        used = [parts[pos][2] for pos in (d_pos, s_pos) if pos is not None]
+        original_index = ctx.thai_parts_index[min(used)][1]
+        detailed_address = ' '.join(ctx.address_list[:original_index])
         return district, sub_district, detailed_address, prob
 
-    def parse_bangkok(self):
+    def parse_bangkok(self, ctx):
         province = 'กรุงเทพมหานคร'
+        # a sub district and a district run together (คลองตันเหนือวัฒนา กทม.) are no part the Bangkok
+        # index reads, the scanner finds them when all three levels are written exactly
+        if any(self.bangkok_index.glued(part) for part in ctx.thai_parts):
+            res = self.parse_scanned(ctx, least=3, province=province)
+            if res is not None:
+                return res
         district = 'null'
         sub_district = 'null'
         detailed_address = 'null'
-        if len(self.bangkok_flags) == 1:
-            bangkok_idx = self.bangkok_flags[0]
+        if len(ctx.bangkok_flags) == 1:
+            bangkok_idx = ctx.bangkok_flags[0]
             district, sub_district, detailed_address, prob = self.parse_bangkok_district_sub_district_detailed_address(
-                bangkok_idx)
+                ctx, bangkok_idx)
 
         else:
             max_prob = 0
-            for idx in self.bangkok_flags:
+            for idx in ctx.bangkok_flags:
                 t_district, t_sub_district, t_detailed_address, \
                 prob = self.parse_bangkok_district_sub_district_detailed_address(
-                    idx)
+                    ctx, idx)
                 if prob >= max_prob:
+                    max_prob = prob
                     district = t_district
                     sub_district = t_sub_district
                     detailed_address = t_detailed_address
@@ -455,566 +1073,382 @@ class ThaiAddressParserClass(object):
                   detailed_address, sub_district, district, province]
         return result
 
-    def parse_other_province(self):
-        province = 'null'
-        district = 'null'
-        sub_district = 'null'
-        detailed_address = 'null'
-        if len(self.o_province) and len(self.o_district):
-            inter_provinces = list(set(self.o_province) & set(self.non_bangkok_provinces))
-            if len(inter_provinces):
-                district_candidates = []
-                for p in inter_provinces:
-                    district_candidates += list(self.dictionary[p].keys())
-                inter_districts = list(set(district_candidates) & set(self.o_district))
-                if len(inter_districts):
-                    sub_district_temp = []
-                    for d in inter_districts:
-                        p = self.district_dict[d]
-                        sub_district_temp += self.dictionary[p][d]
-                    inter_sub_districts = list(set(self.o_sub_district) & set(sub_district_temp))
-                    if len(inter_sub_districts):
-                        sub_district = inter_sub_districts[0]
-                        district, province = self.sub_district_dict[sub_district]
-                        idx = self.o_sub_district.index(sub_district)
-                        idx = self.non_bangkok_sub_district_index[idx]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        if len(self.o_sub_district):
-                            lens = [len(i) for i in self.o_sub_district]
-                            max_index = lens.index(max(lens))
-                            sub_district_candidate = self.o_sub_district[max_index]
-                            max_degree = -1
-                            for j in sub_district_temp:
-                                degree = compute_similarity(j,
-                                                            sub_district_candidate, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = j
-                            idx = self.non_bangkok_sub_district_index[max_index]
-                            district, province = self.sub_district_dict[sub_district]
-                            original_idx = self.thai_parts_index[idx][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            district = inter_districts[0]
-                            province = self.district_dict[district]
-                            sub_district_candidates = self.dictionary[province][district]
-                            d_idx = self.o_district.index(district)
-                            d_idx = self.non_bangkok_district_index[d_idx]
-                            if d_idx - 1 >= 0:
-                                selected_sub_district = self.thai_parts[d_idx - 1]
-                                max_degree = -1
-                                for s in sub_district_candidates:
-                                    degree = compute_similarity(selected_sub_district, s, mode=1)
-                                    if degree > max_degree:
-                                        max_degree = degree
-                                        sub_district = s
-                                original_idx = self.thai_parts_index[d_idx - 1][1]
-                                detailed_address = ' '.join(self.address_list[:original_idx])
-                            else:
-                                sub_district = random.choice(sub_district_candidates)
-                                original_idx = self.thai_parts_index[d_idx][1]
-                                detailed_address = ' '.join(self.address_list[:original_idx])
-                else:
-                    max_degree = -1
-                    re_idx = 0
-                    for d_idx, d in enumerate(self.o_district):
-                        for j in district_candidates:
-                            degree = compute_similarity(j, d, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                district = j
-                                re_idx = d_idx
-                    province = self.district_dict[district]
-                    sub_district_candidates = self.dictionary[province][district]
-                    if len(self.o_sub_district):
-                        lens = [len(i) for i in self.o_sub_district]
-                        max_index = lens.index(max(lens))
-                        sub_district_candidate = self.o_sub_district[max_index]
-                        max_degree = -1
-                        for j in sub_district_candidates:
-                            degree = compute_similarity(j, sub_district_candidate, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                sub_district = j
-                        idx = self.non_bangkok_sub_district_index[max_index]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        d_idx = self.non_bangkok_district_index[re_idx]
-                        if d_idx - 1 >= 0:
-                            sub_district_candidate = self.thai_parts[d_idx - 1]
-                            max_degree = -1
-                            for j in sub_district_candidates:
-                                degree = compute_similarity(j, sub_district_candidate, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = j
-                            original_idx = self.thai_parts_index[d_idx - 1][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            sub_district = random.choice(sub_district_candidates)
-                            original_idx = self.thai_parts_index[d_idx][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-            else:
-                inter_districts = list(set(self.o_district) & set(self.non_bangkok_districts))
-                if len(inter_districts):
-                    district = inter_districts[0]
-                    province = self.district_dict[district]
-                    sub_district_candidates = self.dictionary[province][district]
-                    if len(self.o_sub_district):
-                        lens = [len(i) for i in self.o_sub_district]
-                        max_index = lens.index(max(lens))
-                        sub_district_candidate = self.o_sub_district[max_index]
-                        max_degree = -1
-                        for j in sub_district_candidates:
-                            degree = compute_similarity(j, sub_district_candidate, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                sub_district = j
-                        idx = self.non_bangkok_sub_district_index[max_index]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        d_idx = self.o_district.index(district)
-                        d_idx = self.non_bangkok_district_index[d_idx]
-                        if d_idx - 1 >= 0:
-                            selected_sub_district = self.thai_parts[d_idx - 1]
-                            max_degree = -1
-                            for s in sub_district_candidates:
-                                degree = compute_similarity(selected_sub_district, s, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = s
-                            original_idx = self.thai_parts_index[d_idx - 1][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            sub_district = random.choice(sub_district_candidates)
-                            original_idx = self.thai_parts_index[d_idx][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                else:
-                    max_degree = -1
-                    for p in self.o_province:
-                        for j in self.non_bangkok_provinces:
-                            degree = compute_similarity(p, j, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                province = j
-                    district_candidates = list(self.dictionary[province].keys())
-                    max_degree = -1
-                    re_idx = 0
-                    for d_idx, d in enumerate(self.o_district):
-                        for j in district_candidates:
-                            degree = compute_similarity(j, d, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                district = j
-                                re_idx = d_idx
-                    sub_district_candidates = self.dictionary[province][district]
-                    if len(self.o_sub_district):
-                        lens = [len(i) for i in self.o_sub_district]
-                        max_index = lens.index(max(lens))
-                        sub_district_candidate = self.o_sub_district[max_index]
-                        max_degree = -1
-                        for j in sub_district_candidates:
-                            degree = compute_similarity(j, sub_district_candidate, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                sub_district = j
-                        idx = self.non_bangkok_sub_district_index[max_index]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        if re_idx - 1 >= 0:
-                            selected_sub_district = self.thai_parts[re_idx - 1]
-                            max_degree = -1
-                            for s in sub_district_candidates:
-                                degree = compute_similarity(selected_sub_district, s, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = s
-                            original_idx = self.thai_parts_index[re_idx - 1][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            sub_district = random.choice(sub_district_candidates)
-                            original_idx = self.thai_parts_index[re_idx][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-
-        elif len(self.o_province) and len(self.o_district) == 0:
-            if len(self.o_sub_district):
-                inter_provinces = list(set(self.o_province) & set(self.non_bangkok_provinces))
-                if len(inter_provinces):
-                    temp_districts = []
-                    temp_sub_districts = []
-                    for p in inter_provinces:
-                        temp_districts += list(self.dictionary[p].keys())
-                        for d in self.dictionary[p].keys():
-                            temp_sub_districts += self.dictionary[p][d]
-                    inter_sub_districts = list(set(self.o_sub_district) & set(temp_sub_districts))
-                    if len(inter_sub_districts):
-                        sub_district = inter_sub_districts[0]
-                        district, province = self.sub_district_dict[sub_district]
-                        idx = self.o_sub_district.index(sub_district)
-                        idx = self.non_bangkok_sub_district_index[idx]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        max_degree = -1
-                        re_idx = 0
-                        for idx, i in enumerate(self.o_sub_district):
-                            for j in temp_sub_districts:
-                                degree = compute_similarity(i, j, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = j
-                                    re_idx = idx
-                        district, province = self.sub_district_dict[sub_district]
-                        idx = self.non_bangkok_sub_district_index[re_idx]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                else:
-                    max_degree = -1
-                    for p in self.o_province:
-                        for t in self.non_bangkok_provinces:
-                            degree = compute_similarity(p, t, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                province = t
-                    temp_sub_districts = []
-                    for d in self.dictionary[province].keys():
-                        temp_sub_districts += self.dictionary[province][d]
-                    inter_sub_districts = list(set(self.o_sub_district) & set(temp_sub_districts))
-                    if len(inter_sub_districts):
-                        sub_district = inter_sub_districts[0]
-                        district, province = self.sub_district_dict[sub_district]
-                        idx = self.o_sub_district.index(sub_district)
-                        idx = self.non_bangkok_sub_district_index[idx]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        max_degree = -1
-                        re_idx = 0
-                        for idx, i in enumerate(self.o_sub_district):
-                            for j in temp_sub_districts:
-                                degree = compute_similarity(i, j, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = j
-                                    re_idx = idx
-                        district, province = self.sub_district_dict[sub_district]
-                        idx = self.non_bangkok_sub_district_index[re_idx]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-            else:
-                inter_provinces = list(set(self.o_province) & set(self.non_bangkok_provinces))
-                if len(inter_provinces):
-                    temp_districts = []
-                    temp_sub_districts = []
-                    province = inter_provinces[0]
-                    temp_districts += list(self.dictionary[province].keys())
-                    for d in self.dictionary[province].keys():
-                        temp_sub_districts += self.dictionary[province][d]
-                    p_idx = self.o_province.index(province)
-                    p_idx = self.non_bangkok_province_index[p_idx]
-                    if p_idx - 2 >= 0:
-                        sub_district_candidate = self.thai_parts[p_idx - 2]
-                        if sub_district_candidate in temp_sub_districts:
-                            sub_district = sub_district_candidate
-                            district, province = self.sub_district_dict[sub_district]
-                            original_idx = self.thai_parts_index[p_idx - 2][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            max_degree = -1
-                            for x in temp_sub_districts:
-                                degree = compute_similarity(sub_district_candidate, x)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = x
-                            district, province = self.sub_district_dict[sub_district]
-                            original_idx = self.thai_parts_index[p_idx - 2][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        if p_idx - 1 >= 0:
-                            district_candidate = self.thai_parts[p_idx - 1]
-                            max_degree = -1
-                            for d in temp_districts:
-                                degree = compute_similarity(district_candidate, d, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    district = d
-                            sub_district = random.choice(self.dictionary[province][district])
-                            original_idx = self.thai_parts_index[p_idx - 1][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            district = random.choice(temp_districts)
-                            sub_district = random.choice(self.dictionary[province][district])
-                            original_idx = self.thai_parts_index[p_idx][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                else:
-                    max_degree = -1
-                    re_idx = 0
-                    for p_idx, p in enumerate(self.o_province):
-                        for t in self.non_bangkok_provinces:
-                            degree = compute_similarity(p, t, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                province = t
-                                re_idx = p_idx
-                    temp_sub_districts = []
-                    temp_districts = []
-                    for d in self.dictionary[province].keys():
-                        temp_districts.append(d)
-                        temp_sub_districts += self.dictionary[province][d]
-                    p_idx = self.non_bangkok_province_index[re_idx]
-                    if p_idx - 2 >= 0:
-                        sub_district_candidate = self.thai_parts[p_idx - 2]
-                        if sub_district_candidate in temp_sub_districts:
-                            sub_district = sub_district_candidate
-                            district, province = self.sub_district_dict[sub_district]
-                            original_idx = self.thai_parts_index[p_idx - 2][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            max_degree = -1
-                            for x in temp_sub_districts:
-                                degree = compute_similarity(sub_district_candidate, x)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = x
-                            district, province = self.sub_district_dict[sub_district]
-                            original_idx = self.thai_parts_index[p_idx - 2][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        if p_idx - 1 >= 0:
-                            district_candidate = self.thai_parts[p_idx - 1]
-                            max_degree = -1
-                            for d in temp_districts:
-                                degree = compute_similarity(district_candidate, d, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    district = d
-                            sub_district = random.choice(self.dictionary[province][district])
-                            original_idx = self.thai_parts_index[p_idx - 1][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            district = random.choice(temp_districts)
-                            sub_district = random.choice(self.dictionary[province][district])
-                            original_idx = self.thai_parts_index[p_idx][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-
-        elif len(self.o_province) == 0 and len(self.o_district):
-            inter_districts = list(set(self.o_district) & set(self.non_bangkok_districts))
-            if len(inter_districts):
-                temp_sub_districts = []
-                for j in inter_districts:
-                    j_p = self.district_dict[j]
-                    j_sub_districts = self.dictionary[j_p][j]
-                    temp_sub_districts += j_sub_districts
-                inter_sub_districts = list(set(self.o_sub_district) & set(temp_sub_districts))
-                if len(inter_sub_districts):
-                    sub_district = inter_sub_districts[0]
-                    district, province = self.sub_district_dict[sub_district]
-                    idx = self.o_sub_district.index(sub_district)
-                    idx = self.non_bangkok_sub_district_index[idx]
-                    original_idx = self.thai_parts_index[idx][1]
-                    detailed_address = ' '.join(self.address_list[:original_idx])
-                else:
-                    if len(self.o_sub_district):
-                        max_degree = -1
-                        selected_o_sub_district = self.o_sub_district[0]
-                        for i in self.o_sub_district:
-                            for j in temp_sub_districts:
-                                degree = compute_similarity(i, j, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = j
-                                    selected_o_sub_district = i
-                        idx = self.o_sub_district.index(selected_o_sub_district)
-                        idx = self.non_bangkok_sub_district_index[idx]
-                        original_idx = self.thai_parts_index[idx][1]
-                        district, province = self.sub_district_dict[sub_district]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        district = inter_districts[0]
-                        province = self.district_dict[district]
-                        all_sub_districts = self.dictionary[province][district]
-                        idx = self.o_district.index(district)
-                        idx = self.non_bangkok_district_index[idx]
-                        if idx - 1 >= 0:
-                            max_degree = -1
-                            sub_district = self.thai_parts[idx - 1]
-                            for sub_district_candidate in all_sub_districts:
-                                degree = compute_similarity(sub_district_candidate,
-                                                            self.thai_parts[idx - 1], mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    sub_district = sub_district_candidate
-                            original_idx = self.thai_parts_index[idx - 1][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
-                        else:
-                            sub_district = random.choice(all_sub_districts)
-                            original_idx = self.thai_parts_index[idx][1]
-                            detailed_address = ' '.join(self.address_list[:original_idx])
+    def subtree_matcher(self, p_id, d_id=None):
+        '''
+
+        :param p_id: province id
+        :param d_id: district id
+        :return: FuzzyIndex of the districts of the province, or of the sub districts of the
+                 district, built on first use
+        '''
+        key = (p_id, d_id)
+        matcher = self.subtree_matchers.get(key)
+        if matcher is None:
+            g = self.gazetteer
+            if d_id is None:
+                names = [g.district(i) for i in g.districts_of(p_id)]
             else:
-                if len(self.o_sub_district):
-                    inter_sub_districts = list(set(self.o_sub_district) & set(self.non_bangkok_sub_districts))
-                    max_degree = -1
-                    if len(inter_sub_districts):
-                        for i in inter_sub_districts:
-                            d, p = self.sub_district_dict[i]
-                            for j in self.o_district:
-                                degree = compute_similarity(j, d, mode=1)
-                                if degree > max_degree:
-                                    max_degree = degree
-                                    district = d
-                                    sub_district = i
-                                    province = p
-                        idx = self.o_sub_district.index(sub_district)
-                        idx = self.non_bangkok_sub_district_index[idx]
-                        original_idx = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_idx])
-                    else:
-                        district_candidates = self.o_district
-                        lens = [len(i) for i in district_candidates]
-                        max_index = lens.index(max(lens))
-                        district_candidate = district_candidates[max_index]
-                        max_degree = -1
-                        for j in self.non_bangkok_districts:
-                            degree = compute_similarity(district_candidate,
-                                                        j, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                district = j
-                        province = self.district_dict[district]
-                        sub_district_candidates = self.dictionary[province][district]
-                        sub_districts_lens = [len(i) for i in self.o_sub_district]
-                        max_index = sub_districts_lens.index(max(sub_districts_lens))
-                        selected_sub_district = self.o_sub_district[max_index]
-                        max_degree = -1
-                        for s in sub_district_candidates:
-                            degree = compute_similarity(s, selected_sub_district, mode=1)
-                            if degree > max_degree:
-                                sub_district = s
-                        idx = self.non_bangkok_sub_district_index[max_index]
-                        original_index = self.thai_parts_index[idx][1]
-                        detailed_address = ' '.join(self.address_list[:original_index])
-                else:
-                    district_candidates = self.o_district
-                    lens = [len(i) for i in district_candidates]
-                    max_index = lens.index(max(lens))
-                    district_candidate = district_candidates[max_index]
-                    max_degree = -1
-                    for j in self.non_bangkok_districts:
-                        degree = compute_similarity(district_candidate,
-                                                    j, mode=1)
-                        if degree > max_degree:
-                            max_degree = degree
-                            district = j
-                    province = self.district_dict[district]
-                    sub_district_candidates = self.dictionary[province][district]
-                    idx = self.non_bangkok_district_index[max_index]
-                    if idx - 1 >= 0:
-                        sub_district_temp = self.thai_parts[idx - 1]
-                        max_degree = -1
-                        for s in sub_district_candidates:
-                            degree = compute_similarity(s,
-                                                        sub_district_temp, mode=1)
-                            if degree > max_degree:
-                                max_degree = degree
-                                sub_district = s
-                        detailed_address = ' '.join(self.address_list[:(self.thai_parts_index[idx - 1][1])])
-                    else:
-                        sub_district = random.choice(sub_district_candidates)
-                        detailed_address = ' '.join(self.address_list[:(self.thai_parts_index[idx][1])])
+                names = [g.sub_district(i) for i in g.sub_districts_of(d_id)]
+            # a few dozen names at most, the inverted index beats any engine there
+            matcher = self.subtree_matchers[key] = scorer_class(self.scorer)(names)
+        return matcher
+
+    def level_scores(self, ctx, tokens, matcher):
+        '''
+        best similarity of the names of a matcher to the tokens written for a level
+        :param ctx:
+        :param tokens:
+        :param matcher: FuzzyIndex
+        :return: {name position: (score, index of the token)} of the names sharing a character
+                 with a token, earlier tokens win ties
+        '''
+        ctx.compared(len(tokens) * len(matcher))
+        if len(tokens) == 1:
+            return {pos: (score, 0) for pos, score in matcher.scores(tokens[0]).items()}
+        scores = {}
+        for t_idx, token in enumerate(tokens):
+            for pos, score in matcher.scores(token).items():
+                if pos not in scores or score > scores[pos][0]:
+                    scores[pos] = (score, t_idx)
+        return scores
+
+    def joint_search(self, ctx, evidence, p_ids, d_ids=None):
+        '''
+        (sub district, district, province) with the highest total similarity to the tokens written
+        for each level. The highest level with tokens is walked best first over all its candidates,
+        the levels below are only scored inside the subtrees that can still beat the best triple
+        found, their bound being 1 per level with tokens. Districts are walked best first too, names
+        written as is first, so an address written right compares no name at all. A level whose
+        tokens are all written as is is only scored further when the nearest name to them (see
+        FuzzyIndex.nearest(), a property of the gazetteer memoized in its index) can still make
+        the best triple. The first best triple wins ties.
+        :param ctx:
+        :param evidence: ([sub district tokens], [district tokens], [province tokens])
+        :param p_ids: candidate province ids
+        :param d_ids: candidate district ids, None for every district of the provinces
+        :return: (total, [(id, score, index of the token)] for the sub district, district and
+                 province), (-1, None) when no candidate has a sub district
+        '''
+        g = self.gazetteer
+        s_tokens, d_tokens, p_tokens = evidence
+        p_ids = frozenset(p_ids)
+        zero = (0., 0)
+        s_bound = 1. if len(s_tokens) else 0.
+        d_bound = 1. if len(d_tokens) else 0.
+        wide = max(level for level, tokens in enumerate(evidence) if len(tokens))
+        if wide == 2:
+            matcher = self.province_matcher
+        else:
+            matcher = self.area_matcher(ctx, LEVELS[wide]) if d_ids is not None else None
+            if matcher is None:
+                matcher = self.non_bangkok_district_matcher if wide == 1 else self.non_bangkok_sub_district_matcher
+        best = (-1., None)
+
+        def best_first(tokens, matcher, rest):
+            # (position, (score, index of the token)) of the names of a level, best first. Names
+            # written as is come first, the whole level is only scored when the best other name
+            # plus the most the other levels can add (rest) can still beat the best triple found.
+            # An other name scores at most 1 to a misspelled token, and at most the nearest name
+            # of the index to a token written as is.
+            exact = {}
+            bound = 0.
+            for t_idx, token in enumerate(tokens):
+                positions = matcher.positions(token)
+                for pos in positions:
+                    exact.setdefault(pos, (1., t_idx))
+                bound = max(bound, matcher.nearest(token) if len(positions) else 1.)
+            for pos in sorted(exact):
+                yield pos, exact[pos]
+            if len(tokens) and bound + rest <= best[0]:
+                return
+            scores = self.level_scores(ctx, tokens, matcher) if len(tokens) else {}
+            for pos in ranked(scores, len(matcher)):
+                if pos not in exact:
+                    yield pos, scores.get(pos, zero)
+
+        def allowed(d_id):
+            return g.district_province[d_id] in p_ids and (d_ids is None or d_id in d_ids)
 
+        def sub_district(d_id):
+            s_ids = g.sub_districts_of(d_id)
+            if not len(s_ids) or not len(s_tokens):
+                return (s_ids[0], ) + zero if len(s_ids) else None
+            pos, score = next(best_first(s_tokens, self.subtree_matcher(g.district_province[d_id], d_id), float('inf')))
+            return (s_ids[pos], ) + score
+
+        def below(d_id, d_score, p_score, best):
+            s = sub_district(d_id)
+            if s is not None and p_score[0] + d_score[0] + s[1] > best[0]:
+                p_id = g.district_province[d_id]
+                return p_score[0] + d_score[0] + s[1], [s, (d_id, ) + d_score, (p_id, ) + p_score]
+            return best
+
+        if wide == 2:
+            for pos, p_score in best_first(p_tokens, matcher, d_bound + s_bound):
+                p_id = g.province_id(matcher.names[pos])
+                if p_id not in p_ids:
+                    continue
+                if p_score[0] + d_bound + s_bound <= best[0]:
+                    break
+                first = g.districts_of(p_id)[0]
+                for d_pos, d_score in best_first(d_tokens, self.subtree_matcher(p_id), p_score[0] + s_bound):
+                    if p_score[0] + d_score[0] + s_bound <= best[0]:
+                        break
+                    if allowed(first + d_pos):
+                        best = below(first + d_pos, d_score, p_score, best)
+        elif wide == 1:
+            for pos, d_score in best_first(d_tokens, matcher, s_bound):
+                if d_score[0] + s_bound <= best[0]:
+                    break
+                for d_id in g.district_ids(matcher.names[pos]):
+                    if allowed(d_id):
+                        best = below(d_id, d_score, zero, best)
         else:
-            sub_district_candidates = self.o_sub_district
-            inter_sub_districts = list(set(sub_district_candidates) & set(self.non_bangkok_sub_districts))
-            if len(inter_sub_districts):
-                sub_district = inter_sub_districts[0]
-                district, province = self.sub_district_dict[sub_district]
-                idx = self.o_sub_district.index(sub_district)
-                idx = self.non_bangkok_sub_district_index[idx]
-                original_idx = self.thai_parts_index[idx][1]
-                detailed_address = ' '.join(self.address_list[:original_idx])
+            for pos, s_score in best_first(s_tokens, matcher, 0.):
+                for s_id in g.sub_district_ids(matcher.names[pos]):
+                    d_id = g.sub_district_district[s_id]
+                    if allowed(d_id):
+                        return s_score[0], [(s_id, ) + s_score, (d_id, ) + zero, (g.district_province[d_id], ) + zero]
+        return best
+
+    def resolve_joint(self, ctx, evidence):
+        '''
+        joint_search() in the postcode area of the address, then over every province (without
+        Bangkok) when a level with tokens has no name of the area scoring POSTCODE_MIN_SCORE, or
+        when one of its tokens is written exactly as a name outside the area. Memoized like
+        resolve().
+        :param ctx:
+        :param evidence: (sub district tokens, district tokens, province tokens), tuples
+        :return: ((name, score, index of the token) for the sub district, district and province)
+        '''
+        g = self.gazetteer
+        exact = (g.sub_district_ids, g.district_ids, lambda name: [g.province_id(name)] if g.province_id(name) else [])
+
+        def search():
+            if ctx.postcode_area is not None:
+                p_ids = [g.province_id(p) for p in self.area_provinces(ctx)]
+                if len(p_ids):
+                    total, levels = self.joint_search(ctx, evidence, p_ids, frozenset(ctx.postcode_districts))
+                    if levels is not None and all(
+                            score >= 1. or (score >= POSTCODE_MIN_SCORE and not any(len(ids(t)) for t in tokens))
+                            for (_, score, _), tokens, ids in zip(levels, evidence, exact) if len(tokens)):
+                        ctx.mark('joint', 'postcode')
+                        return self.joint_names(levels)
+            ctx.mark('joint')
+            total, levels = self.joint_search(ctx, evidence, [g.province_id(p) for p in self.non_bangkok_provinces])
+            return self.joint_names(levels)
+
+        return self.memoized(ctx, (evidence, 'joint', ctx.postcode_area), search)
+
+    def joint_names(self, levels):
+        '''
+
+        :param levels: [(id, score, index of the token)] of joint_search()
+        :return: the same with the names of the ids
+        '''
+        g = self.gazetteer
+        return tuple((name(level[0]),) + tuple(level[1:])
+                     for name, level in zip((g.sub_district, g.district, g.province), levels))
+
+    def other_province_evidence(self, ctx):
+        '''
+        tokens written for each level: the names after the ต. / อ. / จ. markers, a marker without
+        its name (ต. อ. จ.ตาก) is no evidence. Without ต., the Thai part right before the first อ.
+        stands for the sub district, and without ต. and อ. the two Thai parts right before the
+        first จ. stand for the sub district and the district.
+        :param ctx:
+        :return: ((sub district tokens, district tokens, province tokens), [Thai part index] per
+                 level and token)
+        '''
+        name = self.normalizer.name
+        written = (ctx.o_sub_district, ctx.o_district, ctx.o_province)
+        marked = (ctx.non_bangkok_sub_district_index, ctx.non_bangkok_district_index,
+                  ctx.non_bangkok_province_index)
+        evidence, anchors = [[], [], []], [[], [], []]
+        for level in range(3):
+            for token, idx in zip(written[level], marked[level]):
+                if len(token):
+                    evidence[level].append(name(token))
+                    anchors[level].append(idx)
+        if not len(written[0]):
+            if len(written[1]):
+                before = {0: marked[1][0] - 1}
             else:
-                lens = [len(i) for i in sub_district_candidates]
-                max_index = lens.index(max(lens))
-                sub_district_candidate = sub_district_candidates[max_index]
-                max_degree = -1
-                for j in self.non_bangkok_sub_districts:
-                    t = compute_similarity(sub_district_candidate, j,
-                                           mode=1)
-                    if t > max_degree:
-                        max_degree = t
-                        sub_district = j
-                district, province = self.sub_district_dict[sub_district]
-                idx = self.non_bangkok_sub_district_index[max_index]
-                original_idx = self.thai_parts_index[idx][1]
-                detailed_address = ' '.join(self.address_list[:original_idx])
+                before = {0: marked[2][0] - 2, 1: marked[2][0] - 1}
+            for level, idx in before.items():
+                if idx >= 0:
+                    evidence[level].append(ctx.thai_parts[idx])
+                    anchors[level].append(idx)
+        return tuple(tuple(tokens) for tokens in evidence), anchors
 
+    def parse_other_province(self, ctx):
+        ctx.mark({
+            (True, True): 'province_district',
+            (True, False): 'province_no_district',
+            (False, True): 'district_no_province'
+        }.get((len(ctx.o_province) > 0, len(ctx.o_district) > 0), 'sub_district_only'))
+        evidence, anchors = self.other_province_evidence(ctx)
+        if not any(len(tokens) for tokens in evidence):
+            return self.fallback_address(ctx, self.non_bangkok_provinces)
+        levels = self.resolve_joint(ctx, evidence)
+        sub_district, district, province = [name for name, _, _ in levels]
+        if not len(evidence[1]) and not len(evidence[0]):
+            district = self.fallback(ctx, 'district', list(self.dictionary[province].keys()))
+        if not len(evidence[0]):
+            sub_district = self.fallback(ctx, 'sub_district', self.dictionary[province][district])
+        # the detailed address ends before the first token of the result, or the first marker
+        markers = ctx.non_bangkok_sub_district_index + ctx.non_bangkok_district_index + ctx.non_bangkok_province_index
+        idx = min([anchors[level][t_idx] for level, (_, _, t_idx) in enumerate(levels) if len(evidence[level])] +
+                  markers)
+        detailed_address = ' '.join(ctx.address_list[:ctx.thai_parts_index[idx][1]])
         result = ['{} {} {} {}'.format(detailed_address, 'ต.' + sub_district, 'อ.' + district, 'จ.' + province),
                   detailed_address, sub_district, district, province]
         return result
 
-    def parse_none_flags_address(self):
+    def get_scanner(self):
+        '''
+
+        :return: GazetteerScanner over the names of this parser, built on first use
+        '''
+        if self.scanner is None:
+            with self.scanner_lock:
+                if self.scanner is None:
+                    self.scanner = GazetteerScanner(self.dictionary)
+        return self.scanner
+
+    def best_hits(self, hits, least=2):
+        '''
+        most complete consistent (sub district, district, province) found by the scanner: the
+        hits are written in this order without overlapping, and a level without a hit is
+        implied by the others. Ranked by the number of levels found, then the length of text
+        they cover, then having the district, then the province, then the rightmost end, the
+        first one wins ties.
+        :param hits: GazetteerScanner.scan() result
+        :param least: levels a combination must have
+        :return: (sub district hit, district hit, province hit, district, province), a hit is None
+                 for a level not found, None when no combination has enough levels
+        '''
+        g = self.gazetteer
+        sub_districts = []
+        districts = {}
+        provinces = {}
+        for hit in hits:
+            if hit.kind == SUB_DISTRICT:
+                sub_districts.append(hit)
+            elif hit.kind == DISTRICT:
+                districts.setdefault(hit.name, []).append(hit)
+            elif hit.kind == PROVINCE:
+                provinces.setdefault(hit.name, []).append(hit)
+
+        def after(candidates, pos):
+            for hit in candidates or ():
+                if hit.start >= pos:
+                    return hit
+            return None
+
+        combinations = []
+        for s in sub_districts:
+            for d, p in g.parents(s.name):
+                d_hit = after(districts.get(d), s.end)
+                combinations.append((s, d_hit, after(provinces.get(p), (d_hit or s).end), d, p))
+        for d, d_hits in districts.items():
+            for d_id in g.district_ids(d):
+                p = g.province(g.district_province[d_id])
+                for d_hit in d_hits:
+                    combinations.append((None, d_hit, after(provinces.get(p), d_hit.end), d, p))
+        best, best_key = None, None
+        for combination in combinations:
+            found = [hit for hit in combination[:3] if hit is not None]
+            if len(found) < least:
+                continue
+            # a name of both levels is rather read as the district, whose sub district may be misspelled before it,
+            # and the province, written last
+            key = (len(found), sum(hit.end - hit.start for hit in found), combination[1] is not None,
+                   combination[2] is not None, found[-1].end)
+            if best_key is None or key > best_key:
+                best, best_key = combination, key
+        return best
+
+    def parse_scanned(self, ctx, least=2, province=None):
+        '''
+        resolve an address from the exact names found anywhere in it, even run together
+        without spaces, see scanner.py
+        :param ctx:
+        :param least: levels that must be written exactly
+        :param province: only a result in this province
+        :return: parse_address() result, None when fewer than least levels are written exactly
+        '''
+        text = ' '.join(ctx.address_list)
+        hits = self.get_scanner().scan(text)
+        best = self.best_hits(hits, least)
+        if best is None or province is not None and best[4] != province:
+            return None
+        s_hit, d_hit, p_hit, district, province = best
+        ctx.mark('gazetteer_scan')
+        found = [hit for hit in (s_hit, d_hit, p_hit) if hit is not None]
+        ctx.scanned.extend((hit.name, hit.start, hit.end) for hit in found)
+        # a name run together with others takes its whole token, the detailed address is never
+        # cut inside one
+        start = text.rfind(' ', 0, found[0].start) + 1
+        if s_hit is not None:
+            sub_district = s_hit.name
+        else:
+            # misspelled or missing, the sub district is written before the district
+            sub_district_candidates = self.dictionary[province][district]
+            chunks = [chunk for chunk in text[:start].split(' ') if check_th_chars(chunk)
+                      and chunk not in LEVEL_MARKERS]
+            if len(chunks):
+                sub_district, _ = self.resolve(
+                    ctx, chunks[-1], 'sub_district', ('district', province, district), sub_district_candidates)
+                start = text.rfind(chunks[-1], 0, start)
+            else:
+                sub_district = self.fallback(ctx, 'sub_district', sub_district_candidates)
+        # level words (เขต, แขวง) in front of the first name are not part of the detailed address
+        for hit in reversed(hits):
+            if hit.kind == LEVEL_MARKER and hit.start < start and not len(text[hit.end:start].strip()):
+                start = hit.start
+        detailed_address = text[:start].strip()
+        if province != 'กรุงเทพมหานคร':
+            return ['{} {} {} {}'.format(detailed_address, 'ต.' + sub_district, 'อ.' + district, 'จ.' + province),
+                    detailed_address, sub_district, district, province]
+        return ['{} {} {} {}'.format(detailed_address, sub_district, district, province),
+                detailed_address, sub_district, district, province]
+
+    def parse_none_flags_address(self, ctx):
         province = 'null'
         district = 'null'
         sub_district = 'null'
         detailed_address = 'null'
-        if len(self.thai_parts) >= 3:
-            province_candidate = self.thai_parts[-1]
+        if len(ctx.thai_parts):
+            result = self.parse_scanned(ctx)
+            if result is not None:
+                return result
+        if len(ctx.thai_parts) >= 3:
+            province_candidate = ctx.thai_parts[-1]
             if province_candidate in self.dictionary.keys():
                 province = province_candidate
             else:
-                max_degree = -1
-                for i in list(self.dictionary.keys()):
-                    degree = compute_similarity(province_candidate, i, mode=1)
-                    if degree > max_degree:
-                        max_degree = degree
-                        province = i
+                province, max_degree, _, _ = self.scan(ctx, [province_candidate], 'province', bangkok=True)
             district_candidates = list(self.dictionary[province].keys())
-            district_candidate = self.thai_parts[-2]
-            max_degree = -1
-            for i in district_candidates:
-                degree = compute_similarity(i, district_candidate, mode=1)
-                if degree > max_degree:
-                    max_degree = degree
-                    district = i
+            district_candidate = ctx.thai_parts[-2]
+            district, max_degree = self.resolve(
+                ctx, district_candidate, 'district', ('provinces', province), district_candidates)
             sub_district_candidates = self.dictionary[province][district]
-            sub_district_candidate = self.thai_parts[-3]
-            max_degree = -1
-            for i in sub_district_candidates:
-                degree = compute_similarity(i, sub_district_candidate, mode=1)
-                if degree > max_degree:
-                    max_degree = degree
-                    sub_district = i
-            idx = self.thai_parts_index[-3][1]
-            detailed_address = ' '.join(self.address_list[:idx])
-        elif len(self.thai_parts):
-            total = ' '.join(self.thai_parts)
-            max_degree = -1
-            for i in list(self.dictionary.keys()):
-                degree = compute_similarity(total, i, mode=1)
-                if degree > max_degree:
-                    max_degree = degree
-                    province = i
+            sub_district_candidate = ctx.thai_parts[-3]
+            sub_district, max_degree = self.resolve(
+                ctx, sub_district_candidate, 'sub_district', ('district', province, district), sub_district_candidates)
+            idx = ctx.thai_parts_index[-3][1]
+            detailed_address = ' '.join(ctx.address_list[:idx])
+        elif len(ctx.thai_parts):
+            total = ' '.join(ctx.thai_parts)
+            province, max_degree, _, _ = self.scan(ctx, [total], 'province', bangkok=True)
             district_candidates = list(self.dictionary[province].keys())
-            max_degree = -1
-            for i in district_candidates:
-                degree = compute_similarity(i, total, mode=1)
-                if degree > max_degree:
-                    max_degree = degree
-                    district = i
+            district, max_degree = self.resolve(ctx, total, 'district', ('provinces', province), district_candidates)
             sub_district_candidates = self.dictionary[province][district]
-            max_degree = -1
-            for i in sub_district_candidates:
-                degree = compute_similarity(i, total, mode=1)
-                if degree > max_degree:
-                    max_degree = degree
-                    sub_district = i
-            idx = self.thai_parts_index[0][1]
-            detailed_address = ' '.join(self.address_list[:idx])
+            sub_district, max_degree = self.resolve(
+                ctx, total, 'sub_district', ('district', province, district), sub_district_candidates)
+            idx = ctx.thai_parts_index[0][1]
+            detailed_address = ' '.join(ctx.address_list[:idx])
         else:
             result = ['null', 'null', 'null', 'null', 'null']
             return result
@@ -1027,22 +1461,178 @@ class ThaiAddressParserClass(object):
         return result
 
 
-if os.path.exists('th_provinces_districts_sub_districts.json') and os.path.exists('th_en_db.json'):
-    app = ThaiAddressParserClass(file_path='th_provinces_districts_sub_districts.json',
-                                 translation_db='th_en_db.json')
-else:
-    download_thai_address()
-    app = ThaiAddressParserClass(file_path='th_provinces_districts_sub_districts.json',
-                                 translation_db='th_en_db.json')
+_app = None
+_app_lock = threading.Lock()
+
 
+def get_parser():
+    '''
+    the default parser, built once on first use
+    :return: ThaiAddressParserClass
+    '''
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                file_path = os.path.join(DATA_DIR, DICTIONARY_FILE)
+                translation_db = os.path.join(DATA_DIR, TRANSLATION_FILE)
+                for path in (file_path, translation_db):
+                    if not os.path.exists(path):
+                        raise IOError('{} is missing, rebuild the address database with '
+                                      '`python -m ThaiAddressParser.build`'.format(path))
+                _app = ThaiAddressParserClass(file_path=file_path, translation_db=translation_db,
+                                              snapshot_path=os.path.join(DATA_DIR, SNAPSHOT_FILE),
+                                              cache_size=DEFAULT_CACHE_SIZE,
+                                              token_cache_size=DEFAULT_TOKEN_CACHE_SIZE)
+    return _app
+
+
+def warm_up():
+    '''
+    build the default parser ahead of the first parse() call
+    :return:
+    '''
+    get_parser()
+
+
+def set_cache_size(cache_size):
+    '''
+    resize the result cache of the default parser, 0 disables it
+    :param cache_size:
+    :return:
+    '''
+    get_parser().set_cache_size(cache_size)
+
+
+def cache_info():
+    '''
+
+    :return: counters of the result cache of the default parser, None when disabled
+    '''
+    return get_parser().cache_info()
+
+
+def set_token_cache_size(token_cache_size):
+    '''
+    resize the fuzzy token cache of the default parser, 0 disables it
+    :param token_cache_size:
+    :return:
+    '''
+    get_parser().set_token_cache_size(token_cache_size)
+
+
+def token_cache_info():
+    '''
 
-def parse(address):
-    res = app.parse(address)
-    return {
+    :return: counters of the fuzzy token cache of the default parser, None when disabled
+    '''
+    return get_parser().token_cache_info()
+
+
+def set_engine(engine):
+    '''
+    fuzzy matching engine of the default parser, 'python' or 'numpy' (needs numpy)
+    :param engine:
+    :return:
+    '''
+    get_parser().set_engine(engine)
+
+
+def set_scorer(scorer):
+    '''
+    similarity backend of the default parser, see ThaiAddressParserClass.set_scorer()
+    :param scorer: name in similarity.SCORERS, or a FuzzyIndex subclass
+    :return:
+    '''
+    get_parser().set_scorer(scorer)
+
+
+def enable_stats(hook=None):
+    '''
+    instrument parse() of the default parser, see ThaiAddressParser.stats
+    :param hook: called with the stats.ParseTrace of every parse() call
+    :return:
+    '''
+    get_parser().enable_stats(hook)
+
+
+def disable_stats():
+    get_parser().disable_stats()
+
+
+def stats_info():
+    '''
+
+    :return: stage timings, branch and exception counters of the default parser since
+             enable_stats(), None when disabled
+    '''
+    return get_parser().stats_info()
+
+
+def __getattr__(name):
+    # ThaiAddressParser.app is built lazily, the asyncio API and parse_many() (multiprocessing)
+    # are only imported when used
+    if name == 'app':
+        return get_parser()
+    if name == 'parse_many':
+        from .batch import parse_many
+        return parse_many
+    if name in ('aparse', 'aparse_many', 'AsyncParser'):
+        from . import aio
+        return getattr(aio, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def parse(address, top_k=0):
+    '''
+
+    :param address:
+    :param top_k: also return the top_k best hypotheses as 'candidates', the result first,
+                  see ThaiAddressParserClass.hypotheses()
+    :return:
+    '''
+    app = get_parser()
+    if top_k:
+        return as_dict(app, address, app.parse_ranked(address, top_k))
+    return as_dict(app, address, app.parse_scored(address))
+
+
+def parse_batch(addresses):
+    '''
+    parse() of a batch of addresses, repeated addresses and names are only resolved once per
+    batch, see ThaiAddressParserClass.parse_batch()
+    :param addresses: iterable of strings
+    :return: [parse() result] in input order
+    '''
+    app = get_parser()
+    addresses = list(addresses)
+    return [as_dict(app, address, scored) for address, scored in zip(addresses, app.parse_batch(addresses))]
+
+
+def as_dict(app, address, scored):
+    '''
+
+    :param app: ThaiAddressParserClass
+    :param address:
+    :param scored: parse_scored() or parse_ranked() result
+    :return: parse() result
+    '''
+    res, confidence, unresolved = scored[:3]
+    result = {
         'original_address': address,
         'parsed_address': res[0],
-        'province': {'thai': res[-1], 'en': app.th_en_translator[res[-1]]},
-        'district': {'thai': res[-2], 'en': app.th_en_translator[res[-2]]},
-        'sub_district': {'thai': res[-3], 'en': app.th_en_translator[res[-3]]},
-        'remaining_address': res[-4]
+        'province': {'thai': res[-1], 'en': app.gazetteer.english(res[-1])},
+        'district': {'thai': res[-2], 'en': app.gazetteer.english(res[-2])},
+        'sub_district': {'thai': res[-3], 'en': app.gazetteer.english(res[-3])},
+        'remaining_address': res[-4],
+        'confidence': confidence,
+        'status': 'unresolved' if len(unresolved) else 'resolved'
     }
+    if len(scored) > 3:
+        result['candidates'] = [{
+            'province': {'thai': p, 'en': app.gazetteer.english(p)},
+            'district': {'thai': d, 'en': app.gazetteer.english(d)},
+            'sub_district': {'thai': s, 'en': app.gazetteer.english(s)},
+            'score': score
+        } for s, d, p, score in scored[3]]
+    return result
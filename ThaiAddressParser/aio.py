@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: aio.py
+@desc: asyncio API. parse() is CPU bound, so it runs in an executor instead of blocking the
+       event loop: a thread pool by default, or any executor given (a ProcessPoolExecutor keeps
+       the loop fully responsive). At most max_pending parses are submitted at once, further
+       calls wait for a slot. Concurrent calls for the same address share one parse.
+
+       results = [await ThaiAddressParser.aparse(a) for a in addresses]
+       async for res in ThaiAddressParser.aparse_many(stream, max_in_flight=64):
+           ...
+'''
+import asyncio
+import weakref
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+async def _aiter(iterable):
+    for item in iterable:
+        yield item
+
+
+def _copy(value):
+    '''
+    copy of the dicts and lists of a parse() result, the leaves (strings, numbers) are immutable
+    :param value:
+    :return:
+    '''
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    return value
+
+
+def _parse(address):
+    # module level, so that process pools can pickle it
+    from . import parse
+    return parse(address)
+
+
+class AsyncParser(object):
+    def __init__(self, executor=None, max_workers=2, max_pending=None):
+        """
+
+        :param executor: concurrent.futures executor running parse(), a thread pool of
+                         max_workers threads when None
+        :param max_workers:
+        :param max_pending: parses submitted to the executor at once, defaults to 4 * max_workers
+        """
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers,
+                                                       thread_name_prefix='ThaiAddressParser')
+        self.max_pending = max(1, max_pending or 4 * max_workers)
+        # event loop: (semaphore, {address: [shared task, number of waiters]})
+        self._loops = weakref.WeakKeyDictionary()
+        self.coalesced = 0
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = (asyncio.Semaphore(self.max_pending), {})
+        return state
+
+    async def _run(self, semaphore, address):
+        async with semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, _parse, address)
+
+    async def parse(self, address):
+        '''
+        parse() without blocking the event loop. Cancelling the call only cancels the parse when
+        no other call waits for the same address.
+        :param address:
+        :return: parse() result, a copy of its own for every call sharing the parse
+        '''
+        semaphore, in_flight = self._state()
+        entry = in_flight.get(address)
+        if entry is None or entry[0].cancelled():
+            task = asyncio.ensure_future(self._run(semaphore, address))
+            entry = in_flight[address] = [task, 0]
+            task.add_done_callback(lambda _, entry=entry: self._forget(in_flight, address, entry))
+        else:
+            self.coalesced += 1
+        entry[1] += 1
+        try:
+            return _copy(await asyncio.shield(entry[0]))
+        finally:
+            entry[1] -= 1
+            if not entry[1] and not entry[0].done():
+                entry[0].cancel()
+
+    @staticmethod
+    def _forget(in_flight, address, entry):
+        if in_flight.get(address) is entry:
+            del in_flight[address]
+
+    async def parse_many(self, addresses, max_in_flight=64):
+        '''
+        parse a stream of addresses, results are yielded in input order. The input is only read
+        when fewer than max_in_flight addresses are being parsed, so a slow consumer slows down
+        the producer instead of piling up results. Closing the generator cancels the rest.
+        :param addresses: iterable or async iterable of strings
+        :param max_in_flight:
+        :return: async generator of parse() results
+        '''
+        source = addresses if hasattr(addresses, '__aiter__') else _aiter(addresses)
+        pending = deque()
+        try:
+            async for address in source:
+                pending.append(asyncio.ensure_future(self.parse(address)))
+                if len(pending) >= max_in_flight:
+                    yield await pending[0]
+                    pending.popleft()
+            while len(pending):
+                yield await pending[0]
+                pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_async_parser():
+    '''
+    the AsyncParser used by aparse() and aparse_many(), built on first use
+    :return:
+    '''
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = AsyncParser()
+    return _default
+
+
+async def aparse(address):
+    '''
+
+    :param address:
+    :return: parse() result, computed in the executor of the default AsyncParser
+    '''
+    return await get_async_parser().parse(address)
+
+
+def aparse_many(addresses, max_in_flight=64):
+    '''
+    see AsyncParser.parse_many()
+    :param addresses: iterable or async iterable of strings
+    :param max_in_flight:
+    :return: async generator of parse() results, in input order
+    '''
+    return get_async_parser().parse_many(addresses, max_in_flight)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bangkok.py
+@desc: lookup tables of the Bangkok districts (เขต) and sub districts (แขวง). Every name is
+       indexed as written and with the words addresses put in front of it (เขต / แขวง / ข.,
+       and the อ. / ต. of the other provinces), so a part of a Bangkok address is read with one
+       dict lookup: its level when a word gives it, and the name. Only the parts that miss are
+       matched fuzzily.
+'''
+from .fuzzy import FuzzyIndex
+from .scanner import LEVEL_MARKERS
+from .tokenizer import DISTRICT, SUB_DISTRICT
+
+# words written in front of a Bangkok name and the level they give it
+PREFIXES = dict(LEVEL_MARKERS, **{'อ.': DISTRICT, 'ต.': SUB_DISTRICT})
+
+
+class BangkokIndex(object):
+    def __init__(self, districts, index=FuzzyIndex):
+        """
+
+        :param districts: {district: [sub district]} of Bangkok
+        :param index: FuzzyIndex class of the fuzzy matches, see similarity.py
+        """
+        self.districts = list(districts.keys())
+        self.district_set = frozenset(self.districts)
+        self.sub_district_districts = {}  # sub district: [districts], in dictionary order
+        for d, sub_districts in districts.items():
+            for s in sub_districts:
+                self.sub_district_districts.setdefault(s, []).append(d)
+        self.district_matcher = index(self.districts)
+        self.sub_district_matcher = index(self.sub_district_districts.keys())
+        # part of an address: (level given by its prefix or None, name), a lone prefix has no name
+        self.forms = {}
+        for name in self.districts + list(self.sub_district_districts):
+            self.forms[name] = (None, name)
+        for prefix, level in PREFIXES.items():
+            self.forms[prefix] = (level, '')
+            names = self.districts if level == DISTRICT else self.sub_district_districts
+            for name in names:
+                self.forms[prefix + name] = (level, name)
+
+    def read(self, part):
+        '''
+
+        :param part: Thai part of an address
+        :return: (level given by a prefix or None, the part without its prefix)
+        '''
+        form = self.forms.get(part)
+        if form is not None:
+            return form
+        for prefix, level in PREFIXES.items():
+            if part.startswith(prefix):
+                return level, part[len(prefix):]
+        return None, part
+
+    def glued(self, part):
+        '''
+
+        :param part: Thai part of an address
+        :return: it is two names written without a space, with or without their prefixes
+        '''
+        if part in self.forms:
+            return False
+        return any(part[:i] in self.forms and part[i:] in self.forms for i in range(1, len(part)))
+
+    def is_district(self, name, level=None):
+        return level != SUB_DISTRICT and name in self.district_set
+
+    def districts_of(self, name, level=None):
+        '''
+
+        :param name:
+        :param level: level given by a prefix
+        :return: districts holding a sub district of this name, [] when it is none
+        '''
+        if level == DISTRICT:
+            return []
+        return self.sub_district_districts.get(name, [])
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: batch.py
+@desc: batch parsing of large address streams.
+       parse_many() reads the input lazily in chunks, parses them in a process pool where
+       every worker builds the default parser once, and yields the results in input order.
+       At most max_pending chunks are in flight, so the memory used does not depend on the
+       size of the input. Every chunk is parsed as one batch: repeated addresses, names and
+       similarities are only computed once per chunk.
+'''
+import time
+import itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _init_worker():
+    from . import warm_up
+    warm_up()
+
+
+def _parse_chunk(chunk, timings=False):
+    from . import get_parser, as_dict
+    app = get_parser()
+    res = []
+    start = time.perf_counter()
+    for address, scored in zip(chunk, app.parse_batch(chunk)):
+        parsed = as_dict(app, address, scored)
+        if timings:
+            now = time.perf_counter()
+            res.append((parsed, now - start))
+            start = now
+        else:
+            res.append(parsed)
+    return res
+
+
+def iter_chunks(iterable, chunksize):
+    '''
+
+    :param iterable:
+    :param chunksize:
+    :return: lists of at most chunksize items, read lazily
+    '''
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunksize))
+        if not len(chunk):
+            return
+        yield chunk
+
+
+def parse_many(addresses, workers=1, chunksize=256, max_pending=None, timings=False):
+    '''
+    parse an iterable of addresses, results are yielded in input order
+    :param addresses: any iterable of strings, read lazily
+    :param workers: number of worker processes, 1 parses in the calling process
+    :param chunksize: addresses parsed as one batch, and sent to a worker at once
+    :param max_pending: chunks in flight, defaults to 2 * workers
+    :param timings: yield (result, seconds spent parsing the address) pairs
+    :return: generator of parse() results
+    '''
+    if workers <= 1:
+        for chunk in iter_chunks(addresses, chunksize):
+            for res in _parse_chunk(chunk, timings):
+                yield res
+        return
+    max_pending = 2 * workers if max_pending is None else max(1, max_pending)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        try:
+            for chunk in iter_chunks(addresses, chunksize):
+                if len(pending) >= max_pending:
+                    for res in pending.popleft().result():
+                        yield res
+                pending.append(pool.submit(_parse_chunk, chunk, timings))
+            while len(pending):
+                for res in pending.popleft().result():
+                    yield res
+        finally:
+            # the consumer stopped early, do not parse the rest
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: build.py
+@desc: explicit build step refreshing the packaged address database from Wikipedia.
+       It is never run when the parser starts. The pages can be read from a local html
+       snapshot directory, so the build also works (and can be tested) offline:
+
+       python -m ThaiAddressParser.build --save-html snapshot/    # online, keep the pages
+       python -m ThaiAddressParser.build --html-dir snapshot/     # offline rebuild
+       python -m ThaiAddressParser.build --compile-only           # only rebuild the binary snapshot
+'''
+import os
+import json
+import argparse
+from urllib.parse import unquote
+
+from . import DATA_DIR, DICTIONARY_FILE, TRANSLATION_FILE, SNAPSHOT_FILE, ThaiAddressParserClass
+
+INDEX_URL = 'https://en.wikipedia.org/wiki/List_of_tambon_in_Thailand'
+
+
+def snapshot_name(url):
+    '''
+    file name of a page inside an html snapshot directory
+    :param url:
+    :return:
+    '''
+    return unquote(url.rstrip('/').split('/')[-1]) + '.html'
+
+
+def fetch(url, html_dir=None, save_html_dir=None):
+    '''
+
+    :param url:
+    :param html_dir: read the page from this snapshot directory instead of the network
+    :param save_html_dir: keep a copy of the downloaded page in this directory
+    :return: html text
+    '''
+    if html_dir is not None:
+        with open(os.path.join(html_dir, snapshot_name(url)), 'r', encoding='utf-8') as f:
+            return f.read()
+    import requests
+    text = requests.get(url).text
+    if save_html_dir is not None:
+        os.makedirs(save_html_dir, exist_ok=True)
+        with open(os.path.join(save_html_dir, snapshot_name(url)), 'w', encoding='utf-8') as f:
+            f.write(text)
+    return text
+
+
+def download_thai_address(output_dir=None, html_dir=None, save_html_dir=None):
+    '''
+    scrape the tambon lists and write the dictionary and translation json files
+    :param output_dir: defaults to the package directory
+    :param html_dir: offline mode, read every page from this snapshot directory
+    :param save_html_dir: keep the downloaded pages, to be used later as html_dir
+    :return: (dictionary, translation)
+    '''
+    # only needed to refresh the data, keep them out of the import path
+    from bs4 import BeautifulSoup
+    import tqdm
+
+    output_dir = DATA_DIR if output_dir is None else output_dir
+    print('Downloading the address information of Thailand ...')
+    data = fetch(INDEX_URL, html_dir, save_html_dir)
+    data = BeautifulSoup(data, "html.parser")
+    urls = data.find_all(name='ul')[0]
+    hrefs = urls.find_all(name='li')
+    res = {}
+    th_en = {}
+    for h in tqdm.tqdm(hrefs):
+        href = 'https://en.wikipedia.org/' + h.find(name='a')['href']
+        data = fetch(href, html_dir, save_html_dir)
+        data = BeautifulSoup(data, 'html.parser')
+        table = data.find_all(name='table', attrs={'class': 'wikitable sortable'})
+        details = table[0].find_all(name='tr')[1:]
+        for detail in details:
+            temp = detail.find_all(name='td')
+            sub_district = temp[1].text
+            district = temp[3].text
+            province = temp[5].text
+            th_en[sub_district] = temp[0].text
+            th_en[district] = temp[2].text
+            th_en[province] = temp[4].text
+            if province in res.keys():
+                if district in res[province].keys():
+                    if sub_district not in res[province][district]:
+                        res[province][district].append(sub_district)
+                else:
+                    res[province][district] = [sub_district]
+            else:
+                res[province] = {district: [sub_district]}
+    for p in res.keys():
+        for d in res[p].keys():
+            res[p][d] = sorted(set(res[p][d]))
+    with open(os.path.join(output_dir, DICTIONARY_FILE), 'w', encoding='utf-8') as f:
+        json.dump(res, f, ensure_ascii=False)
+    with open(os.path.join(output_dir, TRANSLATION_FILE), 'w', encoding='utf-8') as f:
+        json.dump(th_en, f, ensure_ascii=False)
+    print('Finish the downloading!')
+    compile_snapshot(output_dir)
+    return res, th_en
+
+
+def compile_snapshot(output_dir=None):
+    '''
+    precompile the json files of output_dir into the binary snapshot loaded at startup
+    :param output_dir: defaults to the package directory
+    :return: snapshot path
+    '''
+    output_dir = DATA_DIR if output_dir is None else output_dir
+    sources = [os.path.join(output_dir, DICTIONARY_FILE), os.path.join(output_dir, TRANSLATION_FILE)]
+    parser = ThaiAddressParserClass(*sources)
+    path = os.path.join(output_dir, SNAPSHOT_FILE)
+    parser.save_snapshot(path, sources)
+    return path
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='refresh the Thailand address database')
+    arg_parser.add_argument('--output-dir', default=DATA_DIR)
+    arg_parser.add_argument('--html-dir', default=None, help='offline mode, read pages from this directory')
+    arg_parser.add_argument('--save-html', default=None, help='save the downloaded pages to this directory')
+    arg_parser.add_argument('--compile-only', action='store_true',
+                            help='only compile the existing json files into the binary snapshot')
+    args = arg_parser.parse_args(argv)
+    if args.compile_only:
+        print('Snapshot written to {}'.format(compile_snapshot(args.output_dir)))
+    else:
+        download_thai_address(args.output_dir, args.html_dir, args.save_html)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: charclass.py
+@desc: Thai script check of address tokens, compiled once at import.
+       has_thai() is a regex search stopping at the first character of the Thai block
+       U+0E00 .. U+0E7F.
+'''
+import re
+
+THAI_RE = re.compile('[฀-๿]')
+
+
+def has_thai(s):
+    '''
+
+    :param s:
+    :return: whether s contains a character of the Thai block
+    '''
+    return THAI_RE.search(s) is not None
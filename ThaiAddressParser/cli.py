@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: cli.py
+@desc: thai-address-parse, streaming command line parser.
+       Reads plain lines, CSV or JSONL from a file or stdin, parses them through parse_many()
+       and writes JSONL or CSV row by row, so the memory used does not depend on the size of
+       the input. Throughput and latency percentiles are printed to stderr at the end.
+
+       thai-address-parse addresses.csv --column address --workers 4 -o parsed.jsonl
+       cat addresses.txt | thai-address-parse --output-format csv > parsed.csv
+'''
+import io
+import os
+import sys
+import csv
+import json
+import math
+import time
+import argparse
+from collections import deque
+
+from .batch import parse_many
+
+FORMATS = ('lines', 'csv', 'jsonl')
+OUTPUT_FORMATS = ('jsonl', 'csv')
+EXTENSIONS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl'}
+RESULT_COLUMNS = ['parsed_address', 'remaining_address', 'sub_district', 'sub_district_en', 'district',
+                  'district_en', 'province', 'province_en', 'confidence', 'status']
+
+
+class LatencyHistogram(object):
+    def __init__(self, growth=1.05):
+        """
+        log scale histogram of latencies, constant memory whatever the number of samples
+        :param growth: ratio between two bucket bounds, the relative error of a percentile
+        """
+        self.log_growth = math.log(growth)
+        self.growth = growth
+        self.buckets = {}
+        self.count = 0
+
+    def add(self, seconds):
+        bucket = int(math.log(max(seconds, 1e-7) * 1e7) / self.log_growth)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+
+    def percentile(self, q):
+        '''
+
+        :param q: in [0, 100]
+        :return: upper bound of the bucket holding the q-th percentile, in seconds
+        '''
+        if not self.count:
+            return 0.
+        rank = max(1, int(math.ceil(q / 100. * self.count)))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return self.growth ** (bucket + 1) / 1e7
+        return 0.
+
+
+def guess_format(path):
+    for ext, fmt in EXTENSIONS.items():
+        if path.lower().endswith(ext):
+            return fmt
+    return 'lines'
+
+
+def read_records(f, fmt, column):
+    '''
+
+    :param f: text file
+    :param fmt: 'lines', 'csv' or 'jsonl'
+    :param column: CSV header name or position, JSONL key
+    :return: generator of (address, input record), record is None for plain lines. Blank lines and
+             empty CSV rows are kept (as unresolved addresses) so that output row n is input row n
+    '''
+    if fmt == 'lines':
+        for line in f:
+            yield line.rstrip('\r\n'), None
+    elif fmt == 'csv':
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        if column in header:
+            idx = header.index(column)
+        elif column.isdigit() and int(column) < len(header):
+            idx = int(column)
+        else:
+            raise ValueError('column {!r} is not in the CSV header {}'.format(column, header))
+        for row in reader:
+            # short rows are padded, every record has all the header columns
+            row += [''] * (len(header) - len(row))
+            yield row[idx], dict(zip(header, row))
+    else:
+        for number, line in enumerate(f, 1):
+            if len(line.strip()):
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    raise ValueError('line {}: {}'.format(number, e))
+                if not isinstance(record, dict):
+                    raise ValueError('line {}: expected a JSON object, got {}'.format(number, type(record).__name__))
+                yield str(record.get(column) or ''), record
+
+
+def flatten(res):
+    '''
+
+    :param res: parse() result
+    :return: {RESULT_COLUMNS: value}
+    '''
+    row = {'parsed_address': res['parsed_address'], 'remaining_address': res['remaining_address'],
+           'confidence': res['confidence'], 'status': res['status']}
+    for level in ('sub_district', 'district', 'province'):
+        row[level] = res[level]['thai']
+        row[level + '_en'] = res[level]['en']
+    return {c: row[c] for c in RESULT_COLUMNS}
+
+
+class Writer(object):
+    def __init__(self, f, fmt, prefix=''):
+        """
+        row by row JSONL or CSV output
+        :param f: text file
+        :param fmt: 'jsonl' or 'csv'
+        :param prefix: put before the RESULT_COLUMNS names in CSV output
+        """
+        self.f = f
+        self.fmt = fmt
+        self.prefix = prefix
+        self.csv = None
+
+    def write(self, res, record):
+        '''
+
+        :param res: parse() result
+        :param record: input record, None for plain lines
+        :return:
+        '''
+        if self.fmt == 'jsonl':
+            if record is not None:
+                res = dict(res, input=record)
+            self.f.write(json.dumps(res, ensure_ascii=False) + '\n')
+            return
+        row = dict(record) if record is not None else {'original_address': res['original_address']}
+        result = {self.prefix + c: v for c, v in flatten(res).items()}
+        if self.csv is None:
+            # every record has the same columns, checking the first one is enough
+            collisions = [c for c in result if c in row]
+            if len(collisions):
+                raise ValueError('the input columns {} would be overwritten by the result, '
+                                 'use --result-prefix'.format(collisions))
+            self.csv = csv.DictWriter(self.f, fieldnames=list(row) + list(result), extrasaction='ignore')
+            self.csv.writeheader()
+        row.update(result)
+        self.csv.writerow(row)
+
+
+def run(records, writer, workers=1, batch_size=256):
+    '''
+
+    :param records: iterable of (address, input record)
+    :param writer: Writer
+    :param workers:
+    :param batch_size:
+    :return: (rows, seconds, LatencyHistogram)
+    '''
+    # records read but not written yet, bounded by the addresses in flight in parse_many()
+    pending = deque()
+
+    def addresses():
+        for address, record in records:
+            pending.append(record)
+            yield address
+
+    histogram = LatencyHistogram()
+    start = time.perf_counter()
+    for res, seconds in parse_many(addresses(), workers=workers, chunksize=batch_size, timings=True):
+        writer.write(res, pending.popleft())
+        histogram.add(seconds)
+    return histogram.count, time.perf_counter() - start, histogram
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='thai-address-parse', description='parse Thai addresses')
+    arg_parser.add_argument('input', nargs='?', default='-', help='input file, - for stdin')
+    arg_parser.add_argument('-f', '--format', choices=FORMATS, default=None,
+                            help='input format, guessed from the file extension, lines for stdin')
+    arg_parser.add_argument('-c', '--column', default='address',
+                            help='CSV column (header name or position) or JSONL key holding the address')
+    arg_parser.add_argument('-o', '--output', default='-', help='output file, - for stdout')
+    arg_parser.add_argument('-F', '--output-format', choices=OUTPUT_FORMATS, default='jsonl')
+    arg_parser.add_argument('-p', '--result-prefix', default='',
+                            help='put before the result column names in CSV output, when the input has the same columns')
+    arg_parser.add_argument('-w', '--workers', type=int, default=1, help='worker processes')
+    arg_parser.add_argument('-b', '--batch-size', type=int, default=256, help='addresses sent to a worker at once')
+    arg_parser.add_argument('-q', '--quiet', action='store_true', help='do not print the statistics')
+    args = arg_parser.parse_args(argv)
+
+    fmt = args.format or (guess_format(args.input) if args.input != '-' else 'lines')
+    if args.input == '-':
+        fin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    else:
+        fin = open(args.input, 'r', encoding='utf-8', newline='')
+    if args.output == '-':
+        fout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='')
+    else:
+        fout = open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        rows, seconds, histogram = run(read_records(fin, fmt, args.column), Writer(fout, args.output_format, args.result_prefix),
+                                       args.workers, args.batch_size)
+        fout.flush()
+    except BrokenPipeError:
+        # the reader of the output went away (e.g. piped into head), stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except ValueError as e:
+        arg_parser.error(str(e))
+    finally:
+        if args.input != '-':
+            fin.close()
+        if args.output != '-':
+            fout.close()
+    if not args.quiet:
+        print('{} rows in {:.2f} s, {:.0f} rows/s, latency p50 {:.2f} ms, p99 {:.2f} ms'.format(
+            rows, seconds, rows / seconds if seconds else 0., histogram.percentile(50) * 1000,
+            histogram.percentile(99) * 1000), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: fuzzy.py
+@desc: prebuilt fuzzy index over a list of gazetteer names.
+       difflib.SequenceMatcher.quick_ratio() only depends on the multiset of characters
+       of both strings: 2 * sum(min(count_a[c], count_b[c])) / (len(a) + len(b)).
+       So a character inverted index gives exactly the same score without building a
+       SequenceMatcher per pair, and names sharing no character with the query are never
+       touched at all.
+'''
+import heapq
+from array import array
+from collections import Counter
+
+
+class FuzzyIndex(object):
+    def __init__(self, names):
+        """
+
+        :param names: candidate names, the position in this list breaks ties like the
+                      original linear scans (first best candidate wins)
+        """
+        self.names = list(names)
+        self.lengths = array('i', [len(n) for n in self.names])
+        self.postings = {}  # char: (array of name positions, array of counts of char in the name)
+        for idx, name in enumerate(self.names):
+            for c, n in Counter(name).items():
+                if c not in self.postings:
+                    self.postings[c] = (array('i'), array('i'))
+                self.postings[c][0].append(idx)
+                self.postings[c][1].append(n)
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def similarity(a, b):
+        '''
+        score of one pair, see similarity.py for the other scorers
+        :param a:
+        :param b:
+        :return: quick_ratio of a and b
+        '''
+        return count_ratio(Counter(a), Counter(b), len(a) + len(b))
+
+    def scores(self, query):
+        '''
+        quick_ratio of the query against every name sharing at least one character with it
+        :param query:
+        :return: {name position: score}
+        '''
+        matches = {}
+        for c, n in Counter(query).items():
+            posting = self.postings.get(c)
+            if posting is None:
+                continue
+            get = matches.get
+            for idx, m in zip(*posting):
+                matches[idx] = get(idx, 0) + (m if m < n else n)
+        length = len(query)
+        lengths = self.lengths
+        return {idx: 2.0 * m / (length + lengths[idx]) for idx, m in matches.items()}
+
+    def positions(self, name):
+        '''
+
+        :param name:
+        :return: positions of the name in the index, first first
+        '''
+        by_name = getattr(self, 'by_name', None)
+        if by_name is None:
+            # filled before it is published, threads racing on the first call build their own
+            by_name = {}
+            for idx, n in enumerate(self.names):
+                by_name.setdefault(n, []).append(idx)
+            self.by_name = by_name
+        return by_name.get(name, [])
+
+    def nearest(self, name):
+        '''
+        best score of the other names of the index to a name, memoized: no name but itself can
+        score more to a token written as is
+        :param name:
+        :return: float, 0 when no other name shares a character with it
+        '''
+        nearest = getattr(self, 'nearest_scores', None)
+        if nearest is None:
+            nearest = self.nearest_scores = {}
+        score = nearest.get(name)
+        if score is None:
+            names = self.names
+            score = nearest[name] = max((s for idx, s in self.scores(name).items() if names[idx] != name), default=0.)
+        return score
+
+    def top_k(self, query, k=1):
+        '''
+
+        :param query:
+        :param k:
+        :return: [(name, score)] best first, same order as a linear scan with quick_ratio
+        '''
+        scores = self.scores(query)
+        best = heapq.nsmallest(k, scores.items(), key=lambda x: (-x[1], x[0]))
+        if len(best) < k:
+            # names without any common character score 0 (or 1.0 for two empty strings)
+            for idx, name in enumerate(self.names):
+                if len(best) >= k:
+                    break
+                if idx not in scores:
+                    best.append((idx, 1.0 if not len(name) and not len(query) else 0))
+            best.sort(key=lambda x: (-x[1], x[0]))
+        return [(self.names[idx], score) for idx, score in best]
+
+    def best(self, query):
+        '''
+
+        :param query:
+        :return: (name, score) of the best candidate, (None, -1) for an empty index
+        '''
+        if not len(self.names):
+            return None, -1
+        return self.top_k(query, k=1)[0]
+
+
+def ranked(scores, n):
+    '''
+    positions of an index of n names, best score first, first position on ties
+    :param scores: {position: (score, ...)}, positions missing score 0
+    :param n:
+    :return: generator of positions, the unscored ones last
+    '''
+    heap = [(-value[0], pos) for pos, value in scores.items()]
+    heapq.heapify(heap)
+    while len(heap):
+        yield heapq.heappop(heap)[1]
+    for pos in range(n):
+        if pos not in scores:
+            yield pos
+
+
+def count_ratio(counts_a, counts_b, length):
+    '''
+    quick_ratio of two strings from their character counts, for callers that keep the counts
+    of strings they meet again and again
+    :param counts_a: Counter of the first string
+    :param counts_b: Counter of the second string
+    :param length: sum of the lengths of both strings
+    :return: same float as difflib's quick_ratio
+    '''
+    if not length:
+        return 1.0
+    if len(counts_b) < len(counts_a):
+        counts_a, counts_b = counts_b, counts_a
+    matches = 0
+    get = counts_b.get
+    for c, n in counts_a.items():
+        m = get(c)
+        if m:
+            matches += n if n < m else m
+    return 2.0 * matches / length
+
+
+ENGINES = ('python', 'numpy')
+
+
+def index_class(engine='python'):
+    '''
+
+    :param engine: 'python' (inverted index, no dependency) or 'numpy' (vectorized, faster on
+                   the long name lists, needs numpy)
+    :return: FuzzyIndex class of the engine
+    '''
+    if engine == 'python':
+        return FuzzyIndex
+    if engine == 'numpy':
+        try:
+            from .fuzzy_numpy import NumpyFuzzyIndex
+        except ImportError:
+            raise ImportError("the numpy engine needs numpy: pip install ThaiAddressParser[numpy]")
+        return NumpyFuzzyIndex
+    raise ValueError('unknown engine {!r}, expected one of {}'.format(engine, ENGINES))
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: gazetteer.py
+@desc: compact integer id representation of the address hierarchy.
+       Every province, district and sub district gets an integer id. Parents are stored as
+       array backed pointers and children as CSR style ranges: the districts of province p
+       are the ids province_districts[p] .. province_districts[p + 1] - 1, and likewise for
+       the sub districts of a district. Thai and English names live in one interned table,
+       the hierarchy only stores name ids.
+       Name lookups go through the only dict, name -> name id, then through arrays indexed by
+       name id holding the first province / district / sub district with that name. Entries
+       sharing a name are chained with *_next arrays, so unlike flat name -> parent dicts,
+       names shared by several districts or sub districts keep all their parents.
+       Postcode areas map the two digit prefix of a postcode to province ids, and the postcode
+       XX000 of a capital district to its district id.
+       The flat name dicts of the older parsers are still readable as NameView mappings
+       computed from these arrays, see district_map().
+'''
+import sys
+from array import array
+from collections.abc import Mapping
+from .postcodes import POSTCODE_PREFIXES, CAPITAL_DISTRICTS, normalize_postcode
+
+
+class Gazetteer(object):
+    def __init__(self, dictionary, translator=None):
+        """
+
+        :param dictionary: {province:{district:[sub district，，，，，]}}
+        :param translator: {thai name: english name}
+        """
+        self.names = []  # interned name table, Thai and English names
+        self.name_ids = {}  # name: name id
+
+        self.province_name = array('i')  # province id: name id
+        self.province_districts = array('i', [0])  # CSR offsets into district ids
+        self.district_name = array('i')
+        self.district_province = array('i')  # district id: province id
+        self.district_sub_districts = array('i', [0])  # CSR offsets into sub district ids
+        self.sub_district_name = array('i')
+        self.sub_district_district = array('i')  # sub district id: district id
+        self.en_name = array('i')  # name id: name id of the English name, -1 when unknown
+
+        # name id: first province / district / sub district with this name, -1 when none
+        self.name_province = array('i')
+        self.name_district = array('i')
+        self.name_sub_district = array('i')
+        # district / sub district id: next one with the same name, -1 at the end of the chain
+        self.district_next = array('i')
+        self.sub_district_next = array('i')
+
+        for p, districts in dictionary.items():
+            p_id = len(self.province_name)
+            p_name = self.add_name(p)
+            self.province_name.append(p_name)
+            self.name_province[p_name] = p_id
+            for d, sub_districts in districts.items():
+                d_id = len(self.district_name)
+                self.district_name.append(self.add_name(d))
+                self.district_province.append(p_id)
+                self.district_next.append(-1)
+                self._chain(self.name_district, self.district_next, self.district_name[d_id], d_id)
+                for s in sub_districts:
+                    s_id = len(self.sub_district_name)
+                    self.sub_district_name.append(self.add_name(s))
+                    self.sub_district_district.append(d_id)
+                    self.sub_district_next.append(-1)
+                    self._chain(self.name_sub_district, self.sub_district_next, self.sub_district_name[s_id], s_id)
+                self.district_sub_districts.append(len(self.sub_district_name))
+            self.province_districts.append(len(self.district_name))
+        for th, en in (translator or {}).items():
+            th_id = self.add_name(th)
+            en_id = self.add_name(en)
+            self.en_name[th_id] = en_id
+
+        self.postcode_provinces = {}  # postcode prefix: array of province ids
+        self.postcode_districts = {}  # XX000: array of the ids of the capital district
+        for prefix, provinces in POSTCODE_PREFIXES.items():
+            p_ids = [self.province_id(p) for p in provinces]
+            if p_ids[0] is None:
+                continue
+            self.postcode_provinces[prefix] = array('i', [p_id for p_id in p_ids if p_id is not None])
+            capital = CAPITAL_DISTRICTS.get(provinces[0], 'เมือง' + provinces[0])
+            d_ids = [d_id for d_id in self.district_ids(capital) if self.district_province[d_id] == p_ids[0]]
+            if len(d_ids):
+                self.postcode_districts[prefix + '000'] = array('i', d_ids)
+
+    @staticmethod
+    def _chain(heads, chain, name_id, item_id):
+        # append item_id at the end of the chain of entries named name_id
+        if heads[name_id] < 0:
+            heads[name_id] = item_id
+            return
+        last = heads[name_id]
+        while chain[last] >= 0:
+            last = chain[last]
+        chain[last] = item_id
+
+    def add_name(self, name):
+        '''
+
+        :param name:
+        :return: id of the name in the interned table
+        '''
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            name = sys.intern(name)
+            self.names.append(name)
+            self.name_ids[name] = name_id
+            for column in (self.en_name, self.name_province, self.name_district, self.name_sub_district):
+                column.append(-1)
+        return name_id
+
+    @staticmethod
+    def _walk(heads, chain, name_id):
+        item_id = heads[name_id] if name_id is not None else -1
+        while item_id >= 0:
+            yield item_id
+            item_id = chain[item_id]
+
+    def province_id(self, name):
+        '''
+
+        :param name:
+        :return: province id, None when unknown
+        '''
+        name_id = self.name_ids.get(name)
+        if name_id is None or self.name_province[name_id] < 0:
+            return None
+        return self.name_province[name_id]
+
+    def district_ids(self, name):
+        '''
+
+        :param name:
+        :return: [ids of the districts with this name]
+        '''
+        return list(self._walk(self.name_district, self.district_next, self.name_ids.get(name)))
+
+    def sub_district_ids(self, name):
+        '''
+
+        :param name:
+        :return: [ids of the sub districts with this name]
+        '''
+        return list(self._walk(self.name_sub_district, self.sub_district_next, self.name_ids.get(name)))
+
+    def english(self, name):
+        '''
+
+        :param name: Thai name
+        :return: English name, None when unknown
+        '''
+        name_id = self.name_ids.get(name)
+        if name_id is None or self.en_name[name_id] < 0:
+            return None
+        return self.names[self.en_name[name_id]]
+
+    def postcode_area(self, postcode):
+        '''
+        the area a postcode may belong to: every district of the provinces of its prefix, or only
+        the capital district for XX000
+        :param postcode: 5 digits, Arabic or Thai
+        :return: (area, province ids, district ids), area is the postcode of a capital district or
+                 the prefix, the only part of the postcode the ids depend on.
+                 (None, [], []) for an unknown postcode
+        '''
+        postcode = normalize_postcode(postcode)
+        p_ids = self.postcode_provinces.get(postcode[:2])
+        if p_ids is None:
+            return None, [], []
+        d_ids = self.postcode_districts.get(postcode)
+        if d_ids is not None:
+            return postcode, list(p_ids[:1]), list(d_ids)
+        return postcode[:2], list(p_ids), [d_id for p_id in p_ids for d_id in self.districts_of(p_id)]
+
+    def province(self, p_id):
+        return self.names[self.province_name[p_id]]
+
+    def district(self, d_id):
+        return self.names[self.district_name[d_id]]
+
+    def sub_district(self, s_id):
+        return self.names[self.sub_district_name[s_id]]
+
+    def districts_of(self, p_id):
+        return range(self.province_districts[p_id], self.province_districts[p_id + 1])
+
+    def sub_districts_of(self, d_id):
+        return range(self.district_sub_districts[d_id], self.district_sub_districts[d_id + 1])
+
+    def parents(self, sub_district):
+        '''
+
+        :param sub_district:
+        :return: [(district, province)] of every sub district with this name
+        '''
+        res = []
+        for s_id in self.sub_district_ids(sub_district):
+            d_id = self.sub_district_district[s_id]
+            res.append((self.district(d_id), self.province(self.district_province[d_id])))
+        if not len(res):
+            raise KeyError(sub_district)
+        return res
+
+    def district_map(self):
+        '''
+        {district: province} of the older parsers, a name shared by several districts gives the
+        last one as that dict did
+        :return: NameView
+        '''
+        heads = self.name_district
+
+        def names():
+            for d_id, name_id in enumerate(self.district_name):
+                if heads[name_id] == d_id:
+                    yield self.names[name_id]
+
+        def province(district):
+            ids = self.district_ids(district)
+            if not len(ids):
+                raise KeyError(district)
+            return self.province(self.district_province[ids[-1]])
+
+        return NameView(names, province)
+
+    def sub_district_map(self):
+        '''
+        {sub district: [district, province]} of the older parsers, a name shared by several sub
+        districts gives the last one as that dict did
+        :return: NameView
+        '''
+        heads = self.name_sub_district
+
+        def names():
+            for s_id, name_id in enumerate(self.sub_district_name):
+                if heads[name_id] == s_id:
+                    yield self.names[name_id]
+
+        def parents(sub_district):
+            return list(self.parents(sub_district)[-1])
+
+        return NameView(names, parents)
+
+    def translation_map(self):
+        '''
+        {Thai name: English name} of the older parsers
+        :return: NameView
+        '''
+        def names():
+            for name_id, en_id in enumerate(self.en_name):
+                if en_id >= 0:
+                    yield self.names[name_id]
+
+        def english(name):
+            en = self.english(name)
+            if en is None:
+                raise KeyError(name)
+            return en
+
+        return NameView(names, english)
+
+
+class NameView(Mapping):
+    def __init__(self, names, lookup):
+        """
+        read-only {name: value} computed from the gazetteer on every access, nothing is copied
+        :param names: function returning an iterator over the names, each once
+        :param lookup: function of a name to its value, raises KeyError for an unknown name
+        """
+        self.names = names
+        self.lookup = lookup
+
+    def __getitem__(self, name):
+        return self.lookup(name)
+
+    def __iter__(self):
+        return self.names()
+
+    def __len__(self):
+        return sum(1 for _ in self.names())
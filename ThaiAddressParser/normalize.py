@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: normalize.py
+@desc: rewrite of an address before it is tokenized, so that more names are found by exact
+       lookups instead of the fuzzy search:
+       - stray Thai marks: ํ + า and เ + เ typed for ำ and แ, a tone mark typed before the vowel
+         above, a mark typed twice
+       - the long level words จังหวัด / อำเภอ / ตำบล become the markers จ. / อ. / ต., and a
+         marker written apart from its name (ต. บ้านใหม่) is glued back
+       - กทม. / กรุงเทพฯ / กรุงเทพ / จ.กรุงเทพมหานคร become กรุงเทพมหานคร
+       - อ.เมือง becomes the Mueang district of the province written after จ.
+       - the English names of the gazetteer (with or without their Malay alternates) written
+         after an English level word (Tambon Mae Klong, Amphoe Betong) become the Thai names
+       The tables are built from the gazetteer, an address needing none of this comes back
+       unchanged after a few regex searches.
+'''
+import re
+
+from .tokenizer import BANGKOK, PROVINCE, DISTRICT, SUB_DISTRICT
+
+# ํ + า (with a tone mark between them), เ + เ, a tone mark before the vowel above, a mark typed twice
+MARKS_RE = re.compile(r'ํ(?P<am>[่-๋]?)า|เเ|(?P<tone>[่-๋])(?P<vowel>[ัิ-ื])|(?P<mark>[ัิ-ฺ็-๎])(?P=mark)+')
+# the two MARKS_RE cases a substring test cannot rule out, several times faster searched apart
+TONE_FIRST_RE = re.compile(r'[่-๋][ัิ-ื]')
+DOUBLED_RE = re.compile(r'([ัิ-ฺ็-๎])\1')
+# a level word or marker at the start of a token, the spaces after it and the next token
+LEVEL_WORDS_RE = re.compile(r'(?<!\S)(?:(จังหวัด|อำเภอ|ตำบล)|([จอต]\.))(\s*)(?=(\S*))')
+LEVEL_WORDS = {'จังหวัด': 'จ.', 'อำเภอ': 'อ.', 'ตำบล': 'ต.'}
+# a token starting with a marker, a marker without its name is never glued to it
+MARKER_START_RE = re.compile(r'(?:[จอต]\.|จังหวัด|อำเภอ|ตำบล)')
+# whole tokens only (or after จ. / จังหวัด), ถ.กรุงเทพ-นนทบุรี, ซ.กรุงเทพกรีฑา and อ.นกทม are no Bangkok
+BANGKOK_RE = re.compile(r'(?<!\S)(?:(?:จ\.|จังหวัด)\s*(?:กรุงเทพมหานคร|กรุงเทพ\s*ฯ|กรุงเทพ|กทม\.?)|'
+                        r'กรุงเทพ\s*ฯ|กรุงเทพ|กทม\.?)(?![-\w฀-๿])')
+MUEANG_RE = re.compile(r'(?:(?<=\s)|^)อ\.เมือง(?=\s|$)')
+PROVINCE_RE = re.compile(r'จ\.(\S+)')
+# English level word: (level of the name after it, Thai marker)
+LATIN_LEVELS = {
+    'changwat': (PROVINCE, 'จ.'),
+    'amphoe': (DISTRICT, 'อ.'),
+    'amphur': (DISTRICT, 'อ.'),
+    'khet': (DISTRICT, 'เขต'),
+    'tambon': (SUB_DISTRICT, 'ต.'),
+    'khwaeng': (SUB_DISTRICT, 'แขวง')
+}
+LATIN_HINT_RE = re.compile(r'[A-Za-z]')
+LATIN_RE = re.compile(r'\b(?:' + '|'.join(LATIN_LEVELS) + r')\b', re.IGNORECASE)
+# longest English name, in words
+LATIN_WINDOW = 5
+MALAY_RE = re.compile(r'^(.*?)\s*\(Malay:\s*(.*?)\)\s*$')
+
+
+def fold_marks(match):
+    if match.group('am') is not None:
+        return match.group('am') + 'ำ'
+    if match.group(0) == 'เเ':
+        return 'แ'
+    if match.group('tone') is not None:
+        return match.group('vowel') + match.group('tone')
+    return match.group('mark')
+
+
+def level_word(match):
+    marker = LEVEL_WORDS[match.group(1)] if match.group(1) else match.group(2)
+    following = match.group(4)
+    if not len(following) or MARKER_START_RE.match(following) is not None:
+        return marker + match.group(3)
+    return marker
+
+
+def english_variants(english):
+    '''
+
+    :param english: translation of a name in th_en_db.json
+    :return: lower case forms the name may be written in
+    '''
+    m = MALAY_RE.match(english)
+    forms = [m.group(1)] + m.group(2).split(' or ') if m else [english]
+    variants = []
+    for form in forms:
+        words = form.lower().split()
+        # Bangkok names are translated with their level word, Khet Don Mueang
+        if len(words) > 1 and words[0] in LATIN_LEVELS:
+            words = words[1:]
+        variants.append(' '.join(words))
+    return variants
+
+
+class Normalizer(object):
+    def __init__(self, dictionary, translator):
+        """
+
+        :param dictionary: {province: {district: [sub district]}}
+        :param translator: {Thai name: English name}
+        """
+        # province: its Mueang (capital) district, named after the province in a few of them
+        self.mueang = {}
+        for p, districts in dictionary.items():
+            for d in ('เมือง' + p, p):
+                if d in districts:
+                    self.mueang[p] = d
+                    break
+        # level: {English name in lower case: [Thai names]}
+        self.english = {PROVINCE: {}, DISTRICT: {}, SUB_DISTRICT: {}}
+
+        def add(level, name):
+            if name in translator:
+                for variant in english_variants(translator[name]):
+                    names = self.english[level].setdefault(variant, [])
+                    if name not in names:
+                        names.append(name)
+
+        for p, districts in dictionary.items():
+            add(PROVINCE, p)
+            for d, sub_districts in districts.items():
+                add(DISTRICT, d)
+                for s in sub_districts:
+                    add(SUB_DISTRICT, s)
+        # a name written with an alternate in brackets, ปอภาร (ปอพาน): either part alone
+        self.names = {}
+        for p, districts in dictionary.items():
+            for name in [p] + list(districts) + [s for sub_districts in districts.values() for s in sub_districts]:
+                m = re.match(r'^(\S+)\s*\((\S+)\)$', name)
+                if m:
+                    for variant in m.groups():
+                        self.names.setdefault(variant, name)
+
+    def name(self, token):
+        '''
+
+        :param token: name written after a marker
+        :return: the gazetteer name it is a variant of, the token itself otherwise
+        '''
+        return self.names.get(token, token)
+
+    def latin(self, address):
+        '''
+        English names after an English level word to Thai, only when the name is unique at
+        its level. The words are split on any whitespace and joined with one space: parse() ignores
+        repeated spaces (see normalize_address()), so both spellings must read the same.
+        :param address:
+        :return:
+        '''
+        words = address.split()
+        res = []
+        i = 0
+        while i < len(words):
+            level = LATIN_LEVELS.get(words[i].lower().strip(',.'))
+            if level is not None:
+                for n in range(min(LATIN_WINDOW, len(words) - i - 1), 0, -1):
+                    phrase = ' '.join(words[i + 1:i + 1 + n])
+                    names = self.english[level[0]].get(phrase.lower().rstrip(',.'))
+                    if names is not None and len(names) == 1:
+                        res.append(level[1] + names[0])
+                        i += 1 + n
+                        break
+                else:
+                    res.append(words[i])
+                    i += 1
+                continue
+            res.append(words[i])
+            i += 1
+        return (' ' if address[:1].isspace() else '') + ' '.join(res)
+
+    def normalize(self, address):
+        '''
+
+        :param address:
+        :return: the address with the variants rewritten, see the top of this file
+        '''
+        # plain substring tests first, most addresses need few of the rewrites
+        if 'ํ' in address or 'เเ' in address or TONE_FIRST_RE.search(address) is not None or \
+                DOUBLED_RE.search(address) is not None:
+            address = MARKS_RE.sub(fold_marks, address)
+        if LATIN_HINT_RE.search(address) is not None and LATIN_RE.search(address) is not None:
+            address = self.latin(address)
+        if 'กทม' in address or 'กรุงเทพ' in address:
+            address = BANGKOK_RE.sub(BANGKOK, address)
+        if '. ' in address or any(word in address for word in LEVEL_WORDS):
+            address = LEVEL_WORDS_RE.sub(level_word, address)
+        if ('อ.เมือง ' in address or address.endswith('อ.เมือง')) and MUEANG_RE.search(address) is not None:
+            provinces = {p for p in PROVINCE_RE.findall(address) if p in self.mueang}
+            if len(provinces) == 1:
+                address = MUEANG_RE.sub('อ.' + self.mueang[provinces.pop()], address)
+        return address
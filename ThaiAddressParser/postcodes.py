@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: postcodes.py
+@desc: Thai postcode areas (Thailand Post numbering).
+       The first two digits of a 5 digit postcode identify the province, XX000 is the main
+       post office of the capital district (อำเภอเมือง) of that province. Provinces split
+       from another one after the numbering was set keep the prefix of the original province
+       in older addresses, so they are listed under both.
+'''
+
+POSTCODE_PREFIXES = {
+    '10': ('กรุงเทพมหานคร', 'สมุทรปราการ'),
+    '11': ('นนทบุรี',),
+    '12': ('ปทุมธานี',),
+    '13': ('พระนครศรีอยุธยา',),
+    '14': ('อ่างทอง',),
+    '15': ('ลพบุรี',),
+    '16': ('สิงห์บุรี',),
+    '17': ('ชัยนาท',),
+    '18': ('สระบุรี',),
+    '20': ('ชลบุรี',),
+    '21': ('ระยอง',),
+    '22': ('จันทบุรี',),
+    '23': ('ตราด',),
+    '24': ('ฉะเชิงเทรา',),
+    '25': ('ปราจีนบุรี', 'สระแก้ว'),
+    '26': ('นครนายก',),
+    '27': ('สระแก้ว',),
+    '30': ('นครราชสีมา',),
+    '31': ('บุรีรัมย์',),
+    '32': ('สุรินทร์',),
+    '33': ('ศรีสะเกษ',),
+    '34': ('อุบลราชธานี', 'อำนาจเจริญ'),
+    '35': ('ยโสธร',),
+    '36': ('ชัยภูมิ',),
+    '37': ('อำนาจเจริญ',),
+    '38': ('บึงกาฬ',),
+    '39': ('หนองบัวลำภู',),
+    '40': ('ขอนแก่น',),
+    '41': ('อุดรธานี', 'หนองบัวลำภู'),
+    '42': ('เลย',),
+    '43': ('หนองคาย', 'บึงกาฬ'),
+    '44': ('มหาสารคาม',),
+    '45': ('ร้อยเอ็ด',),
+    '46': ('กาฬสินธุ์',),
+    '47': ('สกลนคร',),
+    '48': ('นครพนม',),
+    '49': ('มุกดาหาร',),
+    '50': ('เชียงใหม่',),
+    '51': ('ลำพูน',),
+    '52': ('ลำปาง',),
+    '53': ('อุตรดิตถ์',),
+    '54': ('แพร่',),
+    '55': ('น่าน',),
+    '56': ('พะเยา',),
+    '57': ('เชียงราย', 'พะเยา'),
+    '58': ('แม่ฮ่องสอน',),
+    '60': ('นครสวรรค์',),
+    '61': ('อุทัยธานี',),
+    '62': ('กำแพงเพชร',),
+    '63': ('ตาก',),
+    '64': ('สุโขทัย',),
+    '65': ('พิษณุโลก',),
+    '66': ('พิจิตร',),
+    '67': ('เพชรบูรณ์',),
+    '70': ('ราชบุรี',),
+    '71': ('กาญจนบุรี',),
+    '72': ('สุพรรณบุรี',),
+    '73': ('นครปฐม',),
+    '74': ('สมุทรสาคร',),
+    '75': ('สมุทรสงคราม',),
+    '76': ('เพชรบุรี',),
+    '77': ('ประจวบคีรีขันธ์',),
+    '80': ('นครศรีธรรมราช',),
+    '81': ('กระบี่',),
+    '82': ('พังงา',),
+    '83': ('ภูเก็ต',),
+    '84': ('สุราษฎร์ธานี',),
+    '85': ('ระนอง',),
+    '86': ('ชุมพร',),
+    '90': ('สงขลา',),
+    '91': ('สตูล',),
+    '92': ('ตรัง',),
+    '93': ('พัทลุง',),
+    '94': ('ปัตตานี',),
+    '95': ('ยะลา',),
+    '96': ('นราธิวาส',),
+}
+
+# capital districts not named เมือง + province
+CAPITAL_DISTRICTS = {
+    'พระนครศรีอยุธยา': 'พระนครศรีอยุธยา',
+}
+
+THAI_DIGITS_TABLE = str.maketrans('๐๑๒๓๔๕๖๗๘๙', '0123456789')
+
+
+def normalize_postcode(postcode):
+    '''
+
+    :param postcode: 5 digits, Arabic or Thai
+    :return: the postcode in Arabic digits
+    '''
+    return postcode.translate(THAI_DIGITS_TABLE)
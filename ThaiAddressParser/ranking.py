@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: ranking.py
+@desc: best (sub district, district, province) hypotheses of an address. Every name has a
+       support: its best similarities to the parts of the address (tokens, names written after
+       markers, names found by the scanner), each part being a span of the address. The levels
+       of a hypothesis take parts that do not overlap, so a name written once cannot stand for
+       two levels, and a level the address does not write counts 0. A hypothesis scores the
+       mean support of its three levels. The hypotheses are searched down the hierarchy with a
+       beam: the best provinces, their best districts, all their sub districts. A support is
+       at most the best similarity of the name to a part, the names are visited by that bound
+       and only the ones that can still make the beam (or the k best) get their support.
+'''
+import bisect
+
+# parts kept per name, the best assignment is searched among them
+SUPPORT_WIDTH = 3
+# a bound read from the numpy engine may round below the support of the same name
+BOUND_SLACK = 1e-9
+
+
+def conflicts_of(spans):
+    '''
+
+    :param spans: (start, end) of every part of the address
+    :return: [{parts overlapping the part, itself included}]
+    '''
+    return [{j for j, b in enumerate(spans) if a[0] < b[1] and b[0] < a[1]} | {i} for i, a in enumerate(spans)]
+
+
+def assignments(conflicts, *supports):
+    '''
+    every assignment of parts that do not overlap to the levels, a level may be left without a part
+    :param conflicts: conflicts_of() the parts of the address
+    :param supports: one support per level, [(similarity, part)] best first
+    :return: [(total support, (parts used))] best first
+    '''
+    options = [(0., ())]
+    for support in supports:
+        options = [(total, used) for total, used in options] + [
+            (total + degree, used + (idx, )) for total, used in options for degree, idx in support
+            if not any(idx in conflicts[u] for u in used)]
+    options.sort(key=lambda x: -x[0])
+    return options
+
+
+def fit(conflicts, *supports):
+    '''
+    best total support of the levels over parts that do not overlap
+    :param conflicts: conflicts_of() the parts of the address
+    :param supports: one support per level, [(similarity, part)] best first
+    :return: total support
+    '''
+    best = [support[0][1] for support in supports if len(support)]
+    if not any(best[j] in conflicts[best[i]] for i in range(len(best)) for j in range(i)):
+        return sum(support[0][0] for support in supports if len(support))
+    # the same part is the best one of several levels, e.g. a district and its namesake sub district
+    return assignments(conflicts, *supports)[0][0]
+
+
+def extend(conflicts, support, options):
+    '''
+    fit() of one more level on top of the assignments() of the other levels
+    :param conflicts:
+    :param support: support of the new level
+    :param options: assignments() of the other levels
+    :return: total support
+    '''
+    best = options[0][0]
+    for degree, idx in support:
+        for total, used in options:
+            if total + degree <= best:
+                break
+            if not any(idx in conflicts[u] for u in used):
+                best = total + degree
+                break
+    return best
+
+
+def best_parts(degrees):
+    '''
+
+    :param degrees: [(similarity, part)] of a name
+    :return: its support, the SUPPORT_WIDTH best parts, first parts win ties
+    '''
+    return sorted((x for x in degrees if x[0] > 0), key=lambda x: (-x[0], x[1]))[:SUPPORT_WIDTH]
+
+
+def best(candidates, value, n, kept=None):
+    '''
+    the n candidates of highest value, lowest order wins ties. value() is only computed while
+    the bound of the candidates can still make the n best
+    :param candidates: iterable of (bound, order, item), highest bound first, the bound being at
+                       least value(item)
+    :param value: function(item)
+    :param n:
+    :param kept: [(-value, order, item)] of an earlier call, the n best of both are kept
+    :return: kept, best first
+    '''
+    kept = [] if kept is None else kept
+    for bound, order, item in candidates:
+        if len(kept) >= n and bound + BOUND_SLACK < -kept[n - 1][0]:
+            break
+        bisect.insort(kept, (-value(item), order, item))
+        del kept[n:]
+    return kept
+
+
+def top_hypotheses(dictionary, conflicts, support, bounds, k, beam, exclude=None):
+    '''
+    the k best hypotheses by mean fit() of the three levels, first found wins ties
+    :param dictionary: {province: {district: [sub district]}}
+    :param conflicts: conflicts_of() the parts of the address
+    :param support: function(name) returning [(similarity, part)] best first, at most
+                    SUPPORT_WIDTH of them
+    :param bounds: function(province=None, district=None) returning (best similarity to a part,
+                   position in dictionary, name) of the provinces, of the districts of the
+                   province or of the sub districts of the district, best first
+    :param k:
+    :param beam: provinces and districts of each province searched
+    :param exclude: (sub district, district, province) left out of the ranking
+    :return: [(sub district, district, province, score)] best first
+    '''
+    if k < 1:
+        return []
+    provinces = best(bounds(), lambda p: fit(conflicts, support(p)), beam)
+    districts = []  # (assignments() of the district and its province, order, province, district)
+    for p_rank, (p_fit, _, p) in enumerate(provinces):
+        p_fit, p_support, options = -p_fit, support(p), {}
+
+        def total(d):
+            options[d] = assignments(conflicts, support(d), p_support)
+            return options[d][0][0]
+
+        candidates = ((p_fit + bound, idx, d) for bound, idx, d in bounds(p))
+        for d_rank, (_, _, d) in enumerate(best(candidates, total, beam)):
+            districts.append((options[d], (p_rank, d_rank), p, d))
+    # the best districts first, the sub districts of the others often cannot make the k best
+    districts.sort(key=lambda x: (-x[0][0][0], x[1]))
+    ranked = []
+    for options, order, p, d in districts:
+        if len(ranked) >= k and options[0][0] + 1. + BOUND_SLACK < -ranked[k - 1][0]:
+            break
+        candidates = ((options[0][0] + bound, order + (idx, ), (s, d, p)) for bound, idx, s in bounds(p, d)
+                      if (s, d, p) != exclude)
+        best(candidates, lambda h: extend(conflicts, support(h[0]), options), k, ranked)
+    return [h[-1] + (-h[0] / 3, ) for h in ranked]
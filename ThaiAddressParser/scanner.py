@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: scanner.py
+@desc: exact name finder for addresses written without จ. / อ. / ต. markers, or with names run
+       together without spaces. An Aho-Corasick automaton over every province, district and sub
+       district name (plus กทม and the Bangkok level words เขต / แขวง / ข.) reports every
+       occurrence of every name in one pass over the text, overlapping ones included. Only the
+       names of tokens written with names and level words alone are kept: ท่าทราย in ซอยท่าทราย
+       or อ่าวลึก in อ่าวลึกใตว is no name of the address.
+'''
+from collections import namedtuple, deque
+
+from .tokenizer import PROVINCE, DISTRICT, SUB_DISTRICT
+
+# a name written after one of these words is of this level
+LEVEL_MARKER = 'level_marker'
+LEVEL_MARKERS = {'เขต': DISTRICT, 'แขวง': SUB_DISTRICT, 'ข.': SUB_DISTRICT}
+ABBREVIATIONS = {'กทม': (PROVINCE, 'กรุงเทพมหานคร')}
+# characters that may stand between two names run together, or at either end of a token
+PUNCTUATION = frozenset('.,-/()')
+
+"""
+start / end: span in the scanned text, kind: PROVINCE, DISTRICT, SUB_DISTRICT or LEVEL_MARKER,
+name: gazetteer name (the level for a LEVEL_MARKER)
+"""
+Hit = namedtuple('Hit', ['start', 'end', 'kind', 'name'])
+
+
+class AhoCorasick(object):
+    def __init__(self, patterns):
+        """
+
+        :param patterns: iterable of (string, value), a string may come with several values
+        """
+        self.goto = [{}]  # node: {char: child}
+        self.fail = [0]
+        self.out = [[]]  # node: [(length, value)] of the patterns ending there
+        for string, value in patterns:
+            if not len(string):
+                continue
+            node = 0
+            for c in string:
+                child = self.goto[node].get(c)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto[node][c] = child
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                node = child
+            self.out[node].append((len(string), value))
+        # breadth first, the failure link of a node is always closer to the root
+        queue = deque(self.goto[0].values())
+        while len(queue):
+            node = queue.popleft()
+            for c, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(c, 0)
+                self.fail[child] = target if target != child else 0
+                if len(self.out[self.fail[child]]):
+                    self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def __len__(self):
+        return len(self.goto)
+
+    def find_all(self, text):
+        '''
+
+        :param text:
+        :return: [(start, end, value)] of every occurrence, by end
+        '''
+        goto, fail, out = self.goto, self.fail, self.out
+        res = []
+        node = 0
+        for i, c in enumerate(text):
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            if len(out[node]):
+                for length, value in out[node]:
+                    res.append((i + 1 - length, i + 1, value))
+        return res
+
+
+class GazetteerScanner(object):
+    def __init__(self, dictionary):
+        """
+
+        :param dictionary: {province: {district: [sub district]}}
+        """
+        patterns = []
+        for p, districts in dictionary.items():
+            patterns.append((p, (PROVINCE, p)))
+            for d, sub_districts in districts.items():
+                patterns.append((d, (DISTRICT, d)))
+                patterns.extend((s, (SUB_DISTRICT, s)) for s in sub_districts)
+        patterns.extend((abbreviation, value) for abbreviation, value in ABBREVIATIONS.items())
+        patterns.extend((marker, (LEVEL_MARKER, level)) for marker, level in LEVEL_MARKERS.items())
+        # a name shared by several places of a level is reported once
+        self.automaton = AhoCorasick(sorted(set(patterns)))
+
+    def scan(self, text):
+        '''
+
+        :param text:
+        :return: [Hit] by start, longest first. A name right after a level word (spaces allowed)
+                 is only reported for that level, and only the hits tiling their token (with
+                 other hits and punctuation) are reported.
+        '''
+        found = self.automaton.find_all(text)
+        levels = {}  # start of the next non space character after a level word: level
+        for start, end, (kind, name) in found:
+            if kind == LEVEL_MARKER:
+                while end < len(text) and text[end] == ' ':
+                    end += 1
+                levels[end] = name
+        hits = []
+        for start, end, (kind, name) in found:
+            level = levels.get(start)
+            if level is not None and kind != LEVEL_MARKER and kind != level:
+                continue
+            hits.append(Hit(start, end, kind, name))
+        return aligned(text, hits)
+
+
+def aligned(text, hits):
+    '''
+
+    :param text:
+    :param hits: [Hit]
+    :return: the hits starting where a token or an other kept hit starts or ends, and ending
+             where a token or an other kept hit ends or starts, by start, longest first
+    '''
+    n = len(text)
+    by_start, by_end = {}, {}
+    for hit in hits:
+        by_start.setdefault(hit.start, []).append(hit)
+        by_end.setdefault(hit.end, []).append(hit)
+    # positions reached from the start of a token, walking over hits and punctuation
+    reached = {0} | {i + 1 for i, c in enumerate(text) if c == ' '}
+    for pos in range(n + 1):
+        if pos in reached:
+            reached.update(hit.end for hit in by_start.get(pos, ()))
+            if pos < n and text[pos] in PUNCTUATION:
+                reached.add(pos + 1)
+    # positions the end of a token is reached from
+    reaching = {n} | {i for i, c in enumerate(text) if c == ' '}
+    for pos in range(n, -1, -1):
+        if pos in reaching:
+            reaching.update(hit.start for hit in by_end.get(pos, ()))
+            if pos > 0 and text[pos - 1] in PUNCTUATION:
+                reaching.add(pos - 1)
+    res = [hit for hit in hits if hit.start in reached and hit.end in reaching]
+    res.sort(key=lambda h: (h.start, h.start - h.end))
+    return res
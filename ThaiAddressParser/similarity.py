@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: similarity.py
+@desc: similarity backends (scorers) the names of an address are matched with. A scorer is a
+       FuzzyIndex subclass: similarity(a, b) scores one pair, scores(query) scores a query
+       against the indexed names, top_k() / best() rank them. Every scorer gives 0 to names
+       sharing no character with the query and 1 to the query itself.
+       - quick_ratio: difflib's quick_ratio, the character counts in common (fuzzy.py)
+       - levenshtein: 1 - edit distance / length of the longer string. quick_ratio bounds it
+         from above, so the names are visited by their quick_ratio and the edit distance is
+         only computed, with a cutoff, for the names that can still make the best ones
+       - ngram: Jaccard index of the character bigrams (padded with a space at both ends),
+         from a bigram inverted index
+       - skeleton: quick_ratio of the Thai consonants only, vowels and tone marks are the
+         characters most often mistyped or left out
+       The scorer is chosen per parser, see ThaiAddressParserClass.set_scorer().
+'''
+import heapq
+from array import array
+from collections import Counter
+
+from .fuzzy import FuzzyIndex, index_class
+
+# names of a LevenshteinIndex query given their edit distance, the others count as 0
+LEVENSHTEIN_WIDTH = 20
+# Thai characters kept by skeleton(): the consonants ก to ฮ
+CONSONANTS = ('ก', 'ฮ')
+
+
+def levenshtein(a, b, floor=0.):
+    '''
+    1 - edit distance / length of the longer string, the distance stops being computed as soon
+    as the score falls below floor
+    :param a:
+    :param b:
+    :param floor:
+    :return: float, 0 below floor
+    '''
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    limit = int((1. - floor) * longest + 1e-9)  # largest distance scoring at least floor
+    if abs(len(a) - len(b)) > limit:
+        return 0.
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return 0.
+        previous = current
+    distance = previous[-1]
+    return 0. if distance > limit else 1. - distance / longest
+
+
+def bigrams(s):
+    '''
+
+    :param s:
+    :return: set of the character bigrams of ' ' + s + ' '
+    '''
+    s = ' ' + s + ' '
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+def skeleton(s):
+    '''
+
+    :param s:
+    :return: s without its Thai vowels, tone marks and signs, s itself when nothing is left
+    '''
+    res = ''.join(c for c in s if not '฀' <= c <= '๿' or CONSONANTS[0] <= c <= CONSONANTS[1])
+    return res if len(res) else s
+
+
+class LevenshteinIndex(FuzzyIndex):
+    @staticmethod
+    def similarity(a, b):
+        return levenshtein(a, b)
+
+    def scores(self, query):
+        '''
+        edit distance scores of the LEVENSHTEIN_WIDTH best names, first names win ties
+        :param query:
+        :return: {name position: score}
+        '''
+        bounds = [(-bound, idx) for idx, bound in FuzzyIndex.scores(self, query).items()]
+        heapq.heapify(bounds)
+        names = self.names
+        best = []  # heap of (score, -position), the worst kept name on top
+        while len(bounds):
+            bound, idx = heapq.heappop(bounds)
+            full = len(best) >= LEVENSHTEIN_WIDTH
+            if full and -bound < best[0][0]:
+                break
+            score = levenshtein(query, names[idx], best[0][0] if full else 0.)
+            if score <= 0:
+                continue
+            if not full:
+                heapq.heappush(best, (score, -idx))
+            elif (score, -idx) > best[0]:
+                heapq.heapreplace(best, (score, -idx))
+        return {-idx: score for score, idx in best}
+
+
+class NgramIndex(FuzzyIndex):
+    def __init__(self, names):
+        """
+
+        :param names: candidate names, the position in this list breaks ties
+        """
+        self.names = list(names)
+        self.lengths = array('i', [len(n) for n in self.names])
+        self.sizes = array('i')  # number of bigrams of each name
+        self.postings = {}  # bigram: array of name positions
+        for idx, name in enumerate(self.names):
+            grams = bigrams(name)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                if gram not in self.postings:
+                    self.postings[gram] = array('i')
+                self.postings[gram].append(idx)
+
+    @staticmethod
+    def similarity(a, b):
+        a, b = bigrams(a), bigrams(b)
+        common = len(a & b)
+        return common / (len(a) + len(b) - common)
+
+    def scores(self, query):
+        '''
+        bigram Jaccard index of the query against every name sharing a bigram with it
+        :param query:
+        :return: {name position: score}
+        '''
+        grams = bigrams(query)
+        matches = Counter()
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is not None:
+                matches.update(posting)
+        size = len(grams)
+        sizes = self.sizes
+        return {idx: m / (size + sizes[idx] - m) for idx, m in matches.items()}
+
+
+class SkeletonIndex(FuzzyIndex):
+    def __init__(self, names):
+        """
+
+        :param names: candidate names, the position in this list breaks ties
+        """
+        names = list(names)
+        FuzzyIndex.__init__(self, [skeleton(name) for name in names])
+        self.names = names
+
+    @staticmethod
+    def similarity(a, b):
+        return FuzzyIndex.similarity(skeleton(a), skeleton(b))
+
+    def scores(self, query):
+        '''
+        quick_ratio of the consonants of the query against the consonants of every name
+        :param query:
+        :return: {name position: score}
+        '''
+        return FuzzyIndex.scores(self, skeleton(query))
+
+
+SCORERS = {
+    'quick_ratio': FuzzyIndex,
+    'levenshtein': LevenshteinIndex,
+    'ngram': NgramIndex,
+    'skeleton': SkeletonIndex
+}
+
+
+def scorer_class(scorer='quick_ratio', engine='python'):
+    '''
+
+    :param scorer: name in SCORERS, or a FuzzyIndex subclass implementing similarity() and
+                   scores() with scores in [0, 1]
+    :param engine: see fuzzy.index_class(), only quick_ratio has a numpy engine
+    :return: FuzzyIndex class of the scorer
+    '''
+    if isinstance(scorer, type) and issubclass(scorer, FuzzyIndex):
+        return scorer
+    if scorer not in SCORERS:
+        raise ValueError('unknown scorer {!r}, expected one of {}'.format(scorer, tuple(SCORERS)))
+    if scorer == 'quick_ratio':
+        return index_class(engine)
+    return SCORERS[scorer]
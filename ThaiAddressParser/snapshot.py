@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: snapshot.py
+@desc: precompiled binary snapshot of a parser's tables.
+       The snapshot holds everything ThaiAddressParserClass derives from the json files
+       (interned names, lookup dicts, name lists and the fuzzy indexes), so starting a
+       parser is a single read + unpickle instead of json.load and rebuilding every table.
+       It records a digest of the json files it was built from and of the modules building
+       and holding the tables, and is ignored when either changed, in which case the parser
+       falls back to the json files.
+'''
+import os
+import pickle
+import hashlib
+
+MAGIC = b'THAIADDR'
+FORMAT_VERSION = 5
+# modules of the package the pickled state is built by or made of
+STATE_MODULES = ('__init__.py', 'gazetteer.py', 'postcodes.py', 'fuzzy.py', 'bangkok.py', 'normalize.py',
+                 'tokenizer.py', 'scanner.py')
+
+
+def source_digest(paths):
+    '''
+
+    :param paths: source json files
+    :return: sha1 of their content
+    '''
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def code_digest():
+    '''
+
+    :return: sha1 of the STATE_MODULES source, None when they are not shipped as source
+    '''
+    paths = [os.path.join(os.path.dirname(os.path.abspath(__file__)), m) for m in STATE_MODULES]
+    if not all(os.path.exists(p) for p in paths):
+        return None
+    return source_digest(paths)
+
+
+def write_snapshot(state, path, sources):
+    '''
+
+    :param state: attributes of the parser
+    :param path: snapshot file
+    :param sources: json files the state was built from
+    :return:
+    '''
+    payload = {
+        'format': FORMAT_VERSION,
+        'source': source_digest(sources),
+        'code': code_digest(),
+        'state': state
+    }
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path, sources=None):
+    '''
+
+    :param path: snapshot file
+    :param sources: json files the snapshot must have been built from, the check is
+                    skipped when they do not exist
+    :return: state dict, None when the snapshot is missing, corrupted or out of date
+    '''
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        return None
+    try:
+        payload = pickle.loads(data[len(MAGIC):])
+    except Exception:
+        return None
+    if not isinstance(payload, dict) or payload.get('format') != FORMAT_VERSION:
+        return None
+    if sources is not None and all(os.path.exists(p) for p in sources):
+        if payload['source'] != source_digest(sources):
+            return None
+    code = code_digest()
+    if code is not None and payload.get('code') != code:
+        return None
+    return payload['state']
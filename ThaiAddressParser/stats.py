@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: stats.py
+@desc: opt-in instrumentation of parse(). When enabled, every parse fills a ParseTrace: time spent
+       in each stage, the branches taken, the number of names compared to a token and the
+       exceptions that sent the address to the fallback. ParseStats aggregates the traces and a
+       hook can receive every trace (e.g. to log the slow ones). When disabled the parser only
+       checks that ParseContext.trace is None at a few places.
+'''
+import time
+import threading
+from collections import Counter
+
+
+class ParseTrace(object):
+    __slots__ = ('address', 'stages', 'branches', 'compared', 'errors', 'cached', 'seconds')
+
+    def __init__(self, address):
+        """
+        what happened during a single parse() call
+        :param address:
+        """
+        self.address = address
+        self.stages = {}  # stage: seconds, the branch stage is named after the branch
+        self.branches = []  # branches and arms taken, in order
+        self.compared = 0  # names compared to a token, token cache hits compare nothing
+        self.errors = []  # names of the exceptions caught before the fallback
+        self.cached = False  # served by the result cache
+        self.seconds = 0.
+
+    def lap(self, stage, since):
+        '''
+        add the time elapsed since `since` to a stage
+        :param stage:
+        :param since: time.perf_counter() value
+        :return: time.perf_counter() now, the start of the next stage
+        '''
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.) + now - since
+        return now
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ParseStats(object):
+    def __init__(self):
+        """
+        thread-safe aggregate of ParseTrace
+        """
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.parses = 0
+        self.cached = 0
+        self.seconds = 0.
+        self.max_seconds = 0.
+        self.compared = 0
+        self.stages = {}  # stage: [calls, seconds, max seconds]
+        self.paths = {}  # ' > '.join(branches): [parses, seconds, max seconds]
+        self.branches = Counter()
+        self.errors = Counter()
+
+    def record(self, trace):
+        with self._lock:
+            self.parses += 1
+            self.seconds += trace.seconds
+            self.max_seconds = max(self.max_seconds, trace.seconds)
+            if trace.cached:
+                self.cached += 1
+                return
+            self.compared += trace.compared
+            for stage, seconds in trace.stages.items():
+                self._add(self.stages, stage, seconds)
+            self._add(self.paths, ' > '.join(trace.branches), trace.seconds)
+            self.branches.update(trace.branches)
+            self.errors.update(trace.errors)
+
+    @staticmethod
+    def _add(table, key, seconds):
+        entry = table.get(key)
+        if entry is None:
+            table[key] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def info(self):
+        '''
+
+        :return: dict of the counters, times in milliseconds. stages and paths map to
+                 {'calls', 'total_ms', 'mean_ms', 'max_ms'}, paths are the branches of a parse
+                 joined by ' > '
+        '''
+        def timing(entry):
+            return {'calls': entry[0], 'total_ms': entry[1] * 1000,
+                    'mean_ms': entry[1] * 1000 / entry[0], 'max_ms': entry[2] * 1000}
+
+        with self._lock:
+            parsed = self.parses - self.cached
+            return {
+                'parses': self.parses,
+                'cached': self.cached,
+                'mean_ms': self.seconds * 1000 / self.parses if self.parses else 0.,
+                'max_ms': self.max_seconds * 1000,
+                'compared': self.compared,
+                'compared_per_parse': self.compared / parsed if parsed else 0.,
+                'stages': {k: timing(v) for k, v in self.stages.items()},
+                'paths': {k: timing(v) for k, v in sorted(self.paths.items(), key=lambda x: -x[1][1])},
+                'branches': dict(self.branches.most_common()),
+                'errors': dict(self.errors.most_common()),
+            }
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: tokenizer.py
+@desc: single pass tokenizer of a free address sentence.
+       Every space separated chunk is visited once. A chunk is split before its marker
+       (กรุงเทพมหานคร first, then จ., อ., ต., the first chunk is never split), the text in
+       front of the marker is glued to the previous token, and every token is typed once it
+       is complete. Markers are looked up with str.find, a regex alternation is several
+       times slower on these short strings, and nearly every chunk takes a fast path of
+       `in` tests and one character lookups.
+'''
+import re
+from .charclass import has_thai
+
+BANGKOK = 'กรุงเทพมหานคร'
+PROVINCE = 'province'
+DISTRICT = 'district'
+SUB_DISTRICT = 'sub_district'
+BANGKOK_MARKER = 'bangkok'
+POSTCODE = 'postcode'
+TEXT = 'text'
+
+POSTCODE_RE = re.compile(r'[0-9๐-๙]{5}$')
+# which marker splits a chunk holding several of them, after กรุงเทพมหานคร
+SPLIT_MARKERS = ('จ.', 'อ.', 'ต.')
+# (kind, marker) reported for a token, in this order
+MARKER_ORDER = ((PROVINCE, 'จ.'), (DISTRICT, 'อ.'), (SUB_DISTRICT, 'ต.'))
+# letter of a marker: its kind, for the fast path of tokenize()
+MARKER_LETTERS = {marker[0]: kind for kind, marker in MARKER_ORDER}
+
+"""
+a token is a plain tuple (text, kind, start, end, thai, markers), read by unpacking: a namedtuple
+costs more than twice as much to build, for every token of every address.
+text: the token, kind: one of the constants above, start / end: span in the original address
+(text in front of จ. / อ. glued to the previous token loses its space), thai: it holds Thai
+characters, markers: ((kind, name after the marker)) for every จ. / อ. / ต. in the token
+"""
+
+
+def _split_marker(chunk):
+    '''
+
+    :param chunk:
+    :return: (marker, position) the chunk is split at, (None, -1) when there is none
+    '''
+    t = chunk.find(BANGKOK)
+    if t >= 0:
+        return BANGKOK, t
+    if '.' in chunk:
+        for marker in SPLIT_MARKERS:
+            t = chunk.find(marker)
+            if t >= 0:
+                return marker, t
+    return None, -1
+
+
+def _make_token(text, start, end):
+    markers = ()
+    kind = TEXT
+    if text == BANGKOK:
+        kind = BANGKOK_MARKER
+    elif '.' in text:
+        first = -1  # position of the first จ. / อ. / ต.
+        found = []
+        for k, marker in MARKER_ORDER:
+            t = text.find(marker)
+            if t >= 0:
+                found.append((k, text[t + 2:]))
+                if first < 0 or t < first:
+                    first, kind = t, k
+        markers = tuple(found)
+    elif len(text) == 5 and text.isdecimal() and POSTCODE_RE.match(text) is not None:
+        kind = POSTCODE
+    return text, kind, start, end, not text.isascii() and has_thai(text), markers
+
+
+def tokenize(address):
+    '''
+
+    :param address: string type
+    :return: [(text, kind, start, end, thai, markers)], see above
+    '''
+    tokens = []
+    pos = 0
+    for chunk in address.split(' '):
+        start = pos
+        pos += len(chunk) + 1
+        if not len(chunk):
+            continue
+        # fast path of the chunks without a marker (99/1, ถ.สุขุมวิท, a name) or with a single one
+        # followed by its name (ต.บางเขน), nearly every chunk. Built with `in` tests and one
+        # character lookups, a str method call costs several of them on these short strings
+        if '.' not in chunk or ('จ.' not in chunk and 'อ.' not in chunk and 'ต.' not in chunk):
+            if BANGKOK not in chunk:
+                kind = POSTCODE if len(chunk) == 5 and chunk.isdecimal() and POSTCODE_RE.match(chunk) else TEXT
+                thai = not chunk.isascii() and ('฀' <= chunk[0] <= '๿' or has_thai(chunk))
+                tokens.append((chunk, kind, start, pos - 1, thai, ()))
+                continue
+        elif chunk[1] == '.' and len(chunk) > 2:
+            kind = MARKER_LETTERS.get(chunk[0])
+            name = chunk[2:]
+            if kind is not None and '.' not in name and BANGKOK not in name:
+                tokens.append((chunk, kind, start, pos - 1, True, ((kind, name),)))
+                continue
+        # the first chunk is never split
+        marker, t = _split_marker(chunk) if start else (None, -1)
+        if marker is None:
+            tokens.append(_make_token(chunk, start, pos - 1))
+            continue
+        if t:
+            prefix = chunk[:t]
+            if len(tokens):
+                text, _, first, _, _, _ = tokens[-1]
+                glue = ' ' if marker == 'ต.' else ''
+                tokens[-1] = _make_token(text + glue + prefix, first, start + t)
+            else:
+                tokens.append(_make_token(prefix, start, start + t))
+        if marker == BANGKOK:
+            tokens.append(_make_token(BANGKOK, start + t, start + t + len(BANGKOK)))
+        elif len(chunk) > t + 2:
+            tokens.append(_make_token(chunk[t:], start + t, pos - 1))
+    return tokens
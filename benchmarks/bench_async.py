@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_async.py
+@desc: an event loop under load: concurrent clients send addresses (with recurring ones)
+       while a heartbeat task measures how late the loop wakes it up. Compares parse() called
+       inline in the coroutines, aparse() on the default thread pool, and aparse() on a process
+       pool. A fifth of the requests are for a few hot addresses. Both caches are off, only
+       in-flight coalescing saves work.
+
+       python benchmarks/bench_async.py [requests] [clients]
+'''
+import sys
+import time
+import random
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+import ThaiAddressParser
+from ThaiAddressParser.aio import AsyncParser
+from corpus import typo_corpus
+
+HEARTBEAT = 0.001
+
+
+def _init_worker():
+    ThaiAddressParser.warm_up()
+    ThaiAddressParser.set_cache_size(0)
+    ThaiAddressParser.set_token_cache_size(0)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100. * len(values)))] if len(values) else 0.
+
+
+async def heartbeat(lags, stop):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + HEARTBEAT
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(max(0., loop.time() - expected))
+
+
+async def client(queue, call, latencies):
+    while True:
+        try:
+            address = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        await call(address)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(corpus, clients, call):
+    queue = asyncio.Queue()
+    for address in corpus:
+        queue.put_nowait(address)
+    lags, latencies = [], []
+    stop = asyncio.Event()
+    beat = asyncio.ensure_future(heartbeat(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*[client(queue, call, latencies) for _ in range(clients)])
+    cost = time.perf_counter() - start
+    stop.set()
+    await beat
+    return cost, latencies, lags
+
+
+def request_corpus(size, hot=10, hot_share=0.2, seed=0):
+    '''
+    typo corpus where hot_share of the requests are for a few hot addresses
+    :param size:
+    :param hot: number of hot addresses
+    :param hot_share:
+    :param seed:
+    :return: [address]
+    '''
+    rng = random.Random(seed)
+    corpus = typo_corpus(size, distinct=size // 4, seed=seed)
+    popular = corpus[:hot]
+    return [rng.choice(popular) if rng.random() < hot_share else address for address in corpus]
+
+
+def main(size=2000, clients=32):
+    corpus = request_corpus(size)
+    _init_worker()
+
+    async def inline(address):
+        return ThaiAddressParser.parse(address)
+
+    threads = AsyncParser(max_workers=2)
+    processes = AsyncParser(ProcessPoolExecutor(max_workers=2, initializer=_init_worker), max_workers=2)
+    # start the worker processes outside of the measure
+    asyncio.run(processes.parse(corpus[0]))
+    for label, parser in (('inline parse()', None), ('aparse() threads', threads), ('aparse() processes', processes)):
+        call = inline if parser is None else parser.parse
+        cost, latencies, lags = asyncio.run(run(corpus, clients, call))
+        print('{:<20} {:6.0f} addresses/s, latency p50 {:6.2f} ms p99 {:6.2f} ms, '
+              'loop lag p50 {:6.2f} ms p99 {:6.2f} ms max {:6.2f} ms{}'.format(
+                  label, size / cost, percentile(latencies, 50) * 1000, percentile(latencies, 99) * 1000,
+                  percentile(lags, 50) * 1000, percentile(lags, 99) * 1000, max(lags or [0.]) * 1000,
+                  ', coalesced {}'.format(parser.coalesced) if parser is not None else ''))
+    threads.shutdown()
+    processes.shutdown()
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:3]])
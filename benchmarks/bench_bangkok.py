@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_bangkok.py
+@desc: Bangkok addresses in the layouts they are written in (bare names, เขต / แขวง glued or
+       apart, ข. / อ. abbreviations, khwaeng only), exact or with one misspelled name: share of
+       right results, names compared and time per address, both caches off
+
+       python benchmarks/bench_bangkok.py [addresses per layout]
+'''
+import sys
+import random
+import time
+
+import ThaiAddressParser
+from corpus import BANGKOK, misspell, load_dictionary
+
+LAYOUTS = ('{s} {d}', 'แขวง{s} เขต{d}', 'แขวง {s} เขต {d}', 'ข.{s} เขต{d}', 'แขวง{s} อ.{d}', '{s}')
+
+
+def layout_corpus(layout, size, dictionary, typo):
+    rng = random.Random('{}:{}'.format(layout, typo))
+    districts = dictionary[BANGKOK]
+    rows = []
+    for _ in range(size):
+        d = rng.choice(sorted(districts))
+        s = rng.choice(sorted(districts[d]))
+        ms, md = s, d
+        if typo:
+            if rng.random() < 0.5 or layout == '{s}':
+                ms = misspell(rng, s)
+            else:
+                md = misspell(rng, d)
+        names = layout.format(s=ms, d=md)
+        rows.append(('{}/{} ถ.สุขุมวิท {} {}'.format(rng.randint(1, 999), rng.randint(1, 99), names, BANGKOK), (s, d)))
+    return rows
+
+
+def main(size=200):
+    ThaiAddressParser.set_cache_size(0)
+    ThaiAddressParser.set_token_cache_size(0)
+    dictionary = load_dictionary()
+    traces = []
+    ThaiAddressParser.enable_stats(hook=traces.append)
+    for typo in (False, True):
+        for layout in LAYOUTS:
+            rows = layout_corpus(layout, size, dictionary, typo)
+            ThaiAddressParser.parse(rows[0][0])
+            del traces[:]
+            right = 0
+            start = time.perf_counter()
+            for address, truth in rows:
+                res = ThaiAddressParser.parse(address)
+                right += (res['sub_district']['thai'], res['district']['thai']) == truth
+            cost = time.perf_counter() - start
+            print('{:<5} {:<18} {:6.1%} right {:6.1f} names compared {:6.3f} ms per address'.format(
+                'typo' if typo else 'exact', layout, right / len(rows),
+                sum(t.compared for t in traces) / len(traces), cost / len(rows) * 1e3))
+    ThaiAddressParser.disable_stats()
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:2]])
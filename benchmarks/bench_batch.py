@@ -0,0 +1,33 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_batch.py
+@desc: throughput of parse_many() from 1 to N worker processes.
+
+       python benchmarks/bench_batch.py [max_workers] [addresses]
+'''
+import os
+import sys
+import time
+
+import ThaiAddressParser
+from corpus import clean_corpus
+
+
+def main(max_workers=None, size=20000):
+    max_workers = max_workers or os.cpu_count() or 1
+    corpus = clean_corpus(size)
+    expected = None
+    for workers in sorted({1, 2, 4, 8, 16, max_workers}):
+        if workers > max_workers:
+            continue
+        start = time.time()
+        results = list(ThaiAddressParser.parse_many(iter(corpus), workers=workers, chunksize=500))
+        cost = time.time() - start
+        expected = results if expected is None else expected
+        print('workers: {:>2}, {:.0f} addresses/s, same as 1 worker: {}'.format(
+            workers, len(corpus) / cost, results == expected))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:3]])
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_charclass.py
+@desc: Thai character check on long addresses mixing Thai and English: the former
+       check_th_chars (set rebuilt on every call) vs charclass.has_thai(), per token. Also
+       checks the former and new checks agree.
+
+       python benchmarks/bench_charclass.py [addresses] [rounds]
+'''
+import sys
+import time
+import random
+
+from ThaiAddressParser.charclass import has_thai
+from corpus import clean_corpus
+
+ENGLISH = ['Sukhumvit Road', 'Soi 23', 'ABC Tower 12th Floor', 'Room 1204', 'Moo 5',
+           'Ratchadaphisek Rd.', 'Condo Unit B-17', 'Building C', 'Village No. 3']
+
+
+def legacy_check_th_chars(s):
+    # check_th_chars before charclass.py, kept as the reference
+    TH_CHAR_RANGE = range(0x0E00, 0x0E7F + 1)
+    Th_chars = set(map(chr, TH_CHAR_RANGE))
+    t = []
+    for c in s:
+        if c in Th_chars:
+            t.append(c)
+    return len(t) > 0
+
+
+def mixed_corpus(size, seed=0):
+    '''
+    clean addresses with English fragments, Thai digits and extra Thai text around them
+    :param size:
+    :param seed:
+    :return:
+    '''
+    rng = random.Random(seed)
+    corpus = []
+    for address in clean_corpus(size, seed):
+        parts = address.split(' ')
+        for _ in range(rng.randint(2, 5)):
+            parts.insert(rng.randrange(len(parts) + 1), rng.choice(ENGLISH))
+        if rng.random() < 0.3:
+            parts.insert(1, 'หมู่บ้านเมืองทองธานี ซอย ๑๒')
+        corpus.append(' '.join(parts))
+    return corpus
+
+
+def main(size=3000, rounds=5):
+    tokens = [t for address in mixed_corpus(size) for t in address.split(' ') if len(t)]
+    mismatches = sum(legacy_check_th_chars(t) != has_thai(t) for t in tokens)
+    print('{} tokens, mismatches: {}'.format(len(tokens), mismatches))
+    for label, func in (('former check_th_chars', legacy_check_th_chars), ('has_thai', has_thai)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for t in tokens:
+                func(t)
+        cost = time.perf_counter() - start
+        print('{:<22} {:.3f} us per token'.format(label, cost * 1e6 / (rounds * len(tokens))))
+    return mismatches
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main(*[int(i) for i in sys.argv[1:3]]) else 0)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_concurrency.py
+@desc: stress test of one shared parser under heavy thread concurrency.
+       A freshly built parser, with none of its lazy structures (scanner, area and
+       subtree indexes, name maps) built yet, parses every address many times from a
+       thread pool, so that first use races show up. Its caches are off, every job is a full
+       parse() racing inside the parser and its ParseContext. The results must be identical
+       to those of the module level parser, parsing sequentially.
+
+       python benchmarks/bench_concurrency.py [threads] [rounds]
+'''
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import ThaiAddressParser
+from corpus import CASES, case_corpus, load_dictionary
+
+
+def build_corpus():
+    '''
+    addresses with full markers
+    :return:
+    '''
+    corpus = []
+    dictionary = ThaiAddressParser.app.dictionary
+    for n, p in enumerate(sorted(dictionary.keys())):
+        for d in sorted(dictionary[p].keys())[:3]:
+            s = sorted(dictionary[p][d])[0]
+            if p == 'กรุงเทพมหานคร':
+                corpus.append('{}/1 ถ.สุขุมวิท {} {} {}'.format(n, s, d, p))
+            else:
+                corpus.append('{}/1 ถ.สุขุมวิท ต.{} อ.{} จ.{}'.format(n, s, d, p))
+    # misspelled, markerless, glued and postcode addresses reach the lazily built structures
+    dictionary = load_dictionary()
+    for case in CASES:
+        corpus.extend(address for address, _ in case_corpus(case, 60, dictionary=dictionary))
+    return corpus
+
+
+def cold_parser():
+    '''
+    a new parser sharing nothing with the module level one, without caches: every job runs the
+    whole parse() instead of an LRU lookup
+    :return: ThaiAddressParserClass
+    '''
+    return ThaiAddressParser.ThaiAddressParserClass(
+        file_path=os.path.join(ThaiAddressParser.DATA_DIR, ThaiAddressParser.DICTIONARY_FILE),
+        translation_db=os.path.join(ThaiAddressParser.DATA_DIR, ThaiAddressParser.TRANSLATION_FILE),
+        snapshot_path=os.path.join(ThaiAddressParser.DATA_DIR, ThaiAddressParser.SNAPSHOT_FILE),
+        cache_size=0, token_cache_size=0)
+
+
+def main(threads=16, rounds=20):
+    corpus = build_corpus()
+    parser = cold_parser()
+    jobs = corpus * rounds
+    # switch threads far more often than the default 5 ms, to interleave them inside every stage
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    start = time.time()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = list(pool.map(parser.parse, jobs))
+    finally:
+        sys.setswitchinterval(interval)
+    cost = time.time() - start
+    expected = [ThaiAddressParser.app.parse(a) for a in corpus]
+    mismatches = sum(1 for i, r in enumerate(results) if r != expected[i % len(corpus)])
+    print('threads: {}, addresses: {}, time: {:.2f} s, {:.3f} ms per address, mismatches: {}'.format(
+        threads, len(jobs), cost, cost * 1000 / len(jobs), mismatches))
+    return mismatches
+
+
+if __name__ == '__main__':
+    args = [int(i) for i in sys.argv[1:3]]
+    sys.exit(1 if main(*args) else 0)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_dedup.py
+@desc: manifest like input (a few hundred misspelled name triples, every address different,
+       some rows sent twice) parsed address by address and as batches of several sizes, with
+       and without the token cache. The result cache is off, the addresses do not repeat
+       across runs in real manifests. Checks that batches give the same results.
+
+       python benchmarks/bench_dedup.py [addresses]
+'''
+import sys
+import time
+import random
+
+import ThaiAddressParser
+from corpus import typo_corpus
+
+
+def manifest(size, seed=0):
+    rng = random.Random(seed)
+    rows = typo_corpus(size, distinct=300, seed=seed)
+    # resent rows
+    for n in range(size // 20):
+        rows[rng.randrange(size)] = rows[rng.randrange(size)]
+    return rows
+
+
+def main(size=5000):
+    ThaiAddressParser.set_cache_size(0)
+    rows = manifest(size)
+    expected = None
+    for token_cache in (0, 50000):
+        ThaiAddressParser.set_token_cache_size(token_cache)
+        label = 'token cache {}'.format('on' if token_cache else 'off')
+        start = time.perf_counter()
+        results = [ThaiAddressParser.parse(address) for address in rows]
+        cost = time.perf_counter() - start
+        expected = results if expected is None else expected
+        print('{:<15} one by one      {:6.0f} addresses/s'.format(label, size / cost))
+        for batch_size in (64, 256, 1024):
+            # start each run with an empty token cache
+            ThaiAddressParser.set_token_cache_size(token_cache)
+            start = time.perf_counter()
+            results = []
+            for i in range(0, size, batch_size):
+                results += ThaiAddressParser.parse_batch(rows[i:i + batch_size])
+            cost = time.perf_counter() - start
+            print('{:<15} batches of {:<5} {:6.0f} addresses/s, same results: {}'.format(
+                label, batch_size, size / cost, results == expected))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:2]])
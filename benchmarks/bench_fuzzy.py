@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_fuzzy.py
+@desc: linear difflib scan vs FuzzyIndex (and the numpy engine when numpy is
+       installed) over all non Bangkok sub districts, on misspelled names. Reports
+       the latency percentiles of each and checks that they pick the same best
+       candidate.
+
+       python benchmarks/bench_fuzzy.py [queries]
+'''
+import sys
+import time
+import random
+
+import ThaiAddressParser
+from ThaiAddressParser import compute_similarity
+from ThaiAddressParser.fuzzy import ENGINES, index_class
+
+
+def misspell(rng, s):
+    i = rng.randrange(len(s))
+    op = rng.random()
+    if op < 0.4:
+        return s[:i] + s[i + 1:]
+    elif op < 0.7:
+        return s[:i] + rng.choice('กขคงจมนยรลวสห') + s[i + 1:]
+    return s[:i] + s[i] + s[i:]
+
+
+def linear_best(names, query):
+    best, max_degree = None, -1
+    for name in names:
+        degree = compute_similarity(query, name, mode=1)
+        if degree > max_degree:
+            best, max_degree = name, degree
+    return best, max_degree
+
+
+def percentiles(costs):
+    costs = sorted(costs)
+    return [costs[min(len(costs) - 1, int(len(costs) * q))] * 1000 for q in (0.5, 0.9, 0.99)] + [costs[-1] * 1000]
+
+
+def main(queries=300):
+    names = ThaiAddressParser.app.non_bangkok_sub_districts
+    rng = random.Random(0)
+    tokens = [misspell(rng, rng.choice(names)) for _ in range(queries)]
+
+    indexes = []
+    for engine in ENGINES:
+        try:
+            cls = index_class(engine)
+        except ImportError as e:
+            print('{} engine skipped: {}'.format(engine, e))
+            continue
+        start = time.time()
+        indexes.append(('{} engine'.format(engine), cls(names)))
+        print('{} index build: {:.1f} ms over {} names'.format(engine, (time.time() - start) * 1000, len(names)))
+
+    linear_costs, mismatches = [], 0
+    index_costs = [[] for _ in indexes]
+    for token in tokens:
+        start = time.time()
+        expected = linear_best(names, token)
+        linear_costs.append(time.time() - start)
+        for (_, index), costs in zip(indexes, index_costs):
+            start = time.time()
+            got = index.best(token)
+            costs.append(time.time() - start)
+            mismatches += expected != got
+    for label, costs in [('difflib scan', linear_costs)] + [(l, c) for (l, _), c in zip(indexes, index_costs)]:
+        print('{:<14} p50 {:.3f} ms, p90 {:.3f} ms, p99 {:.3f} ms, max {:.3f} ms'.format(
+            label, *percentiles(costs)))
+    print('mismatches: {}'.format(mismatches))
+    return mismatches
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main(*[int(i) for i in sys.argv[1:2]]) else 0)
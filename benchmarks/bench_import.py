@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_import.py
+@desc: cold start cost of `import ThaiAddressParser` alone and of import + warm_up(),
+       each measured in a fresh interpreter.
+
+       python benchmarks/bench_import.py [runs]
+'''
+import os
+import sys
+import subprocess
+
+
+SNIPPETS = [
+    ('import', 'import ThaiAddressParser'),
+    ('import + warm_up()', 'import ThaiAddressParser; ThaiAddressParser.warm_up()'),
+    ('import + first parse()', 'import ThaiAddressParser; '
+                               'ThaiAddressParser.parse("7503 ถ.ราชญาวิริกษา ต.แม่กลอง อ.เมืองสมุทรสงคราม จ.สมุทรสงคราม")'),
+]
+
+
+def measure(code, runs):
+    timer = 'import time; _t = time.perf_counter(); {}; print(time.perf_counter() - _t)'.format(code)
+    costs = []
+    for _ in range(runs):
+        out = subprocess.check_output([sys.executable, '-c', timer], env=dict(os.environ))
+        costs.append(float(out.decode().strip().splitlines()[-1]))
+    costs.sort()
+    return costs[len(costs) // 2]
+
+
+def main(runs=5):
+    for label, code in SNIPPETS:
+        print('{:<24} median {:.1f} ms'.format(label, measure(code, runs) * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:2]])
@@ -0,0 +1,505 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_joint.py
+@desc: work of the name search outside Bangkok: names compared to a token, time per address and
+       share of right results, joint_search() vs the former sequential cascade of
+       parse_other_province() (kept below as the reference, with the Gazetteer helpers only it
+       used), for every case of the suite corpus that reaches it and every branch path taken,
+       both caches off so every address is searched from scratch
+
+       python benchmarks/bench_joint.py [addresses per case]
+'''
+import sys
+from collections import defaultdict
+
+import ThaiAddressParser
+from ThaiAddressParser import compute_similarity
+from corpus import case_corpus, load_dictionary
+
+CASES = ('clean', 'typo', 'non_bangkok', 'mixed_script')
+
+
+def province_of(g, district, provinces=None):
+    '''
+    province of a district name. A name shared by several districts resolves to the first
+    one inside `provinces` when given, otherwise to the first one.
+    Gazetteer.province_of() of the former cascade
+    :param g: Gazetteer
+    :param district:
+    :param provinces: province names the district should belong to
+    :return: province name
+    '''
+    ids = g.district_ids(district)
+    if not len(ids):
+        raise KeyError(district)
+    if provinces is not None and len(ids) > 1:
+        for d_id in ids:
+            p = g.province(g.district_province[d_id])
+            if p in provinces:
+                return p
+    return g.province(g.district_province[ids[0]])
+
+
+def parents_of(g, sub_district, districts=None, provinces=None):
+    '''
+    (district, province) of a sub district name, a shared name resolves to the first one
+    inside `districts` and `provinces` when given, otherwise to the first one.
+    Gazetteer.parents_of() of the former cascade
+    :param g: Gazetteer
+    :param sub_district:
+    :param districts: district names the sub district should belong to
+    :param provinces: province names the sub district should belong to
+    :return: (district, province)
+    '''
+    candidates = g.parents(sub_district)
+    if len(candidates) > 1:
+        for d, p in candidates:
+            if (districts is None or d in districts) and (provinces is None or p in provinces):
+                return d, p
+        if districts is not None and provinces is not None:
+            for d, p in candidates:
+                if p in provinces:
+                    return d, p
+    return candidates[0]
+
+
+def legacy_parse_other_province(app, ctx):
+    # parse_other_province() before joint_search(), kept as the reference
+    province = 'null'
+    district = 'null'
+    sub_district = 'null'
+    detailed_address = 'null'
+    if len(ctx.o_province) and len(ctx.o_district):
+        ctx.mark('province_district')
+        inter_provinces = list(set(ctx.o_province) & set(app.non_bangkok_provinces))
+        if len(inter_provinces):
+            district_candidates = []
+            for p in inter_provinces:
+                district_candidates += list(app.dictionary[p].keys())
+            inter_districts = list(set(district_candidates) & set(ctx.o_district))
+            if len(inter_districts):
+                sub_district_temp = []
+                for d in inter_districts:
+                    p = province_of(app.gazetteer, d, inter_provinces)
+                    sub_district_temp += app.dictionary[p][d]
+                inter_sub_districts = list(set(ctx.o_sub_district) & set(sub_district_temp))
+                if len(inter_sub_districts):
+                    sub_district = inter_sub_districts[0]
+                    district, province = parents_of(app.gazetteer, sub_district, inter_districts, inter_provinces)
+                    idx = ctx.o_sub_district.index(sub_district)
+                    idx = ctx.non_bangkok_sub_district_index[idx]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    if len(ctx.o_sub_district):
+                        lens = [len(i) for i in ctx.o_sub_district]
+                        max_index = lens.index(max(lens))
+                        sub_district_candidate = ctx.o_sub_district[max_index]
+                        sub_district, max_degree = app.resolve(
+                            ctx, sub_district_candidate, 'sub_district',
+                            ('districts', tuple(inter_provinces), tuple(inter_districts)), sub_district_temp)
+                        idx = ctx.non_bangkok_sub_district_index[max_index]
+                        district, province = parents_of(app.gazetteer, sub_district, inter_districts,
+                                                                            inter_provinces)
+                        original_idx = ctx.thai_parts_index[idx][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        district = inter_districts[0]
+                        province = province_of(app.gazetteer, district, inter_provinces)
+                        sub_district_candidates = app.dictionary[province][district]
+                        d_idx = ctx.o_district.index(district)
+                        d_idx = ctx.non_bangkok_district_index[d_idx]
+                        if d_idx - 1 >= 0:
+                            selected_sub_district = ctx.thai_parts[d_idx - 1]
+                            sub_district, max_degree = app.resolve(
+                                ctx, selected_sub_district, 'sub_district', ('district', province, district),
+                                sub_district_candidates)
+                            original_idx = ctx.thai_parts_index[d_idx - 1][1]
+                            detailed_address = ' '.join(ctx.address_list[:original_idx])
+                        else:
+                            sub_district = app.fallback(ctx, 'sub_district', sub_district_candidates)
+                            original_idx = ctx.thai_parts_index[d_idx][1]
+                            detailed_address = ' '.join(ctx.address_list[:original_idx])
+            else:
+                district, max_degree, re_idx = app.resolve_any(
+                    ctx, ctx.o_district, 'district', ('provinces',) + tuple(inter_provinces), district_candidates)
+                province = province_of(app.gazetteer, district, inter_provinces)
+                sub_district_candidates = app.dictionary[province][district]
+                if len(ctx.o_sub_district):
+                    lens = [len(i) for i in ctx.o_sub_district]
+                    max_index = lens.index(max(lens))
+                    sub_district_candidate = ctx.o_sub_district[max_index]
+                    sub_district, max_degree = app.resolve(
+                        ctx, sub_district_candidate, 'sub_district', ('district', province, district),
+                        sub_district_candidates)
+                    idx = ctx.non_bangkok_sub_district_index[max_index]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    d_idx = ctx.non_bangkok_district_index[re_idx]
+                    if d_idx - 1 >= 0:
+                        sub_district_candidate = ctx.thai_parts[d_idx - 1]
+                        sub_district, max_degree = app.resolve(
+                            ctx, sub_district_candidate, 'sub_district', ('district', province, district),
+                            sub_district_candidates)
+                        original_idx = ctx.thai_parts_index[d_idx - 1][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        sub_district = app.fallback(ctx, 'sub_district', sub_district_candidates)
+                        original_idx = ctx.thai_parts_index[d_idx][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+        else:
+            inter_districts = list(set(ctx.o_district) & set(app.non_bangkok_districts))
+            if len(inter_districts):
+                district = inter_districts[0]
+                province = province_of(app.gazetteer, district, app.non_bangkok_province_set)
+                sub_district_candidates = app.dictionary[province][district]
+                if len(ctx.o_sub_district):
+                    lens = [len(i) for i in ctx.o_sub_district]
+                    max_index = lens.index(max(lens))
+                    sub_district_candidate = ctx.o_sub_district[max_index]
+                    sub_district, max_degree = app.resolve(
+                        ctx, sub_district_candidate, 'sub_district', ('district', province, district),
+                        sub_district_candidates)
+                    idx = ctx.non_bangkok_sub_district_index[max_index]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    d_idx = ctx.o_district.index(district)
+                    d_idx = ctx.non_bangkok_district_index[d_idx]
+                    if d_idx - 1 >= 0:
+                        selected_sub_district = ctx.thai_parts[d_idx - 1]
+                        sub_district, max_degree = app.resolve(
+                            ctx, selected_sub_district, 'sub_district', ('district', province, district),
+                            sub_district_candidates)
+                        original_idx = ctx.thai_parts_index[d_idx - 1][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        sub_district = app.fallback(ctx, 'sub_district', sub_district_candidates)
+                        original_idx = ctx.thai_parts_index[d_idx][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+            else:
+                province, max_degree, _, _ = app.scan(ctx, ctx.o_province, 'province')
+                district_candidates = list(app.dictionary[province].keys())
+                district, max_degree, re_idx = app.resolve_any(
+                    ctx, ctx.o_district, 'district', ('provinces', province), district_candidates)
+                sub_district_candidates = app.dictionary[province][district]
+                if len(ctx.o_sub_district):
+                    lens = [len(i) for i in ctx.o_sub_district]
+                    max_index = lens.index(max(lens))
+                    sub_district_candidate = ctx.o_sub_district[max_index]
+                    sub_district, max_degree = app.resolve(
+                        ctx, sub_district_candidate, 'sub_district', ('district', province, district),
+                        sub_district_candidates)
+                    idx = ctx.non_bangkok_sub_district_index[max_index]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    if re_idx - 1 >= 0:
+                        selected_sub_district = ctx.thai_parts[re_idx - 1]
+                        sub_district, max_degree = app.resolve(
+                            ctx, selected_sub_district, 'sub_district', ('district', province, district),
+                            sub_district_candidates)
+                        original_idx = ctx.thai_parts_index[re_idx - 1][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        sub_district = app.fallback(ctx, 'sub_district', sub_district_candidates)
+                        original_idx = ctx.thai_parts_index[re_idx][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+
+    elif len(ctx.o_province) and len(ctx.o_district) == 0:
+        ctx.mark('province_no_district')
+        if len(ctx.o_sub_district):
+            inter_provinces = list(set(ctx.o_province) & set(app.non_bangkok_provinces))
+            if len(inter_provinces):
+                temp_districts = []
+                temp_sub_districts = []
+                for p in inter_provinces:
+                    temp_districts += list(app.dictionary[p].keys())
+                    for d in app.dictionary[p].keys():
+                        temp_sub_districts += app.dictionary[p][d]
+                inter_sub_districts = list(set(ctx.o_sub_district) & set(temp_sub_districts))
+                if len(inter_sub_districts):
+                    sub_district = inter_sub_districts[0]
+                    district, province = parents_of(app.gazetteer, sub_district, provinces=inter_provinces)
+                    idx = ctx.o_sub_district.index(sub_district)
+                    idx = ctx.non_bangkok_sub_district_index[idx]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    sub_district, max_degree, re_idx = app.resolve_any(
+                        ctx, ctx.o_sub_district, 'sub_district', ('provinces',) + tuple(inter_provinces),
+                        temp_sub_districts)
+                    district, province = parents_of(app.gazetteer, sub_district, provinces=inter_provinces)
+                    idx = ctx.non_bangkok_sub_district_index[re_idx]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+            else:
+                province, max_degree, _, _ = app.scan(ctx, ctx.o_province, 'province')
+                temp_sub_districts = []
+                for d in app.dictionary[province].keys():
+                    temp_sub_districts += app.dictionary[province][d]
+                inter_sub_districts = list(set(ctx.o_sub_district) & set(temp_sub_districts))
+                if len(inter_sub_districts):
+                    sub_district = inter_sub_districts[0]
+                    district, province = parents_of(app.gazetteer, sub_district, provinces=[province])
+                    idx = ctx.o_sub_district.index(sub_district)
+                    idx = ctx.non_bangkok_sub_district_index[idx]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    sub_district, max_degree, re_idx = app.resolve_any(
+                        ctx, ctx.o_sub_district, 'sub_district', ('provinces', province), temp_sub_districts)
+                    district, province = parents_of(app.gazetteer, sub_district, provinces=[province])
+                    idx = ctx.non_bangkok_sub_district_index[re_idx]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+        else:
+            inter_provinces = list(set(ctx.o_province) & set(app.non_bangkok_provinces))
+            if len(inter_provinces):
+                temp_districts = []
+                temp_sub_districts = []
+                province = inter_provinces[0]
+                temp_districts += list(app.dictionary[province].keys())
+                for d in app.dictionary[province].keys():
+                    temp_sub_districts += app.dictionary[province][d]
+                p_idx = ctx.o_province.index(province)
+                p_idx = ctx.non_bangkok_province_index[p_idx]
+                if p_idx - 2 >= 0:
+                    sub_district_candidate = ctx.thai_parts[p_idx - 2]
+                    if sub_district_candidate in temp_sub_districts:
+                        sub_district = sub_district_candidate
+                        district, province = parents_of(app.gazetteer, sub_district, provinces=[province])
+                        original_idx = ctx.thai_parts_index[p_idx - 2][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        sub_district, max_degree = app.resolve(
+                            ctx, sub_district_candidate, 'sub_district', ('provinces', province), temp_sub_districts)
+                        district, province = parents_of(app.gazetteer, sub_district, provinces=[province])
+                        original_idx = ctx.thai_parts_index[p_idx - 2][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    if p_idx - 1 >= 0:
+                        district_candidate = ctx.thai_parts[p_idx - 1]
+                        district, max_degree = app.resolve(
+                            ctx, district_candidate, 'district', ('provinces', province), temp_districts)
+                        sub_district = app.fallback(ctx, 'sub_district', app.dictionary[province][district])
+                        original_idx = ctx.thai_parts_index[p_idx - 1][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        district = app.fallback(ctx, 'district', temp_districts)
+                        sub_district = app.fallback(ctx, 'sub_district', app.dictionary[province][district])
+                        original_idx = ctx.thai_parts_index[p_idx][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+            else:
+                province, max_degree, re_idx, _ = app.scan(ctx, ctx.o_province, 'province')
+                temp_sub_districts = []
+                temp_districts = []
+                for d in app.dictionary[province].keys():
+                    temp_districts.append(d)
+                    temp_sub_districts += app.dictionary[province][d]
+                p_idx = ctx.non_bangkok_province_index[re_idx]
+                if p_idx - 2 >= 0:
+                    sub_district_candidate = ctx.thai_parts[p_idx - 2]
+                    if sub_district_candidate in temp_sub_districts:
+                        sub_district = sub_district_candidate
+                        district, province = parents_of(app.gazetteer, sub_district, provinces=[province])
+                        original_idx = ctx.thai_parts_index[p_idx - 2][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        sub_district, max_degree = app.resolve(
+                            ctx, sub_district_candidate, 'sub_district', ('provinces', province), temp_sub_districts)
+                        district, province = parents_of(app.gazetteer, sub_district, provinces=[province])
+                        original_idx = ctx.thai_parts_index[p_idx - 2][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    if p_idx - 1 >= 0:
+                        district_candidate = ctx.thai_parts[p_idx - 1]
+                        district, max_degree = app.resolve(
+                            ctx, district_candidate, 'district', ('provinces', province), temp_districts)
+                        sub_district = app.fallback(ctx, 'sub_district', app.dictionary[province][district])
+                        original_idx = ctx.thai_parts_index[p_idx - 1][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        district = app.fallback(ctx, 'district', temp_districts)
+                        sub_district = app.fallback(ctx, 'sub_district', app.dictionary[province][district])
+                        original_idx = ctx.thai_parts_index[p_idx][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+
+    elif len(ctx.o_province) == 0 and len(ctx.o_district):
+        ctx.mark('district_no_province')
+        inter_districts = list(set(ctx.o_district) & set(app.non_bangkok_districts))
+        if len(inter_districts):
+            temp_sub_districts = []
+            for j in inter_districts:
+                j_p = province_of(app.gazetteer, j, app.non_bangkok_province_set)
+                j_sub_districts = app.dictionary[j_p][j]
+                temp_sub_districts += j_sub_districts
+            inter_sub_districts = list(set(ctx.o_sub_district) & set(temp_sub_districts))
+            if len(inter_sub_districts):
+                sub_district = inter_sub_districts[0]
+                district, province = parents_of(app.gazetteer, 
+                    sub_district, inter_districts, app.non_bangkok_province_set)
+                idx = ctx.o_sub_district.index(sub_district)
+                idx = ctx.non_bangkok_sub_district_index[idx]
+                original_idx = ctx.thai_parts_index[idx][1]
+                detailed_address = ' '.join(ctx.address_list[:original_idx])
+            else:
+                if len(ctx.o_sub_district):
+                    sub_district, max_degree, idx = app.resolve_any(
+                        ctx, ctx.o_sub_district, 'sub_district', ('districts', 'non_bangkok', tuple(inter_districts)),
+                        temp_sub_districts)
+                    idx = ctx.non_bangkok_sub_district_index[idx]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    district, province = parents_of(app.gazetteer, 
+                        sub_district, inter_districts, app.non_bangkok_province_set)
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    district = inter_districts[0]
+                    province = province_of(app.gazetteer, district, app.non_bangkok_province_set)
+                    all_sub_districts = app.dictionary[province][district]
+                    idx = ctx.o_district.index(district)
+                    idx = ctx.non_bangkok_district_index[idx]
+                    if idx - 1 >= 0:
+                        sub_district, max_degree = app.resolve(
+                            ctx, ctx.thai_parts[idx - 1], 'sub_district', ('district', province, district),
+                            all_sub_districts)
+                        original_idx = ctx.thai_parts_index[idx - 1][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+                    else:
+                        sub_district = app.fallback(ctx, 'sub_district', all_sub_districts)
+                        original_idx = ctx.thai_parts_index[idx][1]
+                        detailed_address = ' '.join(ctx.address_list[:original_idx])
+        else:
+            if len(ctx.o_sub_district):
+                inter_sub_districts = list(set(ctx.o_sub_district) & set(app.non_bangkok_sub_districts))
+                max_degree = -1
+                if len(inter_sub_districts):
+                    for i in inter_sub_districts:
+                        for d, p in app.gazetteer.parents(i):
+                            if p not in app.non_bangkok_province_set:
+                                continue
+                            ctx.compared(len(ctx.o_district))
+                            for j in ctx.o_district:
+                                degree = compute_similarity(j, d, mode=1)
+                                if degree > max_degree:
+                                    max_degree = degree
+                                    district = d
+                                    sub_district = i
+                                    province = p
+                    idx = ctx.o_sub_district.index(sub_district)
+                    idx = ctx.non_bangkok_sub_district_index[idx]
+                    original_idx = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_idx])
+                else:
+                    district_candidates = ctx.o_district
+                    lens = [len(i) for i in district_candidates]
+                    max_index = lens.index(max(lens))
+                    district_candidate = district_candidates[max_index]
+                    district, max_degree, _, provinces = app.scan(ctx, [district_candidate], 'district')
+                    province = province_of(app.gazetteer, district, provinces)
+                    sub_district_candidates = app.dictionary[province][district]
+                    sub_districts_lens = [len(i) for i in ctx.o_sub_district]
+                    max_index = sub_districts_lens.index(max(sub_districts_lens))
+                    selected_sub_district = ctx.o_sub_district[max_index]
+                    sub_district, max_degree = app.resolve(
+                        ctx, selected_sub_district, 'sub_district', ('district', province, district),
+                        sub_district_candidates)
+                    idx = ctx.non_bangkok_sub_district_index[max_index]
+                    original_index = ctx.thai_parts_index[idx][1]
+                    detailed_address = ' '.join(ctx.address_list[:original_index])
+            else:
+                district_candidates = ctx.o_district
+                lens = [len(i) for i in district_candidates]
+                max_index = lens.index(max(lens))
+                district_candidate = district_candidates[max_index]
+                district, max_degree, _, provinces = app.scan(ctx, [district_candidate], 'district')
+                province = province_of(app.gazetteer, district, provinces)
+                sub_district_candidates = app.dictionary[province][district]
+                idx = ctx.non_bangkok_district_index[max_index]
+                if idx - 1 >= 0:
+                    sub_district_temp = ctx.thai_parts[idx - 1]
+                    sub_district, max_degree = app.resolve(
+                        ctx, sub_district_temp, 'sub_district', ('district', province, district),
+                        sub_district_candidates)
+                    detailed_address = ' '.join(ctx.address_list[:(ctx.thai_parts_index[idx - 1][1])])
+                else:
+                    sub_district = app.fallback(ctx, 'sub_district', sub_district_candidates)
+                    detailed_address = ' '.join(ctx.address_list[:(ctx.thai_parts_index[idx][1])])
+
+    else:
+        ctx.mark('sub_district_only')
+        sub_district_candidates = ctx.o_sub_district
+        inter_sub_districts = list(set(sub_district_candidates) & set(app.non_bangkok_sub_districts))
+        if len(inter_sub_districts):
+            sub_district = inter_sub_districts[0]
+            district, province = parents_of(app.gazetteer, sub_district, provinces=app.non_bangkok_province_set)
+            idx = ctx.o_sub_district.index(sub_district)
+            idx = ctx.non_bangkok_sub_district_index[idx]
+            original_idx = ctx.thai_parts_index[idx][1]
+            detailed_address = ' '.join(ctx.address_list[:original_idx])
+        else:
+            lens = [len(i) for i in sub_district_candidates]
+            max_index = lens.index(max(lens))
+            sub_district_candidate = sub_district_candidates[max_index]
+            sub_district, max_degree, _, provinces = app.scan(ctx, [sub_district_candidate], 'sub_district')
+            district, province = parents_of(app.gazetteer, sub_district, provinces=provinces)
+            idx = ctx.non_bangkok_sub_district_index[max_index]
+            original_idx = ctx.thai_parts_index[idx][1]
+            detailed_address = ' '.join(ctx.address_list[:original_idx])
+
+    result = ['{} {} {} {}'.format(detailed_address, 'ต.' + sub_district, 'อ.' + district, 'จ.' + province),
+              detailed_address, sub_district, district, province]
+    return result
+
+
+def measure(rows, traces):
+    '''
+
+    :param rows: [(address, (sub district, district, province))]
+    :param traces: list the stats hook appends to
+    :return: (traces of the rows, share of right results)
+    '''
+    for address, _ in rows:  # warm up, builds the indexes of the areas met
+        ThaiAddressParser.parse(address)
+    del traces[:]
+    right = 0
+    for address, truth in rows:
+        res = ThaiAddressParser.parse(address)
+        right += (res['sub_district']['thai'], res['district']['thai'], res['province']['thai']) == truth
+    return list(traces), right / len(rows)
+
+
+def main(size=300):
+    ThaiAddressParser.set_cache_size(0)
+    ThaiAddressParser.set_token_cache_size(0)
+    app = ThaiAddressParser.get_parser()
+    dictionary = load_dictionary()
+    traces = []
+    ThaiAddressParser.enable_stats(hook=traces.append)
+    for case in CASES:
+        rows = case_corpus(case, size, dictionary=dictionary)
+        for label, cascade in (('joint_search', False), ('former cascade', True)):
+            if cascade:
+                # shadows the method on this parser only, removed right after
+                app.parse_other_province = lambda ctx: legacy_parse_other_province(app, ctx)
+            try:
+                group_traces, right = measure(rows, traces)
+            finally:
+                app.__dict__.pop('parse_other_province', None)
+            paths = defaultdict(list)
+            for trace in group_traces:
+                paths[' > '.join(trace.branches)].append(trace)
+            print('{:<13} {:<15} {:8.1f} names compared {:6.3f} ms per address {:6.1%} right'.format(
+                case, label, sum(t.compared for t in group_traces) / len(group_traces),
+                sum(t.seconds for t in group_traces) / len(group_traces) * 1e3, right))
+            for path, group in sorted(paths.items(), key=lambda x: -len(x[1]))[:6]:
+                print('  {:>5} x {:8.1f} names {:6.3f} ms  {}'.format(
+                    len(group), sum(t.compared for t in group) / len(group),
+                    sum(t.seconds for t in group) / len(group) * 1e3, path))
+    ThaiAddressParser.disable_stats()
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:2]])
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_normalize.py
+@desc: addresses written with the variants normalize.py rewrites (long level words, a marker
+       apart from its name, อ.เมือง, กทม. / กรุงเทพฯ, stray marks, English names after an English
+       level word): share of right results, names compared and time per address, with the
+       normalizer and without it, both caches off. Then streets named after Bangkok, which must
+       be left as written.
+
+       python benchmarks/bench_normalize.py [addresses per layout]
+'''
+import os
+import sys
+import json
+import random
+import time
+
+import ThaiAddressParser
+from corpus import BANGKOK, load_dictionary
+
+LAYOUTS = ('ตำบล{s} อำเภอ{d} จังหวัด{p}', 'ต. {s} อ. {d} จ. {p}', 'ต.{s} อ.เมือง จ.{p}', 'ต.{s} อ.{d} จ.{p}',
+           'Tambon {S}, Amphoe {D}, Changwat {P}', '{s} {d} กทม.', 'แขวง{s} เขต{d} กรุงเทพฯ')
+# (address, (sub district, district, province, remaining address))
+STREETS = (
+    ('99 ถ.กรุงเทพ-นนทบุรี แขวงบางซื่อ เขตบางซื่อ กรุงเทพมหานคร 10800',
+     ('บางซื่อ', 'บางซื่อ', BANGKOK, '99 ถ.กรุงเทพ-นนทบุรี')),
+    ('99 ซ.กรุงเทพกรีฑา 7 แขวงหัวหมาก เขตบางกะปิ กรุงเทพมหานคร',
+     ('หัวหมาก', 'บางกะปิ', BANGKOK, '99 ซ.กรุงเทพกรีฑา 7')),
+    ('12 ถ.กรุงเทพ-นนทบุรี ต.บางเขน อ.เมืองนนทบุรี จ.นนทบุรี',
+     ('บางเขน', 'เมืองนนทบุรี', 'นนทบุรี', '12 ถ.กรุงเทพ-นนทบุรี'))
+)
+
+
+def load_translator():
+    path = os.path.join(os.path.dirname(os.path.abspath(ThaiAddressParser.__file__)), 'th_en_db.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def stray_marks(rng, s):
+    '''
+    type the first tone mark twice, or ำ as ํ + า
+    :param rng:
+    :param s:
+    :return:
+    '''
+    if 'ำ' in s and rng.random() < 0.5:
+        return s.replace('ำ', 'ํา', 1)
+    for i, c in enumerate(s):
+        if '่' <= c <= '๋':
+            return s[:i + 1] + c + s[i + 1:]
+    return s
+
+
+def layout_corpus(layout, size, dictionary, translator):
+    rng = random.Random(layout)
+    bangkok = layout.endswith(('กทม.', 'กรุงเทพฯ'))
+    provinces = [BANGKOK] if bangkok else sorted(p for p in dictionary if p != BANGKOK)
+    rows = []
+    while len(rows) < size:
+        p = rng.choice(provinces)
+        if 'อ.เมือง' in layout:
+            d = 'เมือง' + p
+            if d not in dictionary[p]:
+                continue
+        else:
+            d = rng.choice(sorted(dictionary[p]))
+        s = rng.choice(sorted(dictionary[p][d]))
+        if '{S}' in layout:
+            if any(n not in translator for n in (s, d, p)):
+                continue
+            names = layout.format(S=translator[s], D=translator[d], P=translator[p])
+        elif layout == 'ต.{s} อ.{d} จ.{p}':
+            names = layout.format(s=stray_marks(rng, s), d=d, p=p)
+        else:
+            names = layout.format(s=s, d=d, p=p)
+        rows.append(('{}/{} ถ.สุขุมวิท {}'.format(rng.randint(1, 999), rng.randint(1, 99), names), (s, d, p)))
+    return rows
+
+
+def measure(rows, traces):
+    del traces[:]
+    right = 0
+    start = time.perf_counter()
+    for address, truth in rows:
+        res = ThaiAddressParser.parse(address)
+        right += (res['sub_district']['thai'], res['district']['thai'], res['province']['thai']) == truth
+    cost = time.perf_counter() - start
+    return right / len(rows), sum(t.compared for t in traces) / len(traces), cost / len(rows) * 1e3
+
+
+def main(size=200):
+    ThaiAddressParser.set_cache_size(0)
+    ThaiAddressParser.set_token_cache_size(0)
+    dictionary = load_dictionary()
+    translator = load_translator()
+    app = ThaiAddressParser.get_parser()
+    normalize = app.normalizer.normalize
+    traces = []
+    ThaiAddressParser.enable_stats(hook=traces.append)
+    for layout in LAYOUTS:
+        rows = layout_corpus(layout, size, dictionary, translator)
+        ThaiAddressParser.parse(rows[0][0])
+        line = []
+        for rewrite in (normalize, lambda address: address):
+            app.normalizer.normalize = rewrite
+            line.append('{:6.1%} right {:7.1f} names {:6.3f} ms'.format(*measure(rows, traces)))
+        app.normalizer.normalize = normalize
+        if layout == 'ต.{s} อ.{d} จ.{p}':
+            layout += ' marks'
+        print('{:<38} {}   without: {}'.format(layout, *line))
+    ThaiAddressParser.disable_stats()
+    for address, truth in STREETS:
+        res = ThaiAddressParser.parse(address)
+        found = (res['sub_district']['thai'], res['district']['thai'], res['province']['thai'],
+                 res['remaining_address'])
+        print('{:<5} {}'.format('right' if found == truth else 'WRONG', address))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:2]])
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_postcode.py
+@desc: misspelled addresses parsed with and without their postcode: time per address and
+       share of addresses whose province, district and sub district are all right.
+       Postcodes follow the province prefixes of the postcode table, XX000 is only used for
+       capital districts. Both caches are off.
+
+       python benchmarks/bench_postcode.py [addresses]
+'''
+import sys
+import time
+import random
+
+import ThaiAddressParser
+from ThaiAddressParser.postcodes import POSTCODE_PREFIXES, CAPITAL_DISTRICTS
+from corpus import misspell
+
+
+def postcode_corpus(size, seed=0):
+    '''
+    misspelled non Bangkok addresses ending with a postcode, with the same number of every
+    marker layout (ต. อ. จ. / ต. จ. / ต. อ. / ต. only)
+    :param size:
+    :param seed:
+    :return: [(address, (sub district, district, province))]
+    '''
+    rng = random.Random(seed)
+    dictionary = ThaiAddressParser.app.dictionary
+    prefixes = {}
+    for prefix, provinces in sorted(POSTCODE_PREFIXES.items()):
+        prefixes.setdefault(provinces[0], prefix)
+    provinces = sorted(p for p in dictionary.keys() if p in prefixes and p != 'กรุงเทพมหานคร')
+    layouts = ['ต.{s} อ.{d} จ.{p}', 'ต.{s} จ.{p}', 'ต.{s} อ.{d}', 'ต.{s}']
+    corpus = []
+    for n in range(size):
+        p = rng.choice(provinces)
+        d = rng.choice(sorted(dictionary[p].keys()))
+        s = rng.choice(sorted(dictionary[p][d]))
+        if d == CAPITAL_DISTRICTS.get(p, 'เมือง' + p) and rng.random() < 0.5:
+            postcode = prefixes[p] + '000'
+        else:
+            postcode = prefixes[p] + '{}{}0'.format(rng.randint(1, 9), rng.randint(0, 9))
+        names = layouts[n % len(layouts)].format(s=misspell(rng, s), d=misspell(rng, d), p=misspell(rng, p))
+        corpus.append(('{}/{} ถ.สุขุมวิท {} {}'.format(n, rng.randint(1, 99), names, postcode), (s, d, p)))
+    return corpus
+
+
+def run(corpus):
+    start = time.perf_counter()
+    results = [ThaiAddressParser.app.parse(address) for address, _ in corpus]
+    cost = time.perf_counter() - start
+    right = sum(tuple(res[-3:]) == truth for res, (_, truth) in zip(results, corpus))
+    return cost, right
+
+
+def main(size=3000):
+    ThaiAddressParser.set_cache_size(0)
+    ThaiAddressParser.set_token_cache_size(0)
+    corpus = postcode_corpus(size)
+    without = [(address.rsplit(' ', 1)[0], truth) for address, truth in corpus]
+    for label, addresses in (('without postcode', without), ('with postcode', corpus)):
+        cost, right = run(addresses)
+        print('{:<17} {:.3f} ms per address, {:.1%} fully right'.format(
+            label, cost * 1000 / size, right / size))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:2]])
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_scorers.py
+@desc: speed and accuracy of every similarity backend (see ThaiAddressParser/similarity.py).
+       Names: misspelled sub districts matched against every non Bangkok sub district, share of
+       the right name picked first and time per query, plus the time of one pair.
+       Addresses: one parser per scorer on the labelled corpus of bench_suite.py, share of fully
+       right results and time per address for every case, both caches off.
+
+       python benchmarks/bench_scorers.py [queries and addresses per case] [scorer ...]
+'''
+import os
+import sys
+import time
+import random
+
+import ThaiAddressParser
+from ThaiAddressParser.similarity import SCORERS, scorer_class
+from corpus import CASES, case_corpus, misspell, load_dictionary
+
+
+def build_parser(scorer):
+    return ThaiAddressParser.ThaiAddressParserClass(
+        file_path=os.path.join(ThaiAddressParser.DATA_DIR, ThaiAddressParser.DICTIONARY_FILE),
+        translation_db=os.path.join(ThaiAddressParser.DATA_DIR, ThaiAddressParser.TRANSLATION_FILE),
+        snapshot_path=os.path.join(ThaiAddressParser.DATA_DIR, ThaiAddressParser.SNAPSHOT_FILE),
+        scorer=scorer)
+
+
+def name_queries(names, size):
+    rng = random.Random(0)
+    queries = []
+    while len(queries) < size:
+        name = rng.choice(names)
+        typo = misspell(rng, name)
+        if typo != name:
+            queries.append((typo, name))
+    return queries
+
+
+def bench_names(scorer, names, queries):
+    cls = scorer_class(scorer)
+    index = cls(names)
+    right = 0
+    start = time.perf_counter()
+    for query, name in queries:
+        right += index.best(query)[0] == name
+    per_query = (time.perf_counter() - start) / len(queries)
+    pairs = [(query, name) for query, name in queries[:200]]
+    start = time.perf_counter()
+    for query, name in pairs:
+        cls.similarity(query, name)
+    per_pair = (time.perf_counter() - start) / len(pairs)
+    return right / len(queries), per_query, per_pair
+
+
+def bench_addresses(parser, corpus):
+    right = 0
+    start = time.perf_counter()
+    for address, truth in corpus:
+        right += tuple(parser.parse(address)[-3:]) == truth
+    return right / len(corpus), (time.perf_counter() - start) / len(corpus)
+
+
+def main(size=200, *scorers):
+    scorers = scorers or tuple(SCORERS)
+    dictionary = load_dictionary()
+    names = sorted({s for p, districts in dictionary.items() if p != 'กรุงเทพมหานคร'
+                    for sub_districts in districts.values() for s in sub_districts})
+    queries = name_queries(names, size)
+    corpora = [(case, case_corpus(case, size, dictionary=dictionary)) for case in CASES]
+    print('{:<12} {:>8} {:>10} {:>9}'.format('names', 'right', 'ms/query', 'us/pair'))
+    for scorer in scorers:
+        right, per_query, per_pair = bench_names(scorer, names, queries)
+        print('{:<12} {:8.1%} {:10.3f} {:9.2f}'.format(scorer, right, per_query * 1e3, per_pair * 1e6))
+    print()
+    print('{:<12} '.format('addresses') + ' '.join('{:>20}'.format(case) for case, _ in corpora))
+    for scorer in scorers:
+        parser = build_parser(scorer)
+        line = []
+        for case, corpus in corpora:
+            bench_addresses(parser, corpus[:10])  # builds the indexes of the areas met
+            right, per_address = bench_addresses(parser, corpus)
+            line.append('{:6.1%} {:7.3f} ms'.format(right, per_address * 1e3))
+        print('{:<12} '.format(scorer) + ' '.join('{:>20}'.format(cell) for cell in line))
+
+
+if __name__ == '__main__':
+    main(*([int(i) for i in sys.argv[1:2]] + sys.argv[2:]))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_startup.py
+@desc: parser construction from the json files vs from the precompiled snapshot.
+       Build the snapshot first: python -m ThaiAddressParser.build --compile-only
+
+       python benchmarks/bench_startup.py [runs]
+'''
+import os
+import sys
+import time
+
+import ThaiAddressParser
+from ThaiAddressParser import ThaiAddressParserClass, DATA_DIR, DICTIONARY_FILE, TRANSLATION_FILE, SNAPSHOT_FILE
+
+
+def measure(runs, **kwargs):
+    costs = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parser = ThaiAddressParserClass(**kwargs)
+        costs.append(time.perf_counter() - start)
+    costs.sort()
+    return costs[len(costs) // 2], parser
+
+
+def main(runs=10):
+    sources = dict(file_path=os.path.join(DATA_DIR, DICTIONARY_FILE),
+                   translation_db=os.path.join(DATA_DIR, TRANSLATION_FILE))
+    snapshot_path = os.path.join(DATA_DIR, SNAPSHOT_FILE)
+    if not os.path.exists(snapshot_path):
+        print('{} is missing, run `python -m ThaiAddressParser.build --compile-only`'.format(snapshot_path))
+        return
+    json_cost, json_parser = measure(runs, **sources)
+    snapshot_cost, snapshot_parser = measure(runs, snapshot_path=snapshot_path, **sources)
+    print('json files: median {:.1f} ms'.format(json_cost * 1000))
+    print('snapshot:   median {:.1f} ms ({:.0f} KB)'.format(snapshot_cost * 1000,
+                                                            os.path.getsize(snapshot_path) / 1024.))
+    address = '7503 ถ.ราชญาวิริกษา ต.แม่กลอง อ.เมืองสมุทรสงคราม จ.สมุทรสงคราม'
+    print('same result: {}'.format(json_parser.parse(address) == snapshot_parser.parse(address)))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:2]])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_stats.py
+@desc: cost of the instrumentation: the suite corpus parsed with the stats disabled, enabled,
+       and enabled with a hook, best of a few passes. Both caches are off. Then prints the
+       slowest branch paths found.
+
+       python benchmarks/bench_stats.py [addresses per case] [passes]
+'''
+import sys
+import time
+
+import ThaiAddressParser
+from corpus import CASES, case_corpus, load_dictionary
+
+
+def best_pass(addresses, passes):
+    parser = ThaiAddressParser.app
+    best = None
+    for _ in range(passes):
+        start = time.perf_counter()
+        for address in addresses:
+            parser.parse(address)
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def main(size=300, passes=5):
+    ThaiAddressParser.set_cache_size(0)
+    ThaiAddressParser.set_token_cache_size(0)
+    dictionary = load_dictionary()
+    addresses = [address for case in CASES for address, _ in case_corpus(case, size, dictionary=dictionary)]
+    best_pass(addresses, 1)  # warm up
+    disabled = best_pass(addresses, passes)
+    ThaiAddressParser.enable_stats()
+    enabled = best_pass(addresses, passes)
+    slow = []
+    ThaiAddressParser.enable_stats(hook=lambda trace: slow.append(trace) if trace.seconds > 0.002 else None)
+    hooked = best_pass(addresses, passes)
+    info = ThaiAddressParser.stats_info()
+    ThaiAddressParser.disable_stats()
+    for label, cost in (('disabled', disabled), ('enabled', enabled), ('enabled + hook', hooked)):
+        print('{:<15} {:.3f} ms per address ({:+.1%})'.format(
+            label, cost * 1000 / len(addresses), cost / disabled - 1))
+    print('{} parses over 2 ms, slowest paths:'.format(len(slow)))
+    for path, timing in list(info['paths'].items())[:5]:
+        print('  {:>5} x {:.3f} ms  {}'.format(timing['calls'], timing['mean_ms'], path))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:3]])
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_suite.py
+@desc: regression benchmark. Parses a deterministic labelled corpus of every address shape in
+       corpus.CASES (clean, typo, Bangkok, other provinces, no markers, mixed script) and reports
+       per case the throughput, latency percentiles, share of fully right results and peak
+       memory allocated while parsing, plus the cold start. Both caches are off unless --cache.
+       Results can be saved as JSON and compared with a previous run, the exit status is 1 when
+       a case got slower than the tolerance.
+
+       python benchmarks/bench_suite.py --size 1000 -o before.json
+       python benchmarks/bench_suite.py --size 1000 --compare before.json
+'''
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+
+import ThaiAddressParser
+from corpus import CASES, case_corpus, load_dictionary
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100. * len(values)))] if len(values) else 0.
+
+
+def package_version():
+    try:
+        from importlib.metadata import version
+        return version('ThaiAddressParser')
+    except Exception:
+        return 'unknown'
+
+
+def timed_pass(parser, corpus):
+    latencies = []
+    right = 0
+    start = time.perf_counter()
+    for address, truth in corpus:
+        t = time.perf_counter()
+        res = parser.parse(address)
+        latencies.append(time.perf_counter() - t)
+        right += tuple(res[-3:]) == truth
+    return time.perf_counter() - start, latencies, right
+
+
+def run_case(corpus, repeat=3):
+    '''
+
+    :param corpus: case_corpus() result
+    :param repeat: timed passes, the fastest one is kept to dampen the noise of the machine
+    :return: {metric: value}
+    '''
+    parser = ThaiAddressParser.app
+    cost, latencies, right = min((timed_pass(parser, corpus) for _ in range(max(1, repeat))),
+                                 key=lambda run: run[0])
+    # separate pass, tracemalloc slows parsing down several times
+    tracemalloc.start()
+    for address, _ in corpus:
+        parser.parse(address)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'addresses': len(corpus),
+        'addresses_per_s': len(corpus) / cost,
+        'mean_ms': cost * 1000 / len(corpus),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'max_ms': max(latencies) * 1000,
+        'fully_right': right / len(corpus),
+        'peak_alloc_kb': peak / 1024.,
+    }
+
+
+def compare(results, baseline, tolerance):
+    '''
+    print the change of every case against a previous run
+    :param results:
+    :param baseline: results of the previous run
+    :param tolerance: relative slow down reported as a regression
+    :return: [regressed cases]
+    '''
+    regressions = []
+    for case, metrics in results['cases'].items():
+        before = baseline.get('cases', {}).get(case)
+        if before is None:
+            continue
+        speed = metrics['addresses_per_s'] / before['addresses_per_s'] - 1
+        p99 = metrics['p99_ms'] / before['p99_ms'] - 1 if before['p99_ms'] else 0.
+        accuracy = metrics['fully_right'] - before['fully_right']
+        regressed = speed < -tolerance or p99 > tolerance
+        if regressed:
+            regressions.append(case)
+        print('{:<13} throughput {:+7.1%}, p99 {:+7.1%}, fully right {:+6.1%}{}'.format(
+            case, speed, p99, accuracy, '  REGRESSION' if regressed else ''))
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    arg_parser.add_argument('--size', type=int, default=1000, help='addresses per case')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    arg_parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    arg_parser.add_argument('--repeat', type=int, default=3, help='timed passes per case, the fastest is kept')
+    arg_parser.add_argument('--engine', default='python', help='fuzzy matching engine, see ThaiAddressParser.set_engine()')
+    arg_parser.add_argument('--cache', action='store_true', help='keep the result and token caches on')
+    arg_parser.add_argument('-o', '--output', help='save the results as JSON')
+    arg_parser.add_argument('--compare', help='JSON results of a previous run')
+    arg_parser.add_argument('--tolerance', type=float, default=0.1,
+                            help='relative slow down of a case reported as a regression')
+    args = arg_parser.parse_args(argv)
+
+    start = time.perf_counter()
+    ThaiAddressParser.warm_up()
+    cold_start = time.perf_counter() - start
+    ThaiAddressParser.set_engine(args.engine)
+    if not args.cache:
+        ThaiAddressParser.set_cache_size(0)
+        ThaiAddressParser.set_token_cache_size(0)
+    dictionary = load_dictionary()
+    results = {
+        'version': package_version(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'size': args.size,
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'engine': args.engine,
+        'cache': args.cache,
+        'cold_start_ms': cold_start * 1000,
+        'cases': {},
+    }
+    print('cold start {:.1f} ms'.format(cold_start * 1000))
+    for case in args.cases:
+        corpus = case_corpus(case, args.size, args.seed, dictionary)
+        metrics = results['cases'][case] = run_case(corpus, args.repeat)
+        print('{:<13} {:6.0f} addresses/s, p50 {:5.2f} ms p90 {:5.2f} ms p99 {:5.2f} ms max {:6.2f} ms, '
+              '{:6.1%} fully right, peak {:6.0f} KiB'.format(
+                  case, metrics['addresses_per_s'], metrics['p50_ms'], metrics['p90_ms'], metrics['p99_ms'],
+                  metrics['max_ms'], metrics['fully_right'], metrics['peak_alloc_kb']))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('size') != args.size or baseline.get('seed') != args.seed:
+            print('warning: the baseline was run on another corpus (size {}, seed {})'.format(
+                baseline.get('size'), baseline.get('seed')), file=sys.stderr)
+        return 1 if len(compare(results, baseline, args.tolerance)) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_token_cache.py
+@desc: parsing distinct addresses whose misspelled names recur, with and without the
+       fuzzy token cache (the result cache is off, every address is different).
+
+       python benchmarks/bench_token_cache.py [addresses] [distinct misspellings]
+'''
+import sys
+import time
+
+import ThaiAddressParser
+from corpus import typo_corpus
+
+
+def run(corpus):
+    start = time.time()
+    results = [ThaiAddressParser.parse(a) for a in corpus]
+    return time.time() - start, results
+
+
+def main(size=5000, distinct=200):
+    corpus = typo_corpus(size, distinct)
+    ThaiAddressParser.set_cache_size(0)
+    ThaiAddressParser.set_token_cache_size(0)
+    cost, expected = run(corpus)
+    print('without token cache: {:.3f} ms per address'.format(cost * 1000 / size))
+    ThaiAddressParser.set_token_cache_size(ThaiAddressParser.DEFAULT_TOKEN_CACHE_SIZE)
+    cost, results = run(corpus)
+    info = ThaiAddressParser.token_cache_info()
+    print('with token cache:    {:.3f} ms per address, hit rate {:.1%}, same results: {}'.format(
+        cost * 1000 / size, info['hit_rate'], results == expected))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:3]])
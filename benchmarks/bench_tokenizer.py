@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_tokenizer.py
+@desc: tokenization alone: the former split / index loops of parse() vs tokenizer.tokenize(),
+       on a realistic synthetic corpus plus randomly mangled addresses. Also checks that both
+       produce the same token lists.
+
+       python benchmarks/bench_tokenizer.py [addresses] [rounds]
+'''
+import sys
+import time
+import random
+
+from ThaiAddressParser import ParseContext, check_th_chars
+from ThaiAddressParser.tokenizer import tokenize
+from corpus import clean_corpus, typo_corpus
+
+
+def legacy_tokenize(address):
+    # the two loops parse() used before the tokenizer, kept as the reference
+    ctx = ParseContext()
+    ctx.address_list = address.split(' ')
+    temp = []
+    for idx, i in enumerate(ctx.address_list):
+        if idx:
+            i = i.strip(' ')
+            if 'กรุงเทพมหานคร' in i:
+                t = i.index('กรุงเทพมหานคร')
+                if len(i[:t]):
+                    temp[-1] += i[:t]
+                temp.append('กรุงเทพมหานคร')
+            elif 'จ.' in i:
+                t = i.index('จ.')
+                if len(i[:t]):
+                    temp[-1] += i[:t]
+                if len(i[(t + 2):]):
+                    temp.append(i[t:])
+            elif 'อ.' in i:
+                t = i.index('อ.')
+                if len(i[:t]):
+                    temp[-1] += i[:t]
+                if len(i[(t + 2):]):
+                    temp.append(i[t:])
+            elif 'ต.' in i:
+                t = i.index('ต.')
+                if len(i[:t]):
+                    temp[-1] += ' ' + i[:t]
+                if len(i[(t + 2):]):
+                    temp.append(i[t:])
+            else:
+                if len(i):
+                    temp.append(i)
+        else:
+            if len(i):
+                temp.append(i)
+    ctx.address_list = temp
+    for idx, i in enumerate(ctx.address_list):
+        i = i.strip(' ')
+        if check_th_chars(i):
+            ctx.thai_parts.append(i)
+            ctx.thai_parts_index.append([i, idx])
+            if i == 'กรุงเทพมหานคร':
+                ctx.bangkok_flags.append(len(ctx.thai_parts) - 1)
+            if 'จ.' in i:
+                ctx.non_bangkok_province_index.append(len(ctx.thai_parts) - 1)
+                t = i.index('จ.')
+                ctx.o_province.append(i[(t + 2):])
+            if 'อ.' in i:
+                ctx.non_bangkok_district_index.append(len(ctx.thai_parts) - 1)
+                t = i.index('อ.')
+                ctx.o_district.append(i[(t + 2):])
+            if 'ต.' in i:
+                ctx.non_bangkok_sub_district_index.append(len(ctx.thai_parts) - 1)
+                t = i.index('ต.')
+                ctx.o_sub_district.append(i[(t + 2):])
+    return ctx
+
+
+def new_tokenize(address):
+    ctx = ParseContext()
+    ctx.set_tokens(tokenize(address))
+    return ctx
+
+
+FIELDS = ['address_list', 'thai_parts', 'thai_parts_index', 'bangkok_flags', 'non_bangkok_province_index',
+          'non_bangkok_district_index', 'non_bangkok_sub_district_index', 'o_province', 'o_district',
+          'o_sub_district']
+
+
+def mangle(rng, address):
+    # glue markers to their neighbours, add spaces and stray markers
+    pieces = []
+    for part in address.split(' '):
+        r = rng.random()
+        if r < 0.2 and len(pieces):
+            pieces[-1] += part
+        elif r < 0.3:
+            pieces.append(part + rng.choice(['จ.', 'อ.', 'ต.', 'กรุงเทพมหานคร', '']))
+        elif r < 0.4:
+            pieces.append(' ' + part)
+        else:
+            pieces.append(part)
+    return ' '.join(pieces)
+
+
+def main(size=3000, rounds=5):
+    rng = random.Random(0)
+    corpus = clean_corpus(size // 2) + typo_corpus(size // 2)
+    mangled = [mangle(rng, a) for a in corpus]
+    mismatches = 0
+    for address in corpus + mangled:
+        try:
+            expected = legacy_tokenize(address)
+        except IndexError:
+            # the former loops crashed on a marker glued to text with no token before it
+            continue
+        got = new_tokenize(address)
+        mismatches += any(getattr(expected, f) != getattr(got, f) for f in FIELDS)
+    print('mismatches: {}'.format(mismatches))
+    for label, func in (('split / index loops', legacy_tokenize), ('tokenizer', new_tokenize)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for address in corpus:
+                func(address)
+        cost = time.perf_counter() - start
+        print('{:<20} {:.2f} us per address'.format(label, cost * 1e6 / (rounds * len(corpus))))
+    return mismatches
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main(*[int(i) for i in sys.argv[1:3]]) else 0)
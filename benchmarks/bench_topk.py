@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: bench_topk.py
+@desc: cost of parse(top_k=2) and how well the rows it flags as ambiguous (the result scores
+       barely above the runner up) catch the wrong results, against flagging on confidence,
+       over the misspelled cases of the labelled corpus
+
+       python benchmarks/bench_topk.py [addresses per case]
+'''
+import sys
+import time
+
+import ThaiAddressParser
+from corpus import case_corpus, load_dictionary
+
+CASES = ('typo', 'bangkok', 'non_bangkok')
+
+
+def main(size=300):
+    ThaiAddressParser.set_cache_size(0)
+    dictionary = load_dictionary()
+    rows = [row for case in CASES for row in case_corpus(case, size, dictionary=dictionary)]
+    ThaiAddressParser.parse(rows[0][0], top_k=2)
+    for top_k in (0, 2):
+        start = time.perf_counter()
+        for address, _ in rows:
+            ThaiAddressParser.parse(address, top_k=top_k)
+        cost = time.perf_counter() - start
+        print('top_k={} {:6.3f} ms/address'.format(top_k, cost / len(rows) * 1e3))
+    scored = []
+    for address, truth in rows:
+        res = ThaiAddressParser.parse(address, top_k=2)
+        right = (res['sub_district']['thai'], res['district']['thai'], res['province']['thai']) == truth
+        candidates = res['candidates']
+        margin = candidates[0]['score'] - (candidates[1]['score'] if len(candidates) > 1 else 0.)
+        scored.append((margin, res['confidence'], right))
+    print('{} addresses, {} wrong'.format(len(scored), sum(not right for _, _, right in scored)))
+    for label, key, thresholds in (('margin', 0, (0.02, 0.05, 0.1)), ('confidence', 1, (0.7, 0.8, 0.9))):
+        for threshold in thresholds:
+            flagged = [row[2] for row in scored if row[key] < threshold]
+            print('{:<10} < {:<4} flags {:4d} rows, {:3d} of them wrong'.format(
+                label, threshold, len(flagged), sum(not right for right in flagged)))
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:2]])
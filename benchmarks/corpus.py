@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# encoding=utf-8
+'''
+@file: corpus.py
+@desc: deterministic synthetic addresses built from the packaged address database
+'''
+import os
+import json
+import random
+
+import ThaiAddressParser
+
+BANGKOK = 'กรุงเทพมหานคร'
+STREETS = ['ถ.สุขุมวิท', 'ถ.พหลโยธิน', 'ซ.ลาดพร้าว 71', 'หมู่ 4', 'ม.7 ถ.มิตรภาพ', 'หมู่บ้านพฤกษา']
+LATIN_STREETS = ['Moo 4', 'Soi 7', 'Sukhumvit Rd.', 'Rama IV Road', 'Condo Lumpini Tower B', 'Room 1204 Fl.12']
+
+
+def clean_corpus(size, seed=0):
+    '''
+    well formed addresses with exact names and markers
+    :param size:
+    :param seed:
+    :return:
+    '''
+    rng = random.Random(seed)
+    dictionary = ThaiAddressParser.app.dictionary
+    provinces = sorted(dictionary.keys())
+    corpus = []
+    for n in range(size):
+        p = rng.choice(provinces)
+        d = rng.choice(sorted(dictionary[p].keys()))
+        s = rng.choice(sorted(dictionary[p][d]))
+        house = '{}/{} ถ.สุขุมวิท'.format(rng.randint(1, 999), rng.randint(1, 99))
+        if p == 'กรุงเทพมหานคร':
+            corpus.append('{} {} {} {}'.format(house, s, d, p))
+        else:
+            corpus.append('{} ต.{} อ.{} จ.{}'.format(house, s, d, p))
+    return corpus
+
+
+def misspell(rng, s):
+    '''
+    drop, replace or double one character
+    :param rng:
+    :param s:
+    :return:
+    '''
+    if len(s) < 3:
+        return s
+    i = rng.randrange(len(s))
+    op = rng.random()
+    if op < 0.4:
+        return s[:i] + s[i + 1:]
+    elif op < 0.7:
+        return s[:i] + rng.choice('กขคงจมนยรลวสห') + s[i + 1:]
+    return s[:i] + s[i] + s[i:]
+
+
+def typo_corpus(size, distinct=200, seed=0):
+    '''
+    addresses whose misspelled names recur: `distinct` misspelled (sub district, district,
+    province) triples, each used with many different house numbers
+    :param size:
+    :param distinct:
+    :param seed:
+    :return:
+    '''
+    rng = random.Random(seed)
+    dictionary = ThaiAddressParser.app.dictionary
+    provinces = sorted(p for p in dictionary.keys() if p != 'กรุงเทพมหานคร')
+    triples = []
+    for _ in range(distinct):
+        p = rng.choice(provinces)
+        d = rng.choice(sorted(dictionary[p].keys()))
+        s = rng.choice(sorted(dictionary[p][d]))
+        triples.append((misspell(rng, s), misspell(rng, d), misspell(rng, p)))
+    corpus = []
+    for n in range(size):
+        s, d, p = rng.choice(triples)
+        corpus.append('{}/{} ถ.สุขุมวิท ต.{} อ.{} จ.{}'.format(n, rng.randint(1, 99), s, d, p))
+    return corpus
+
+
+def load_dictionary():
+    '''
+    the packaged province / district / sub district file, read directly so that the corpus does
+    not depend on the parser version being measured
+    :return: {province: {district: [sub district]}}
+    '''
+    path = os.path.join(os.path.dirname(os.path.abspath(ThaiAddressParser.__file__)),
+                        'th_provinces_districts_sub_districts.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _pick(rng, dictionary, provinces):
+    p = rng.choice(provinces)
+    d = rng.choice(sorted(dictionary[p].keys()))
+    s = rng.choice(sorted(dictionary[p][d]))
+    return s, d, p
+
+
+def _house(rng, latin=False):
+    streets = LATIN_STREETS if latin else STREETS
+    return '{}/{} {}'.format(rng.randint(1, 999), rng.randint(1, 99), ' '.join(rng.sample(streets, 2)))
+
+
+def case_corpus(case, size, seed=0, dictionary=None):
+    '''
+    labelled addresses of one shape, see CASES
+    :param case: name in CASES
+    :param size:
+    :param seed:
+    :param dictionary: load_dictionary() result, loaded when None
+    :return: [(address, (sub district, district, province))]
+    '''
+    rng = random.Random('{}:{}'.format(case, seed))
+    dictionary = dictionary or load_dictionary()
+    provinces = sorted(dictionary.keys())
+    others = [p for p in provinces if p != BANGKOK]
+    layouts = ['ต.{s} อ.{d} จ.{p}', 'ต.{s} จ.{p}', 'ต.{s} อ.{d}', '{s} อ.{d} จ.{p}']
+    corpus = []
+    for n in range(size):
+        if case == 'clean':
+            s, d, p = _pick(rng, dictionary, provinces)
+            names = '{} {} {}'.format(s, d, p) if p == BANGKOK else 'ต.{} อ.{} จ.{}'.format(s, d, p)
+        elif case == 'typo':
+            s, d, p = _pick(rng, dictionary, others)
+            names = 'ต.{} อ.{} จ.{}'.format(misspell(rng, s), misspell(rng, d), misspell(rng, p))
+        elif case == 'bangkok':
+            s, d, p = _pick(rng, dictionary, [BANGKOK])
+            ms, md = (misspell(rng, s), misspell(rng, d)) if n % 2 else (s, d)
+            names = '{} {} {}'.format(ms, md, p)
+        elif case == 'non_bangkok':
+            s, d, p = _pick(rng, dictionary, others)
+            ms, md, mp = (misspell(rng, s), misspell(rng, d), misspell(rng, p)) if n % 2 else (s, d, p)
+            names = layouts[(n // 2) % len(layouts)].format(s=ms, d=md, p=mp)
+        elif case == 'no_markers':
+            s, d, p = _pick(rng, dictionary, others)
+            names = '{} {} {}'.format(s, d, p)
+        elif case == 'glued':
+            s, d, p = _pick(rng, dictionary, provinces)
+            if p == BANGKOK:
+                names = rng.choice(['แขวง{}เขต{}กทม', '{}{} กทม.', 'ข.{} เขต{}']).format(s, d)
+            else:
+                names = rng.choice(['{}{}{}', '{} {}{}', '{}{} {}']).format(s, d, p)
+        elif case == 'mixed_script':
+            s, d, p = _pick(rng, dictionary, others)
+            names = 'ต.{} อ.{} จ.{} Thailand'.format(s, d, p)
+        else:
+            raise ValueError('unknown case {!r}, expected one of {}'.format(case, CASES))
+        corpus.append(('{} {}'.format(_house(rng, latin=case == 'mixed_script'), names), (s, d, p)))
+    return corpus
+
+
+# clean: exact names with markers (bare names for Bangkok), typo: one misspelling in every name,
+# bangkok: Bangkok only, half misspelled, non_bangkok: other provinces with partial marker layouts,
+# half misspelled, no_markers: bare names, glued: bare names run together (เขต / แขวง / กทม for
+# Bangkok), mixed_script: Latin street parts around the Thai names
+CASES = ('clean', 'typo', 'bangkok', 'non_bangkok', 'no_markers', 'glued', 'mixed_script')
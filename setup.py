@@ -26,8 +26,12 @@ setuptools.setup(
     description="Thailand Address Parser",
     long_description=long_description,
     long_description_content_type="text/markdown",
-    packages=setuptools.find_packages(),
-    install_requires=['bs4','requests','tqdm'],
+    packages=setuptools.find_packages(exclude=['benchmarks']),
+    package_data={'ThaiAddressParser': ['*.json', '*.snapshot']},
+    # build: only needed to rebuild the address database (python -m ThaiAddressParser.build)
+    # numpy: vectorized fuzzy matching engine, ThaiAddressParser.set_engine('numpy')
+    extras_require={'build': ['bs4', 'requests', 'tqdm'], 'numpy': ['numpy']},
+    entry_points={'console_scripts': ['thai-address-parse = ThaiAddressParser.cli:main']},
     classifiers=(
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",